@@ -0,0 +1,102 @@
+"""
+Size and speed of the binary codec against pydantic JSON.
+
+Run with:
+    uv run python benchmarks/codec.py
+"""
+
+import os
+import random
+import timeit
+
+from pydantic_core import PydanticSerializationError
+
+from zendata.core.batch import Batch
+from zendata.core.codec import decode, encode
+from zendata.data.audio import AudioBytesData
+from zendata.data.ml.audio.transcription import PredictedTranscription, PredictWordLevel
+from zendata.data.ml.computer_vision.detection import PredictBbox
+from zendata.data.text.text import TextData
+from zendata.tasks.serialization import task_from_json
+from zendata.tasks.task import Task
+
+WORDS = ["the", "a", "model", "speech", "zendata", "hello", "world"]
+
+
+def measure(statement, number: int) -> float:
+    """Best time per call in milliseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=3)) / number * 1e3
+
+
+def cases():
+    transcription = PredictedTranscription(
+        type="transcription",
+        transcriptions=[
+            PredictWordLevel(
+                start=i * 0.3,
+                end=i * 0.3 + 0.25,
+                word=random.choice(WORDS),
+                confidence=random.random(),
+            )
+            for i in range(50_000)
+        ],
+    )
+    detections = Batch[PredictBbox](
+        type="batch",
+        items=[
+            PredictBbox(
+                x=random.random() / 2,
+                y=random.random() / 2,
+                width=random.random() / 2,
+                height=random.random() / 2,
+                label=random.choice(["car", "person", "bike"]),
+                confidence=random.random(),
+            )
+            for _ in range(10_000)
+        ],
+    )
+    audio = AudioBytesData(
+        data=os.urandom(48_000 * 2 * 10), frames=480_000, channels=1, sample_rate=48_000
+    )
+    task = Task(input=TextData, output=TextData, input_data=TextData(text="hello"))
+    return [
+        ("transcription 50k words", transcription, 5),
+        ("Batch of 10k bboxes", detections, 5),
+        ("audio 10s bytes", audio, 20),
+        ("small task", task, 2_000),
+    ]
+
+
+def main():
+    print(
+        f"{'case':<26}{'json KB':>10}{'bin KB':>10}"
+        f"{'json enc':>10}{'bin enc':>10}{'json dec':>10}{'bin dec':>10}  (ms)"
+    )
+    for name, model, number in cases():
+        type_ = type(model)
+        binary_payload = encode(model)
+        binary = (
+            f"{len(binary_payload) / 1024:>10.1f}",
+            f"{measure(lambda: encode(model), number):>10.3f}",
+            f"{measure(lambda: decode(binary_payload, type_), number):>10.3f}",
+        )
+        json_decode = (
+            task_from_json if isinstance(model, Task) else type_.model_validate_json
+        )
+        try:
+            json_payload = model.model_dump_json()
+        except PydanticSerializationError:
+            # Raw bytes that are not utf-8 cannot be written in JSON
+            json = (f"{'-':>10}",) * 3
+        else:
+            json = (
+                f"{len(json_payload) / 1024:>10.1f}",
+                f"{measure(model.model_dump_json, number):>10.3f}",
+                f"{measure(lambda: json_decode(json_payload), number):>10.3f}",
+            )
+        print(
+            f"{name:<26}{json[0]}{binary[0]}{json[1]}{binary[1]}{json[2]}{binary[2]}"
+        )
+
+if __name__ == "__main__":
+    main()
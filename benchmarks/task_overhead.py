@@ -0,0 +1,64 @@
+"""
+Per-task framework overhead of `Service.run` for each validation level.
+
+Run with:
+    uv run python benchmarks/task_overhead.py
+"""
+
+import timeit
+from typing import Type
+
+from zendata.data.text.text import TextData
+from zendata.tasks.base import BaseTask, ValidationLevel
+from zendata.tasks.service import Service
+from zendata.tasks.task import Task
+
+NUMBER = 20_000
+
+
+class EchoTask(BaseTask):
+    input: Type[TextData] = TextData
+    output: Type[TextData] = TextData
+
+
+class EchoService(Service):
+    def apply(self, task: Task, *args, **kwargs) -> Task:
+        task.output_data = task.input_data
+        return task
+
+
+def measure(statement, number: int = NUMBER) -> float:
+    """Best time per call in microseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    data = TextData(text="hello")
+    print(f"{'case':<32}{'us/task':>10}")
+    print(
+        f"{'Task(...)':<32}"
+        f"{measure(lambda: Task(input=TextData, output=TextData, input_data=data)):>10.2f}"
+    )
+    print(
+        f"{'Task.trusted(...)':<32}"
+        f"{measure(lambda: Task.trusted(input=TextData, output=TextData, input_data=data)):>10.2f}"
+    )
+    for level in ValidationLevel:
+        service = EchoService(
+            task_definition=EchoTask(),
+            name="echo",
+            callback=lambda task: None,
+            validation=level,
+        )
+        print(f"{'run ' + level.value:<32}{measure(lambda: service.run(data)):>10.2f}")
+    service = EchoService(
+        task_definition=EchoTask(),
+        name="echo",
+        callback=lambda task: None,
+        metrics=False,
+    )
+    print(f"{'run strict, metrics off':<32}{measure(lambda: service.run(data)):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,15 @@
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from zendata.data.ml.generation.text import Conversation, Message
-from zendata.tasks.service import Service
+from zendata.tasks.async_service import AsyncService
+from zendata.tasks.metrics import default_metrics
 from zendata.tasks.task import BaseTask, Task
 from zendata.api.health import Health
+from zendata.api.probes import HealthProbes
 
 
-class LLMService(Service):
-    def apply(self, task: Task) -> Task:
+class LLMService(AsyncService):
+    async def apply(self, task: Task) -> Task:
         # Your core logic
         task.output_data = Message(user_id="system", message="Noting to add")
         return task
@@ -15,7 +17,9 @@ class LLMService(Service):
 
 llm_task_definition = BaseTask(input=Message, output=Message)
 
-llm_service = LLMService(task_definition=llm_task_definition, name="fake_llm")
+llm_service = LLMService(
+    task_definition=llm_task_definition, name="fake_llm", max_concurrency=100
+)
 
 fake_conversation_db: dict[str, Conversation] = {}
 
@@ -23,13 +27,13 @@ app = FastAPI()
 
 
 @app.post("/conversation/{conversation_id}/message", response_model=Conversation)
-def send_message(conversation_id: str, message: Message):
+async def send_message(conversation_id: str, message: Message):
     if conversation_id not in fake_conversation_db:
         fake_conversation_db[conversation_id] = Conversation(
             conversation_id=conversation_id, messages=[]
         )
     fake_conversation_db[conversation_id].messages.append(message)
-    task = llm_service.run(input_data=message)
+    task = await llm_service.run(input_data=message)
     fake_conversation_db[conversation_id].messages.append(task.output_data)
 
     return fake_conversation_db[conversation_id]
@@ -44,22 +48,27 @@ def get_conversation(conversation_id: str):
     return fake_conversation_db[conversation_id]
 
 
-health = Health(
-    status="healthy",
-    name="service-main",
-    status_code=200,
-    error=None,
-    dependencies=[
-        Health(
-            name="service-second",
-            status_code=503,
-            status="unhealthy",
-            error="Bad request",
-        )
-    ],
-)
+health_probes = HealthProbes(name="service-main", ttl=5.0, timeout=1.0)
+
+
+@health_probes.register("service-second")
+async def probe_second_service() -> Health:
+    # Call the dependency here, e.g. its own /health/ endpoint
+    return Health(
+        name="service-second",
+        status_code=503,
+        status="unhealthy",
+        error="Bad request",
+    )
 
 
 @app.get("/health/", response_model=Health)
-def get_conversation():
+async def get_health():
+    health = await health_probes.get()
     return JSONResponse(content=health.model_dump(), status_code=health.status_code)
+
+
+@app.get("/metrics")
+def get_metrics():
+    # Metrics of every service, in the Prometheus text format
+    return PlainTextResponse(default_metrics.prometheus())
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional, Union
+from .health import Health
+
+ProbeResult = Union[Health, bool, None]
+Probe = Callable[[], Awaitable[ProbeResult]]
+
+# Status code of a dependency whose probe failed or timed out
+UNAVAILABLE = 503
+TIMEOUT = 504
+
+
+class HealthProbes:
+    """
+    Health of a service computed from async probes of its dependencies.
+
+    A probe is a coroutine function returning a `Health` (for dependencies
+    with their own dependencies), False when unhealthy, or True/None when
+    healthy; a probe raising or exceeding its timeout makes its dependency
+    unhealthy. All probes run concurrently and the aggregated `Health` is
+    cached for `ttl` seconds: `get` serves it from cache and, once stale,
+    returns the previous one while a single refresh runs in the background.
+    """
+
+    def __init__(self, name: str, ttl: float = 5.0, timeout: float = 1.0):
+        if ttl < 0 or timeout <= 0:
+            raise ValueError("ttl must be positive or zero and timeout positive")
+        self.name = name
+        self.ttl = ttl
+        self.timeout = timeout
+        self.probes: dict[str, tuple[Probe, float]] = {}
+        self._health: Optional[Health] = None
+        self._checked_at = -float("inf")
+        self._refresh: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def register(
+        self,
+        name: str,
+        probe: Optional[Probe] = None,
+        timeout: Optional[float] = None,
+    ):
+        """Add the probe of a dependency, usable as a decorator without `probe`."""
+
+        def add(probe: Probe) -> Probe:
+            self.probes[name] = (probe, timeout or self.timeout)
+            self.invalidate()
+            return probe
+
+        return add if probe is None else add(probe)
+
+    def unregister(self, name: str):
+        del self.probes[name]
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget the cached health, the next `get` probes again."""
+        self._health = None
+        self._checked_at = -float("inf")
+
+    @property
+    def is_fresh(self) -> bool:
+        return (
+            self._health is not None
+            and time.monotonic() - self._checked_at < self.ttl
+        )
+
+    async def probe(self, name: str) -> Health:
+        """Run a single probe within its timeout."""
+        probe, timeout = self.probes[name]
+        try:
+            result = await asyncio.wait_for(probe(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return Health(
+                name=name,
+                status="unhealthy",
+                status_code=TIMEOUT,
+                error=f"probe did not complete within {timeout} seconds",
+            )
+        except Exception as e:
+            return Health(
+                name=name, status="unhealthy", status_code=UNAVAILABLE, error=str(e)
+            )
+        if isinstance(result, Health):
+            return result
+        if result is False:
+            return Health(name=name, status="unhealthy", status_code=UNAVAILABLE)
+        return Health(name=name)
+
+    async def check(self) -> Health:
+        """Run every probe concurrently and cache the aggregated health."""
+        dependencies = await asyncio.gather(*map(self.probe, list(self.probes)))
+        health = Health(name=self.name, dependencies=list(dependencies))
+        self._health, self._checked_at = health, time.monotonic()
+        return health
+
+    def refresh(self) -> asyncio.Task:
+        """Task of the running refresh, started if there is none."""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.get_running_loop().create_task(self.check())
+        return self._refresh
+
+    async def get(self) -> Health:
+        """
+        Cached health: fresh, stale while a background refresh runs, or
+        probed now when nothing was cached yet. Concurrent callers share
+        the same refresh.
+        """
+        if self.is_fresh:
+            return self._health
+        refresh = self.refresh()
+        if self._health is not None:
+            return self._health
+        return await asyncio.shield(refresh)
+
+    async def _refresh_forever(self, interval: float):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(interval)
+
+    def start(self, interval: Optional[float] = None):
+        """Refresh every `interval` seconds (`ttl` by default) in the background."""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.get_running_loop().create_task(
+                self._refresh_forever(self.ttl if interval is None else interval)
+            )
+
+    async def stop(self):
+        """Stop the background refresh started by `start`."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
@@ -0,0 +1,349 @@
+import json
+import sys
+from array import array
+from functools import lru_cache
+from itertools import accumulate, repeat
+from operator import attrgetter
+from typing import Any, Callable, Optional, Type
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from .registry import default_registry
+
+MAGIC = b"ZDB"
+VERSION = 2
+
+# Block tags
+_BYTES, _TABLE = range(2)
+# Column tags of a table
+_COL_INT, _COL_FLOAT, _COL_BOOL, _COL_STR, _COL_JSON, _COL_BYTES = range(6)
+
+_INT64_MIN, _INT64_MAX = -(2**63), 2**63 - 1
+_LITTLE_ENDIAN = sys.byteorder == "little"
+_BYTES_TYPES = (bytes, bytearray, memoryview)
+# Values of a bytes column, None included
+_BYTES_COLUMN_TYPES = {*_BYTES_TYPES, type(None)}
+# Values always left to the JSON part
+_JSON_TYPES = {type(None), bool, int, float, str, dict, tuple}
+# Typecodes of dictionary codes and the number of distinct values they fit
+_CODES = (("B", 0x100), ("H", 0x10000), ("I", 0x100000000))
+
+# Functions rebuilding models of a type (and its subclasses) from decoded
+# values instead of `model_validate`, see `register_loader`
+_loaders: dict[type, Callable[[dict], BaseModel]] = {}
+
+
+def register_loader(type_: Type[BaseModel], load: Callable[[dict], BaseModel]):
+    """Rebuild decoded models of `type_` and its subclasses with `load`."""
+    _loaders[type_] = load
+
+
+def _loader(type_: Type[BaseModel]) -> Callable[[dict], BaseModel]:
+    for base in type_.__mro__:
+        load = _loaders.get(base)
+        if load is not None:
+            return load
+    return type_.model_validate
+
+
+def _pack_array(typecode: str, values: list) -> bytes:
+    packed = array(typecode, values)
+    if not _LITTLE_ENDIAN:
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_array(typecode: str, data: bytes) -> list:
+    unpacked = array(typecode)
+    unpacked.frombytes(data)
+    if not _LITTLE_ENDIAN:
+        unpacked.byteswap()
+    return unpacked.tolist()
+
+
+def _write_uint(out: bytearray, value: int):
+    """LEB128 varint: 7 bits per byte, lengths below 128 take one byte."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_blob(out: bytearray, data: Any):
+    data = memoryview(data).cast("B")
+    _write_uint(out, data.nbytes)
+    out += data
+
+
+def _write_text(out: bytearray, value: str):
+    _write_blob(out, value.encode())
+
+
+@lru_cache(maxsize=1024)
+def _is_model(type_: type) -> bool:
+    return issubclass(type_, BaseModel)
+
+
+@lru_cache(maxsize=1024)
+def _is_plain(type_: Type[BaseModel]) -> bool:
+    """Whether `model_dump` of the type only holds the values of its fields."""
+    decorators = type_.__pydantic_decorators__
+    return not (
+        decorators.field_serializers
+        or decorators.model_serializers
+        or type_.model_computed_fields
+        or type_.model_config.get("extra") == "allow"
+        or any(field.exclude for field in type_.model_fields.values())
+    )
+
+
+def _collect(model: BaseModel, path: list, blocks: list) -> dict:
+    """
+    Find the bytes fields and the lists of models of a same type, which are
+    written as blocks, and return their `exclude` spec for the JSON part.
+    """
+    exclude = {}
+    values = model.__dict__
+    for name in type(model).__pydantic_fields__:
+        value = values.get(name)
+        kind = type(value)
+        if kind in _JSON_TYPES:
+            continue
+        if kind is list:
+            if len(value) < 2:
+                continue
+            item_type = type(value[0])
+            if (
+                _is_model(item_type)
+                and _is_plain(item_type)
+                and set(map(type, value)) == {item_type}
+            ):
+                blocks.append((path + [name], _TABLE, value))
+                exclude[name] = True
+        elif kind in _BYTES_TYPES:
+            blocks.append((path + [name], _BYTES, value))
+            exclude[name] = True
+        elif _is_model(kind):
+            nested = _collect(value, path + [name], blocks)
+            if nested:
+                exclude[name] = nested
+    return exclude
+
+
+def _write_table(out: bytearray, items: list):
+    """Models of a same type written as one column per field."""
+    names = list(type(items[0]).__pydantic_fields__)
+    _write_uint(out, len(items))
+    _write_uint(out, len(names))
+    for name in names:
+        _write_text(out, name)
+        _write_column(out, list(map(attrgetter(name), items)))
+
+
+def _write_column(out: bytearray, values: list):
+    kinds = set(map(type, values))
+    if kinds == {float}:
+        out.append(_COL_FLOAT)
+        out += _pack_array("d", values)
+    elif kinds == {int} and _INT64_MIN <= min(values) <= max(values) <= _INT64_MAX:
+        out.append(_COL_INT)
+        out += _pack_array("q", values)
+    elif kinds == {bool}:
+        out.append(_COL_BOOL)
+        out += bytes(values)
+    elif kinds == {str}:
+        # Dictionary encoded: each distinct value is written once, followed
+        # by the code of each row on as few bytes as possible
+        distinct = list(dict.fromkeys(values))
+        codes = dict(zip(distinct, range(len(distinct))))
+        typecode = next(code for code, size in _CODES if len(distinct) <= size)
+        out.append(_COL_STR)
+        _write_uint(out, len(distinct))
+        out += _pack_array("I", list(map(len, distinct)))
+        _write_text(out, "".join(distinct))
+        out += typecode.encode()
+        out += _pack_array(typecode, list(map(codes.__getitem__, values)))
+    elif kinds <= _BYTES_COLUMN_TYPES and kinds != {type(None)}:
+        # Raw values one after the other, preceded by the size of each plus
+        # one, 0 standing for None
+        blobs = [
+            None if value is None else memoryview(value).cast("B") for value in values
+        ]
+        out.append(_COL_BYTES)
+        out += _pack_array(
+            "Q", [0 if blob is None else blob.nbytes + 1 for blob in blobs]
+        )
+        for blob in blobs:
+            if blob is not None:
+                out += blob
+    else:
+        out.append(_COL_JSON)
+        _write_blob(out, to_json(values))
+
+
+def _read_uint(data: bytes, pos: int) -> tuple[int, int]:
+    byte = data[pos]
+    pos += 1
+    if byte < 0x80:
+        return byte, pos
+    value, shift = byte & 0x7F, 7
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _read_blob(data: bytes, pos: int) -> tuple[bytes, int]:
+    size, pos = _read_uint(data, pos)
+    end = pos + size
+    if end > len(data):
+        raise IndexError("blob out of range")
+    return data[pos:end], end
+
+
+def _read_text(data: bytes, pos: int) -> tuple[str, int]:
+    blob, pos = _read_blob(data, pos)
+    return blob.decode(), pos
+
+
+def _read_array(data: bytes, pos: int, typecode: str, size: int) -> tuple[list, int]:
+    end = pos + array(typecode).itemsize * size
+    if end > len(data):
+        raise IndexError("array out of range")
+    return _unpack_array(typecode, data[pos:end]), end
+
+
+def _read_table(data: bytes, pos: int) -> tuple[list[dict], int]:
+    rows, pos = _read_uint(data, pos)
+    size, pos = _read_uint(data, pos)
+    names, columns = [], []
+    for _ in range(size):
+        name, pos = _read_text(data, pos)
+        column, pos = _read_column(data, pos, rows)
+        names.append(name)
+        columns.append(column)
+    return list(map(dict, map(zip, repeat(names), zip(*columns)))), pos
+
+
+def _read_column(data: bytes, pos: int, rows: int) -> tuple[list, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _COL_FLOAT:
+        return _read_array(data, pos, "d", rows)
+    if tag == _COL_INT:
+        return _read_array(data, pos, "q", rows)
+    if tag == _COL_BOOL:
+        values, pos = _read_array(data, pos, "B", rows)
+        return list(map(bool, values)), pos
+    if tag == _COL_STR:
+        size, pos = _read_uint(data, pos)
+        lengths, pos = _read_array(data, pos, "I", size)
+        text, pos = _read_text(data, pos)
+        offsets = list(accumulate(lengths, initial=0))
+        distinct = list(map(text.__getitem__, map(slice, offsets, offsets[1:])))
+        typecode = chr(data[pos])
+        if typecode not in "BHI":
+            raise ValueError(f"Unknown code typecode {typecode}")
+        codes, pos = _read_array(data, pos + 1, typecode, rows)
+        return list(map(distinct.__getitem__, codes)), pos
+    if tag == _COL_BYTES:
+        sizes, pos = _read_array(data, pos, "Q", rows)
+        values = []
+        for size in sizes:
+            if not size:
+                values.append(None)
+                continue
+            end = pos + size - 1
+            if end > len(data):
+                raise IndexError("bytes out of range")
+            values.append(data[pos:end])
+            pos = end
+        return values, pos
+    if tag == _COL_JSON:
+        blob, pos = _read_blob(data, pos)
+        values = json.loads(blob)
+        if len(values) != rows:
+            raise ValueError("Column length does not match its table")
+        return values, pos
+    raise ValueError(f"Unknown column tag {tag}")
+
+
+def encode(model: BaseModel) -> bytes:
+    """
+    Binary encoding of a `BaseData`, `Task` or any pydantic model.
+
+    The payload starts with the schema id of the model (its type registry
+    path). Bytes fields are then written raw and lists of models of a same
+    type as typed columns instead of repeating their keys, the rest of the
+    model ends the payload as `model_dump_json`. Payloads are smaller than
+    JSON and need no base64, but are not faster to encode or decode.
+    """
+    blocks = []
+    exclude = _collect(model, [], blocks)
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _write_text(out, default_registry.path_of(type(model)))
+    _write_uint(out, len(blocks))
+    for path, tag, value in blocks:
+        _write_text(out, json.dumps(path))
+        out.append(tag)
+        if tag == _BYTES:
+            _write_blob(out, value)
+        else:
+            _write_table(out, value)
+    # `model_dump_json` as bytes
+    serializer = model.__pydantic_serializer__
+    return b"".join((out, serializer.to_json(model, exclude=exclude or None)))
+
+
+def schema_of(payload: Any) -> str:
+    """Schema id written in an `encode` payload."""
+    return _header(bytes(payload))[0]
+
+
+def decode(payload: Any, type_: Optional[Type[BaseModel]] = None) -> BaseModel:
+    """
+    Rebuild a model encoded by `encode`. The class is resolved from the
+    schema id unless `type_` is given, which is needed for parametrized
+    generic models such as `Batch[PredictBbox]` that are not registered.
+    """
+    data = payload if isinstance(payload, bytes) else bytes(payload)
+    schema, pos = _header(data)
+    try:
+        size, pos = _read_uint(data, pos)
+        blocks = []
+        for _ in range(size):
+            path, pos = _read_text(data, pos)
+            tag = data[pos]
+            if tag == _BYTES:
+                value, pos = _read_blob(data, pos + 1)
+            elif tag == _TABLE:
+                value, pos = _read_table(data, pos + 1)
+            else:
+                raise ValueError(f"Unknown block tag {tag}")
+            blocks.append((json.loads(path), value))
+        values = json.loads(data[pos:])
+        for (*parents, name), value in blocks:
+            target = values
+            for parent in parents:
+                target = target[parent]
+            target[name] = value
+    except (IndexError, KeyError, TypeError, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("Truncated zendata binary payload")
+    if type_ is None:
+        type_ = default_registry.resolve(schema)
+    return _loader(type_)(values)
+
+
+def _header(data: bytes) -> tuple[str, int]:
+    size = len(MAGIC)
+    if len(data) <= size or data[:size] != MAGIC or data[size] != VERSION:
+        raise ValueError("Not a zendata binary payload")
+    try:
+        return _read_text(data, size + 1)
+    except (IndexError, UnicodeDecodeError):
+        raise ValueError("Truncated zendata binary payload")
@@ -0,0 +1,173 @@
+from array import array
+from functools import lru_cache
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    Generic,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
+from pydantic import BaseModel, TypeAdapter
+from .batch import Batch
+
+T = TypeVar("T", bound=BaseModel)
+
+# Typed array used for the columns of these field types, lists otherwise
+_TYPECODES = {float: "d", int: "q"}
+
+Column = Union[array, list]
+
+
+@lru_cache(maxsize=1024)
+def _column_adapter(item_type: Type[BaseModel], name: str) -> TypeAdapter:
+    field = item_type.model_fields[name]
+    annotation = field.annotation
+    if field.metadata:
+        annotation = Annotated[(annotation, *field.metadata)]
+    return TypeAdapter(list[annotation])
+
+
+def _to_column(item_type: Type[BaseModel], name: str, values: Iterable) -> Column:
+    typecode = _TYPECODES.get(item_type.model_fields[name].annotation)
+    if typecode is None:
+        return values if isinstance(values, list) else list(values)
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    try:
+        return array(typecode, values)
+    except OverflowError:
+        return list(values)
+
+
+class ColumnarBatch(Generic[T]):
+    """
+    Batch of `item_type` models stored as one column per field: float and
+    int fields are typed arrays, other fields are lists. Columns are
+    validated as a whole instead of row by row, and rows are only built,
+    without validation, when they are accessed.
+    """
+
+    def __init__(
+        self,
+        item_type: Type[T],
+        columns: dict[str, Iterable[Any]],
+        validate: bool = True,
+    ):
+        self.item_type = item_type
+        self.columns: dict[str, Column] = {}
+        length = None
+        for name, values in columns.items():
+            if name not in item_type.model_fields:
+                raise ValueError(f"{item_type.__name__} has no field {name}")
+            if validate:
+                values = _column_adapter(item_type, name).validate_python(values)
+            column = _to_column(item_type, name, values)
+            if length is not None and len(column) != length:
+                raise ValueError(
+                    f"Column {name} has {len(column)} values, expected {length}"
+                )
+            length = len(column)
+            self.columns[name] = column
+        self._length = length or 0
+        for name, field in item_type.model_fields.items():
+            if name in self.columns:
+                continue
+            if field.is_required():
+                raise ValueError(f"Missing column {name} of {item_type.__name__}")
+            defaults = [
+                field.get_default(call_default_factory=True) for _ in range(len(self))
+            ]
+            self.columns[name] = _to_column(item_type, name, defaults)
+
+    @classmethod
+    def from_items(
+        cls, items: Sequence[T], item_type: Optional[Type[T]] = None
+    ) -> "ColumnarBatch[T]":
+        """Columns of already validated models."""
+        if item_type is None:
+            if not items:
+                raise ValueError("item_type is required for an empty batch")
+            item_type = type(items[0])
+        return cls(
+            item_type,
+            {
+                name: [getattr(item, name) for item in items]
+                for name in item_type.model_fields
+            },
+            validate=False,
+        )
+
+    @classmethod
+    def from_batch(
+        cls, batch: Batch, item_type: Optional[Type[T]] = None
+    ) -> "ColumnarBatch[T]":
+        if item_type is None:
+            args = type(batch).__pydantic_generic_metadata__["args"]
+            item_type = args[0] if args else None
+        return cls.from_items(batch.items, item_type)
+
+    def to_batch(self, **kwargs) -> Batch:
+        """`Batch[item_type]` of the rows, `kwargs` are given to the batch."""
+        kwargs.setdefault("type", "batch")
+        return Batch[self.item_type](items=list(self), **kwargs)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> T:
+        values = {name: column[index] for name, column in self.columns.items()}
+        return self.item_type.model_construct(**values)
+
+    def __iter__(self) -> Iterator[T]:
+        construct = self.item_type.model_construct
+        names = list(self.columns)
+        for row in zip(*self.columns.values()):
+            yield construct(**dict(zip(names, row)))
+
+    def column(self, name: str) -> Column:
+        return self.columns[name]
+
+    def take(self, indices: Iterable[int]) -> "ColumnarBatch[T]":
+        """Rows at `indices`, in this order."""
+        indices = list(indices)
+        columns = {}
+        for name, column in self.columns.items():
+            values = map(column.__getitem__, indices)
+            columns[name] = (
+                array(column.typecode, values)
+                if isinstance(column, array)
+                else list(values)
+            )
+        return ColumnarBatch(self.item_type, columns, validate=False)
+
+    def filter(self, mask: Iterable[bool]) -> "ColumnarBatch[T]":
+        """Rows where `mask` is true."""
+        return self.take(index for index, keep in enumerate(mask) if keep)
+
+    def where(self, name: str, predicate: Callable[[Any], bool]) -> "ColumnarBatch[T]":
+        """Rows whose `name` value matches `predicate`."""
+        return self.filter(map(predicate, self.columns[name]))
+
+    def argsort(
+        self, by: Union[str, Sequence[str]], reverse: bool = False
+    ) -> list[int]:
+        """Row indices sorted on one or several columns."""
+        names = [by] if isinstance(by, str) else list(by)
+        if len(names) == 1:
+            key = self.columns[names[0]].__getitem__
+        else:
+            keys = list(zip(*(self.columns[name] for name in names)))
+            key = keys.__getitem__
+        return sorted(range(len(self)), key=key, reverse=reverse)
+
+    def sort(
+        self, by: Union[str, Sequence[str]], reverse: bool = False
+    ) -> "ColumnarBatch[T]":
+        """Rows sorted on one or several columns."""
+        return self.take(self.argsort(by, reverse))
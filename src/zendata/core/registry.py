@@ -0,0 +1,96 @@
+import importlib
+import threading
+from typing import Any, Iterable, Optional, get_origin
+
+
+def is_generic_alias(type_: Any) -> bool:
+    """True for parametrized types such as `list[Message]`."""
+    return not isinstance(type_, type) and isinstance(get_origin(type_), type)
+
+
+def default_path(type_: Any) -> str:
+    if is_generic_alias(type_):
+        return repr(type_)
+    return f"{type_.__module__}.{type_.__name__}"
+
+
+class TypeRegistry:
+    """
+    Two-way mapping between types and their 'module.submodule.ClassName' path.
+
+    Resolved paths are memoized so that a path is imported only once. Types
+    can be registered explicitly, which is required for generic aliases such
+    as `list[Message]`. With `allow_imports=False` only registered types are
+    resolved, and `allowed_modules` restricts imports to these module
+    prefixes.
+    """
+
+    def __init__(
+        self, allow_imports: bool = True, allowed_modules: Optional[Iterable[str]] = None
+    ):
+        self.allow_imports = allow_imports
+        self.allowed_modules = (
+            tuple(allowed_modules) if allowed_modules is not None else None
+        )
+        self._types: dict[str, Any] = {}
+        self._paths: dict[Any, str] = {}
+        self._lock = threading.Lock()
+
+    def register(self, type_: Any, path: Optional[str] = None) -> str:
+        """Register a type (or generic alias) under `path`, its default path otherwise."""
+        path = path or default_path(type_)
+        with self._lock:
+            self._types[path] = type_
+            self._paths[type_] = path
+        return path
+
+    def path_of(self, type_: Any) -> str:
+        path = self._paths.get(type_)
+        return path if path is not None else default_path(type_)
+
+    def is_allowed(self, module_path: str) -> bool:
+        if not self.allow_imports:
+            return False
+        if self.allowed_modules is None:
+            return True
+        return any(
+            module_path == allowed or module_path.startswith(allowed.rstrip(".") + ".")
+            for allowed in self.allowed_modules
+        )
+
+    def resolve(self, path: str) -> Any:
+        type_ = self._types.get(path)
+        if type_ is not None:
+            return type_
+
+        if "[" in path:
+            raise ImportError(f"Generic alias {path} must be registered first")
+        if "." not in path:
+            raise ValueError(f"Cannot import {path}: expected 'module.ClassName'")
+        module_path, class_name = path.rsplit(".", 1)
+        if not self.is_allowed(module_path):
+            raise ImportError(f"Import of {path} is not allowed, register it first")
+        module = importlib.import_module(module_path)
+        try:
+            type_ = getattr(module, class_name)
+        except AttributeError:
+            raise ImportError(
+                f"Cannot import name {class_name} from module {module_path}"
+            )
+        with self._lock:
+            self._types[path] = type_
+            self._paths.setdefault(type_, path)
+        return type_
+
+    def clear(self):
+        with self._lock:
+            self._types.clear()
+            self._paths.clear()
+
+
+default_registry = TypeRegistry()
+
+
+def register_type(type_: Any, path: Optional[str] = None) -> str:
+    """Register a type in the registry used by tasks and the binary codec."""
+    return default_registry.register(type_, path)
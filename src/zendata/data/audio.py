@@ -1,7 +1,18 @@
-from typing import Union
-from pydantic import Field, model_validator
+import base64
+from typing import Any, Iterator, Literal, Union
+from pydantic import ConfigDict, Field, field_serializer, model_validator
 
-from zendata.data.vectors.tensor import TensorInput
+from zendata.data.vectors.tensor import DType, TensorInput, as_byte_view
+
+# uint8 being 8-bit WAVE samples, centered on 128
+PCM_FORMATS = (DType.UINT8, DType.INT16, DType.INT32, DType.FLOAT32, DType.FLOAT64)
+
+
+def _is_untyped(data: Any) -> bool:
+    """Raw bytes, whose sample format is not known from the buffer."""
+    return isinstance(data, (bytes, bytearray)) or (
+        isinstance(data, memoryview) and data.format == "B"
+    )
 
 
 class AudioData(TensorInput):
@@ -34,3 +45,158 @@ class AudioData(TensorInput):
 class AudioBytesData(AudioData):
     type: str = "audio-bytes-data"
     data: bytes = Field(..., description="Audio frames in bytes")
+
+
+class AudioPCMData(AudioData):
+    """
+    Audio samples kept in a contiguous PCM buffer (bytes, bytearray,
+    memoryview, array.array, numpy array...) without per-sample objects.
+    Samples are `uint8`, `int16`, `int32`, `float32` or `float64`,
+    `interleaved` (frame after frame) or `planar` (channel after channel).
+    Typed buffers give their sample format, raw bytes default to `int16`.
+    Validation only checks the buffer size.
+    """
+
+    type: str = "audio-pcm-data"
+    data: Any = Field(..., description="PCM buffer")
+    sample_format: DType = Field(DType.INT16, description="Type of each sample")
+    layout: Literal["interleaved", "planar"] = Field(
+        "interleaved", description="Order of the samples in the buffer"
+    )
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @model_validator(mode="before")
+    @classmethod
+    def infer_frames(cls, values):
+        if not isinstance(values, dict):
+            return values
+        data = values.get("data")
+        if isinstance(data, str):
+            data = base64.b64decode(data)
+            values = {**values, "data": data}
+        sample_format = values.get("sample_format")
+        if data is not None and not _is_untyped(data):
+            # Typed buffers (array.array, numpy...) carry their sample format
+            typed = DType.from_format(memoryview(data).format)
+            if sample_format is None:
+                values = {**values, "sample_format": typed}
+            elif DType(sample_format) != typed:
+                raise ValueError(
+                    f"Buffer holds {typed.value} samples, not "
+                    f"{DType(sample_format).value}"
+                )
+        if values.get("frames") is None and values.get("channels"):
+            sample_format = DType(values.get("sample_format") or DType.INT16)
+            nbytes = as_byte_view(values["data"]).nbytes
+            values = {
+                **values,
+                "frames": nbytes // (sample_format.itemsize * values["channels"]),
+            }
+        return values
+
+    @model_validator(mode="after")
+    def check_buffer_size(self):
+        if self.sample_format not in PCM_FORMATS:
+            raise ValueError(
+                f"sample_format must be one of {[f.value for f in PCM_FORMATS]}"
+            )
+        expected = self.frames * self.channels * self.sample_format.itemsize
+        nbytes = as_byte_view(self.data).nbytes
+        if nbytes != expected:
+            raise ValueError(
+                f"Buffer holds {nbytes} bytes, expected {expected} for {self.frames} "
+                f"frames of {self.channels} {self.sample_format.value} channels"
+            )
+        self.shape = (
+            [self.frames, self.channels]
+            if self.layout == "interleaved"
+            else [self.channels, self.frames]
+        )
+        return self
+
+    @field_serializer("data")
+    def serialize_data(self, data: Any, info):
+        if info.mode_is_json():
+            return base64.b64encode(as_byte_view(data)).decode()
+        return bytes(as_byte_view(data))
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return self.samples()
+
+    def samples(self) -> memoryview:
+        """Zero-copy typed view shaped like `shape`."""
+        view = as_byte_view(self.data)
+        if self.frames == 0:
+            return view.cast(self.sample_format.format)
+        return view.cast(self.sample_format.format, self.shape)
+
+    def channel(self, index: int) -> memoryview:
+        """Zero-copy 1-D view of the samples of one channel."""
+        if not 0 <= index < self.channels:
+            raise IndexError(f"Channel {index} out of range")
+        flat = as_byte_view(self.data).cast(self.sample_format.format)
+        if self.layout == "interleaved":
+            return flat[index :: self.channels]
+        return flat[index * self.frames : (index + 1) * self.frames]
+
+    def numpy(self):
+        """Zero-copy numpy array shaped like `shape`, requires numpy."""
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("numpy is required, install zendata[numpy]")
+        array = np.frombuffer(as_byte_view(self.data), dtype=self.sample_format.value)
+        return array.reshape(self.shape)
+
+    def frame_at(self, seconds: float) -> int:
+        """Index of the frame at `seconds`, clamped to the audio."""
+        return min(max(int(round(seconds * self.sample_rate)), 0), self.frames)
+
+    def slice_frames(self, start: int, end: int) -> "AudioPCMData":
+        """
+        Frames [start, end). Interleaved audio is sliced without copy,
+        planar audio needs one copy to keep each channel contiguous.
+        """
+        start, end = max(start, 0), min(end, self.frames)
+        end = max(start, end)
+        frame_size = self.channels * self.sample_format.itemsize
+        view = as_byte_view(self.data)
+        if self.layout == "interleaved":
+            data = view[start * frame_size : end * frame_size]
+        else:
+            itemsize = self.sample_format.itemsize
+            data = b"".join(
+                view[(c * self.frames + start) * itemsize : (c * self.frames + end) * itemsize]
+                for c in range(self.channels)
+            )
+        return AudioPCMData(
+            data=data,
+            frames=end - start,
+            channels=self.channels,
+            sample_rate=self.sample_rate,
+            sample_format=self.sample_format,
+            layout=self.layout,
+            source_id=self.source_id or self.id,
+            extras={**(self.extras or {}), "offset": start / self.sample_rate},
+        )
+
+    def slice(self, start: float, end: float) -> "AudioPCMData":
+        """Audio between `start` and `end` seconds."""
+        return self.slice_frames(self.frame_at(start), self.frame_at(end))
+
+    def chunks(self, duration: float, overlap: float = 0.0) -> Iterator["AudioPCMData"]:
+        """
+        Yield windows of `duration` seconds, each starting `duration - overlap`
+        seconds after the previous one. The last window may be shorter.
+        """
+        if duration <= 0 or not 0 <= overlap < duration:
+            raise ValueError("duration must be positive and overlap in [0, duration)")
+        size = max(int(round(duration * self.sample_rate)), 1)
+        step = max(int(round((duration - overlap) * self.sample_rate)), 1)
+        start = 0
+        while start < self.frames:
+            yield self.slice_frames(start, start + size)
+            if start + size >= self.frames:
+                return
+            start += step
@@ -1,4 +1,8 @@
+from typing import Literal, Optional
 from pydantic import Field, model_validator
+from zendata.data.audio import AudioPCMData
+from zendata.data.files.payload import pcm_view
+from zendata.data.vectors.tensor import DType
 from .file import File
 
 
@@ -24,3 +28,12 @@ class Audio(File):
             values["duration"] = frames / sample_rate
 
         return values
+
+    def pcm(
+        self,
+        sample_format: Optional[DType] = None,
+        layout: Literal["interleaved", "planar"] = "interleaved",
+        offset: Optional[int] = None,
+    ) -> AudioPCMData:
+        """Samples as a zero-copy PCM view on the memory-mapped payload."""
+        return pcm_view(self, sample_format, layout, offset)
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional, TypeVar, Union
+
+from .payload import local_path
+
+CHUNK_SIZE = 1 << 20
+
+FileT = TypeVar("FileT")
+
+
+def hash_stream(
+    stream: BinaryIO, algorithm: str = "sha256", chunk_size: int = CHUNK_SIZE
+) -> tuple[str, int]:
+    """
+    Hash a binary stream chunk by chunk, return `('<algorithm>:<hexdigest>', size)`.
+    A single buffer is reused, so memory stays bounded by `chunk_size`.
+    """
+    digest = hashlib.new(algorithm)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    size = 0
+    readinto = getattr(stream, "readinto", None)
+    while True:
+        if readinto is not None:
+            read = readinto(view)
+            chunk = view[:read] if read else None
+        else:
+            chunk = stream.read(chunk_size)
+            read = len(chunk) if chunk else 0
+        if not read:
+            break
+        digest.update(chunk)
+        size += read
+    return f"{algorithm}:{digest.hexdigest()}", size
+
+
+class ChecksumCache:
+    """
+    Checksums of local files keyed on (path, mtime, size, algorithm), so
+    files that did not change since they were hashed are not read again.
+    Holds at most `max_items` entries, least recently used first out.
+    """
+
+    def __init__(self, max_items: Optional[int] = 100_000):
+        self.max_items = max_items
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: Union[str, Path], algorithm: str) -> tuple:
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, algorithm)
+
+    def get(self, key: tuple) -> Optional[str]:
+        with self._lock:
+            checksum = self._entries.get(key)
+            if checksum is not None:
+                self._entries.move_to_end(key)
+            return checksum
+
+    def set(self, key: tuple, checksum: str):
+        with self._lock:
+            self._entries[key] = checksum
+            self._entries.move_to_end(key)
+            if self.max_items is not None and len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+default_cache = ChecksumCache()
+
+
+def hash_path(
+    path: Union[str, Path],
+    algorithm: str = "sha256",
+    chunk_size: int = CHUNK_SIZE,
+    cache: Optional[ChecksumCache] = default_cache,
+) -> tuple[str, int]:
+    """Checksum and size of a local file, from `cache` when it did not change."""
+    key = ChecksumCache.key(path, algorithm) if cache is not None else None
+    if key is not None:
+        checksum = cache.get(key)
+        if checksum is not None:
+            return checksum, key[2]
+    with open(path, "rb", buffering=0) as stream:
+        checksum, size = hash_stream(stream, algorithm, chunk_size)
+    # Only cache when the file was not modified while it was read
+    if key is not None and ChecksumCache.key(path, algorithm) == key:
+        cache.set(key, checksum)
+    return checksum, size
+
+
+def hash_paths(
+    paths: Iterable[Union[str, Path]],
+    algorithm: str = "sha256",
+    chunk_size: int = CHUNK_SIZE,
+    cache: Optional[ChecksumCache] = default_cache,
+    max_workers: Optional[int] = None,
+) -> list[tuple[str, int]]:
+    """`hash_path` of every path, in parallel threads (hashlib releases the GIL)."""
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="zendata-checksum") as pool:
+        return list(
+            pool.map(lambda path: hash_path(path, algorithm, chunk_size, cache), paths)
+        )
+
+
+def fill_checksum(
+    file: FileT,
+    algorithm: str = "sha256",
+    chunk_size: int = CHUNK_SIZE,
+    cache: Optional[ChecksumCache] = default_cache,
+) -> FileT:
+    """
+    Set `file.checksum` from the content of its local `save_path`.
+    Raise ValueError when `file.size` does not match the content.
+    """
+    checksum, size = hash_path(local_path(file), algorithm, chunk_size, cache)
+    if size != file.size:
+        raise ValueError(
+            f"File {file.filename} has {size} bytes but its size is {file.size}"
+        )
+    file.checksum = checksum
+    return file
+
+
+def fill_checksums(
+    files: Iterable[FileT],
+    algorithm: str = "sha256",
+    chunk_size: int = CHUNK_SIZE,
+    cache: Optional[ChecksumCache] = default_cache,
+    max_workers: Optional[int] = None,
+) -> list[FileT]:
+    """`fill_checksum` of every file, in parallel threads."""
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="zendata-checksum") as pool:
+        return list(
+            pool.map(
+                lambda file: fill_checksum(file, algorithm, chunk_size, cache), files
+            )
+        )
@@ -1,7 +1,8 @@
-from pydantic import Field, HttpUrl
+from pydantic import Field, HttpUrl, PrivateAttr
 from pathlib import Path
 from typing import Union, Optional
 from zendata.data.base import BaseData
+from zendata.data.files.payload import FilePayload, local_path
 
 
 class File(BaseData):
@@ -17,3 +18,12 @@ class File(BaseData):
         None, description="Path to save file or URL if fetched from web"
     )
     checksum: Optional[str] = Field(None, description="File checksum (MD5/SHA256)")
+
+    _payload: Optional[FilePayload] = PrivateAttr(None)
+
+    @property
+    def payload(self) -> FilePayload:
+        """Content of the local `save_path`, memory-mapped on first read."""
+        if self._payload is None:
+            self._payload = FilePayload(local_path(self))
+        return self._payload
@@ -1,4 +1,7 @@
+from typing import Optional
 from pydantic import Field
+from zendata.data.files.payload import tensor_view
+from zendata.data.vectors.tensor import BufferTensorInput, DType
 from .file import File
 
 
@@ -6,3 +9,9 @@ class Image(File):
     type: str = "image"
     width: int = Field(..., description="Width of the image in pixels")
     height: int = Field(..., description="Height of the image in pixels")
+
+    def tensor(
+        self, dtype: DType = DType.UINT8, channels: Optional[int] = None, offset: int = 0
+    ) -> BufferTensorInput:
+        """Raw pixels as a zero-copy tensor view on the memory-mapped payload."""
+        return tensor_view(self, dtype, channels, offset)
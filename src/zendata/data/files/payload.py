@@ -0,0 +1,209 @@
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Literal, Optional, Union
+
+from zendata.data.audio import AudioPCMData
+from zendata.data.vectors.tensor import BufferTensorInput, DType
+
+
+class FilePayload:
+    """
+    Lazy read-only memory map of a local file.
+
+    The file is mapped on the first `read` and shared by every reader, so
+    the content is paged in by the OS instead of being copied in the heap.
+    `close` releases the mapping; it raises `BufferError` while views
+    returned by `read` are still alive (release them with
+    `view.release()` or `with payload.read() as view:`). A closed payload
+    is mapped again on the next `read`. Pickling keeps only the path.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    def __len__(self) -> int:
+        return len(self._map())
+
+    def read(self, start: int = 0, end: Optional[int] = None) -> memoryview:
+        """Zero-copy view of the bytes [start, end)."""
+        mapping = self._map()
+        return memoryview(mapping)[start:end]
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                try:
+                    self._mmap.close()
+                except BufferError:
+                    raise BufferError(
+                        f"Views of {self.path} are still in use, release them first"
+                    )
+                self._mmap = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "FilePayload":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def _map(self) -> Union[mmap.mmap, bytes]:
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "rb")
+                # Empty files cannot be mapped
+                if os.fstat(self._file.fileno()).st_size:
+                    self._mmap = mmap.mmap(
+                        self._file.fileno(), 0, access=mmap.ACCESS_READ
+                    )
+            return self._mmap if self._mmap is not None else b""
+
+
+def local_path(file) -> Path:
+    """`save_path` of a file when it is on the local file system."""
+    if not isinstance(file.save_path, Path):
+        raise ValueError(f"File {file.filename} has no local save_path")
+    return file.save_path
+
+
+# WAVE `fmt ` format tags
+_WAVE_PCM, _WAVE_FLOAT, _WAVE_EXTENSIBLE = 0x0001, 0x0003, 0xFFFE
+# Sample format of each (format tag, bits per sample) that can be viewed
+_WAVE_FORMATS = {
+    (_WAVE_PCM, 8): DType.UINT8,
+    (_WAVE_PCM, 16): DType.INT16,
+    (_WAVE_PCM, 32): DType.INT32,
+    (_WAVE_FLOAT, 32): DType.FLOAT32,
+    (_WAVE_FLOAT, 64): DType.FLOAT64,
+}
+
+
+def wav_format(view: memoryview) -> Optional[tuple[DType, int, int, int]]:
+    """
+    Sample format, channels, offset and size of the samples of a RIFF/WAVE
+    content, None for raw PCM. Raises `ValueError` for WAVE encodings that
+    cannot be viewed as samples, such as 24-bit or compressed audio.
+    """
+    if len(view) < 12 or view[0:4] != b"RIFF" or view[8:12] != b"WAVE":
+        return None
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = view[offset : offset + 4]
+        (chunk_size,) = struct.unpack_from("<I", view, offset + 4)
+        if chunk_id == b"fmt ":
+            if chunk_size < 16:
+                raise ValueError("WAVE fmt chunk is truncated")
+            fmt = struct.unpack_from("<HH4x4x2xH", view, offset + 8)
+            if fmt[0] == _WAVE_EXTENSIBLE:
+                if chunk_size < 40:
+                    raise ValueError("WAVE fmt chunk is truncated")
+                # The sub-format GUID starts with the actual format tag
+                (tag,) = struct.unpack_from("<H", view, offset + 32)
+                fmt = (tag, *fmt[1:])
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAVE content has no fmt chunk before its data")
+            tag, channels, bits = fmt
+            sample_format = _WAVE_FORMATS.get((tag, bits))
+            if sample_format is None:
+                raise ValueError(
+                    f"Unsupported WAVE encoding: format tag {tag:#06x} with "
+                    f"{bits} bits per sample"
+                )
+            size = min(chunk_size, len(view) - offset - 8)
+            return sample_format, channels, offset + 8, size
+        offset += 8 + chunk_size + chunk_size % 2
+    raise ValueError("WAVE content has no data chunk")
+
+
+def pcm_view(
+    audio,
+    sample_format: Optional[DType] = None,
+    layout: Literal["interleaved", "planar"] = "interleaved",
+    offset: Optional[int] = None,
+) -> AudioPCMData:
+    """
+    Samples of an audio file as a PCM view on its payload. The sample
+    format and position of the samples of WAVE files are read from their
+    header, which must match `sample_format` and the channels of `audio`.
+    Raw PCM, or any content when `offset` is given, starts at `offset` (0
+    by default) and is read as `sample_format` (int16 by default).
+    Compressed formats must be decoded first.
+    """
+    limit = None
+    if offset is None:
+        content = audio.payload.read()
+        try:
+            header = wav_format(content)
+        finally:
+            content.release()
+        if header is None:
+            offset = 0
+        else:
+            wav_sample_format, channels, offset, limit = header
+            if sample_format not in (None, wav_sample_format):
+                raise ValueError(
+                    f"{audio.filename} holds {wav_sample_format.value} samples, "
+                    f"not {DType(sample_format).value}"
+                )
+            if channels != audio.channels:
+                raise ValueError(
+                    f"{audio.filename} has {channels} channels, not {audio.channels}"
+                )
+            sample_format = wav_sample_format
+    sample_format = DType(sample_format or DType.INT16)
+    size = audio.frames * audio.channels * sample_format.itemsize
+    if limit is not None and size > limit:
+        raise ValueError(f"{audio.filename} holds less than {audio.frames} frames")
+    return AudioPCMData(
+        data=audio.payload.read(offset, offset + size),
+        frames=audio.frames,
+        channels=audio.channels,
+        sample_rate=audio.sample_rate,
+        sample_format=sample_format,
+        layout=layout,
+        source_id=audio.id,
+    )
+
+
+def tensor_view(
+    image,
+    dtype: DType = DType.UINT8,
+    channels: Optional[int] = None,
+    offset: int = 0,
+) -> BufferTensorInput:
+    """
+    Raw pixels of an image file as a [height, width, channels] tensor view
+    on its payload. `channels` is inferred from the payload size when not
+    given. Compressed formats (PNG, JPEG...) must be decoded first.
+    """
+    dtype = DType(dtype)
+    pixels = image.height * image.width
+    if channels is None:
+        channels = max((len(image.payload) - offset) // (pixels * dtype.itemsize), 1)
+    size = pixels * channels * dtype.itemsize
+    return BufferTensorInput(
+        data=image.payload.read(offset, offset + size),
+        dtype=dtype,
+        shape=[image.height, image.width, channels],
+        source_id=image.id,
+    )
@@ -0,0 +1,323 @@
+import math
+from array import array
+from typing import Literal, Optional, Sequence, Union
+
+from zendata.core.columnar import ColumnarBatch
+from .detection import GroundTruthBbox, PredictBbox, PredictedImageDetection
+
+try:
+    import numpy as np
+except ImportError:  # pure Python fallback
+    np = None
+
+Boxes = Union[Sequence[GroundTruthBbox], ColumnarBatch]
+
+# Largest group of boxes whose IoU matrix is computed at once
+_MAX_IOU_MATRIX = 2048
+
+
+def _column(boxes: Boxes, name: str) -> Sequence:
+    if isinstance(boxes, ColumnarBatch):
+        return boxes.columns[name]
+    return [getattr(box, name) for box in boxes]
+
+
+def _corners(boxes: Boxes):
+    """(x1, y1, x2, y2) of each box, a (N, 4) array with numpy."""
+    x, y = _column(boxes, "x"), _column(boxes, "y")
+    width, height = _column(boxes, "width"), _column(boxes, "height")
+    if np is not None:
+        x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        x2 = x + np.asarray(width, dtype=np.float64)
+        y2 = y + np.asarray(height, dtype=np.float64)
+        return np.stack([x, y, x2, y2], axis=1).reshape(-1, 4)
+    return [(x1, y1, x1 + w, y1 + h) for x1, y1, w, h in zip(x, y, width, height)]
+
+
+def _groups(labels: Sequence[str], class_aware: bool) -> list[int]:
+    if not class_aware:
+        return [0] * len(labels)
+    codes: dict[str, int] = {}
+    return [codes.setdefault(label, len(codes)) for label in labels]
+
+
+def _iou(a: tuple, b: tuple) -> float:
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    inter = width * height
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _iou_np(a, b):
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    sides = np.clip(bottom_right - top_left, 0, None)
+    inter = sides[..., 0] * sides[..., 1]
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def _iou_row_np(sides, areas, index: int, others):
+    """IoU of box `index` with the boxes `others`, `sides` being `corners.T`."""
+    x1, y1, x2, y2 = sides
+    width = np.minimum(x2[index], x2[others]) - np.maximum(x1[index], x1[others])
+    height = np.minimum(y2[index], y2[others]) - np.maximum(y1[index], y1[others])
+    inter = np.clip(width, 0, None) * np.clip(height, 0, None)
+    union = areas[index] + areas[others] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def iou_matrix(boxes: Boxes, others: Optional[Boxes] = None):
+    """
+    Pairwise IoU between `boxes` and `others` (`boxes` itself by default):
+    a (N, M) numpy array, or a list of lists without numpy.
+    """
+    a = _corners(boxes)
+    b = a if others is None else _corners(others)
+    if np is not None:
+        return _iou_np(a, b)
+    return [[_iou(box, other) for other in b] for box in a]
+
+
+def _select(boxes: Boxes, indices: list[int]) -> Boxes:
+    if isinstance(boxes, ColumnarBatch):
+        return boxes.take(indices)
+    return [boxes[index] for index in indices]
+
+
+def threshold(boxes: Boxes, min_confidence: float) -> Boxes:
+    """Boxes with a confidence of at least `min_confidence`."""
+    scores = _column(boxes, "confidence")
+    return _select(
+        boxes, [index for index, score in enumerate(scores) if score >= min_confidence]
+    )
+
+
+def _nms_group_np(corners, iou_threshold: float) -> list[int]:
+    """Greedy NMS of boxes of a single group sorted by decreasing score."""
+    if len(corners) <= _MAX_IOU_MATRIX:
+        overlaps = _iou_np(corners, corners) > iou_threshold
+        suppressed = np.zeros(len(corners), dtype=bool)
+        keep = []
+        for index in range(len(corners)):
+            if not suppressed[index]:
+                keep.append(index)
+                suppressed |= overlaps[index]
+        return keep
+    # Too many boxes for a square IoU matrix: one row at a time
+    order = np.arange(len(corners))
+    keep = []
+    while order.size:
+        index = order[0]
+        keep.append(int(index))
+        ious = _iou_np(corners[index : index + 1], corners[order[1:]])[0]
+        order = order[1:][ious <= iou_threshold]
+    return keep
+
+
+def _nms_indices(
+    corners, scores: Sequence[float], groups: Sequence[int], iou_threshold: float
+) -> list[int]:
+    if np is not None:
+        if not len(scores):
+            return []
+        scores = np.asarray(scores, dtype=np.float64)
+        groups = np.asarray(groups)
+        # By group, then by decreasing score within each group
+        order = np.lexsort((-scores, groups))
+        bounds = np.flatnonzero(np.diff(groups[order])) + 1
+        keep = []
+        for members in np.split(order, bounds):
+            kept = _nms_group_np(corners[members], iou_threshold)
+            keep.extend(members[kept].tolist())
+        keep = np.asarray(keep)
+        return keep[np.argsort(-scores[keep], kind="stable")].tolist()
+
+    order = sorted(range(len(scores)), key=lambda index: -scores[index])
+    keep: list[int] = []
+    for index in order:
+        if all(
+            groups[kept] != groups[index]
+            or _iou(corners[kept], corners[index]) <= iou_threshold
+            for kept in keep
+        ):
+            keep.append(index)
+    return keep
+
+
+def nms(
+    boxes: Boxes,
+    iou_threshold: float = 0.5,
+    class_aware: bool = True,
+    max_detections: Optional[int] = None,
+) -> Boxes:
+    """
+    Greedy non-maximum suppression: boxes by decreasing confidence, without
+    the ones overlapping a better box of the same label (any label when
+    `class_aware` is False) by more than `iou_threshold`.
+    """
+    keep = _nms_indices(
+        _corners(boxes),
+        _column(boxes, "confidence"),
+        _groups(_column(boxes, "label"), class_aware),
+        iou_threshold,
+    )
+    return _select(boxes, keep[:max_detections])
+
+
+def _soft_nms_np(
+    corners,
+    scores: Sequence[float],
+    groups: Sequence[int],
+    iou_threshold: float,
+    sigma: float,
+    method: str,
+    min_confidence: float,
+) -> tuple[list[int], list[float]]:
+    """Kept indices and decayed scores, one vectorized decay per kept box."""
+    scores = np.array(scores, dtype=np.float64)
+    groups = np.asarray(groups)
+    sides = np.ascontiguousarray(corners.T)
+    areas = (sides[2] - sides[0]) * (sides[3] - sides[1])
+    keep: list[int] = []
+    # Indices of the boxes still above min_confidence, in increasing order
+    remaining = np.flatnonzero(scores >= min_confidence)
+    while remaining.size:
+        position = int(np.argmax(scores[remaining]))
+        best = int(remaining[position])
+        keep.append(best)
+        remaining = np.delete(remaining, position)
+        same_group = remaining[groups[remaining] == groups[best]]
+        if not same_group.size:
+            continue
+        ious = _iou_row_np(sides, areas, best, same_group)
+        if method == "gaussian":
+            scores[same_group] *= np.exp(-(ious * ious) / sigma)
+        else:
+            scores[same_group] *= np.where(ious > iou_threshold, 1 - ious, 1.0)
+        remaining = remaining[scores[remaining] >= min_confidence]
+    return keep, scores.tolist()
+
+
+def _soft_nms(
+    corners,
+    scores: Sequence[float],
+    groups: Sequence[int],
+    iou_threshold: float,
+    sigma: float,
+    method: str,
+    min_confidence: float,
+) -> tuple[list[int], list[float]]:
+    scores = list(scores)
+    keep: list[int] = []
+    remaining = [index for index, score in enumerate(scores) if score >= min_confidence]
+    while remaining:
+        best = max(remaining, key=scores.__getitem__)
+        keep.append(best)
+        remaining.remove(best)
+        for index in remaining:
+            if groups[index] != groups[best]:
+                continue
+            iou = _iou(corners[best], corners[index])
+            if method == "gaussian":
+                scores[index] *= math.exp(-(iou * iou) / sigma)
+            elif iou > iou_threshold:
+                scores[index] *= 1 - iou
+        remaining = [index for index in remaining if scores[index] >= min_confidence]
+    return keep, scores
+
+
+def soft_nms(
+    boxes: Boxes,
+    iou_threshold: float = 0.3,
+    sigma: float = 0.5,
+    method: Literal["gaussian", "linear"] = "gaussian",
+    min_confidence: float = 0.001,
+    class_aware: bool = True,
+) -> Boxes:
+    """
+    Soft-NMS: instead of being removed, overlapping boxes get a lower
+    confidence, `exp(-iou^2 / sigma)` times lower with the gaussian method
+    or `1 - iou` times lower above `iou_threshold` with the linear one.
+    Boxes under `min_confidence` are dropped, the others are returned by
+    decreasing new confidence.
+    """
+    if method not in ("gaussian", "linear"):
+        raise ValueError(f"Unknown soft-NMS method {method}")
+    keep, scores = (_soft_nms_np if np is not None else _soft_nms)(
+        _corners(boxes),
+        _column(boxes, "confidence"),
+        _groups(_column(boxes, "label"), class_aware),
+        iou_threshold,
+        sigma,
+        method,
+        min_confidence,
+    )
+
+    if isinstance(boxes, ColumnarBatch):
+        selected = boxes.take(keep)
+        selected.columns["confidence"] = array("d", (scores[index] for index in keep))
+        return selected
+    return [
+        boxes[index].model_copy(update={"confidence": scores[index]}) for index in keep
+    ]
+
+
+def postprocess(
+    detections: Sequence[PredictedImageDetection],
+    min_confidence: float = 0.0,
+    iou_threshold: float = 0.5,
+    method: Literal["nms", "soft-nms"] = "nms",
+    class_aware: bool = True,
+    max_detections: Optional[int] = None,
+) -> list[PredictedImageDetection]:
+    """
+    Thresholding then NMS of many images. With "nms" every box of every
+    image goes through a single suppression, images being kept apart like
+    labels are.
+    """
+    if method == "soft-nms":
+        return [
+            detection.model_copy(
+                update={
+                    "bboxes": soft_nms(
+                        detection.bboxes,
+                        iou_threshold=iou_threshold,
+                        min_confidence=max(min_confidence, 0.001),
+                        class_aware=class_aware,
+                    )[:max_detections]
+                }
+            )
+            for detection in detections
+        ]
+    if method != "nms":
+        raise ValueError(f"Unknown method {method}")
+
+    boxes: list[PredictBbox] = []
+    images: list[int] = []
+    for image, detection in enumerate(detections):
+        for box in detection.bboxes:
+            if box.confidence >= min_confidence:
+                boxes.append(box)
+                images.append(image)
+    labels = _groups([box.label for box in boxes], class_aware)
+    label_count = max(labels, default=0) + 1
+    groups = [image * label_count + label for image, label in zip(images, labels)]
+    keep = _nms_indices(
+        _corners(boxes), [box.confidence for box in boxes], groups, iou_threshold
+    )
+
+    kept: list[list[PredictBbox]] = [[] for _ in detections]
+    for index in keep:
+        image_boxes = kept[images[index]]
+        if max_detections is None or len(image_boxes) < max_detections:
+            image_boxes.append(boxes[index])
+    return [
+        detection.model_copy(update={"bboxes": image_boxes})
+        for detection, image_boxes in zip(detections, kept)
+    ]
@@ -0,0 +1,329 @@
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Iterable, Literal, Optional, Sequence, Union
+from pydantic import BaseModel, Field
+from zendata.data.ml.embedding import Embedding
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Metric = Literal["cosine", "dot"]
+
+# magic, version, dimension, rows, number of IVF lists, metadata length
+_HEADER = struct.Struct("<4sBIQIQ")
+_MAGIC = b"ZIDX"
+_VERSION = 1
+_ALIGNMENT = 64
+# Rows scored at once by an exact search, bounds the score matrix memory
+_CHUNK_ROWS = 65_536
+
+
+class SearchHit(BaseModel):
+    id: str = Field(..., description="Id of the indexed embedding")
+    score: float = Field(..., description="Cosine similarity or dot product")
+    row: int = Field(..., description="Row of the vector in the index")
+
+
+def _vector_of(item: Union[Embedding, Sequence[float]]) -> Sequence[float]:
+    return item.vector if isinstance(item, Embedding) else item
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+class EmbeddingIndex:
+    """
+    Vectors of `Embedding` models in one contiguous float32 matrix, requires
+    numpy (install zendata[numpy]).
+
+    `search` is an exact top-k over every vector, computed as matrix
+    products by chunks of rows. After `train`, vectors are also split in
+    `n_lists` k-means clusters (IVF) and `search(..., nprobe=n)` only scores
+    the vectors of the `n` clusters closest to each query. With the cosine
+    metric vectors are stored normalized. `save` writes a file that `load`
+    memory-maps instead of reading it.
+    """
+
+    def __init__(self, dimension: int, metric: Metric = "cosine", capacity: int = 1024):
+        if np is None:
+            raise ImportError("numpy is required, install zendata[numpy]")
+        if metric not in ("cosine", "dot"):
+            raise ValueError(f"Unknown metric {metric}")
+        self.dimension = dimension
+        self.metric = metric
+        self.ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._vectors = np.empty((max(capacity, 1), dimension), dtype=np.float32)
+        self._centroids = None
+        self._lists: list = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def vectors(self):
+        """(len, dimension) float32 matrix of the indexed vectors."""
+        return self._vectors[: len(self)]
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def row_of(self, id: str) -> int:
+        return self._rows[id]
+
+    def _prepare(self, vectors: Any):
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        if matrix.ndim != 2 or matrix.shape[1] != self.dimension:
+            raise ValueError(
+                f"Expected vectors of dimension {self.dimension}, got {matrix.shape}"
+            )
+        if self.metric == "cosine":
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.where(norms > 0, norms, 1)
+        return matrix
+
+    def add(
+        self,
+        items: Iterable[Union[Embedding, Sequence[float]]],
+        ids: Optional[Iterable[str]] = None,
+    ) -> list[int]:
+        """
+        Index embeddings (or raw vectors, or a 2-D array), return their rows.
+        Ids default to the `id` of the models when they have one, to the row
+        otherwise.
+        """
+        if np is not None and isinstance(items, np.ndarray):
+            items, vectors = None, items
+        else:
+            items = list(items)
+            vectors = [_vector_of(item) for item in items]
+        matrix = self._prepare(vectors) if len(vectors) else None
+        if matrix is None:
+            return []
+        start = len(self)
+        if ids is None:
+            ids = [
+                getattr(item, "id", None) or str(start + offset)
+                for offset, item in enumerate(items or [None] * len(matrix))
+            ]
+        ids = [str(id) for id in ids]
+        if len(ids) != len(matrix):
+            raise ValueError(f"Got {len(ids)} ids for {len(matrix)} vectors")
+        duplicates = [id for id in ids if id in self._rows]
+        if duplicates or len(set(ids)) != len(ids):
+            raise ValueError(f"Ids already indexed: {duplicates[:10]}")
+
+        self._reserve(start + len(matrix))
+        self._vectors[start : start + len(matrix)] = matrix
+        for offset, id in enumerate(ids):
+            self._rows[id] = start + offset
+        self.ids.extend(ids)
+        if self.is_trained:
+            self._assign(np.arange(start, start + len(matrix)))
+        return list(range(start, start + len(matrix)))
+
+    def _reserve(self, size: int):
+        if size <= len(self._vectors) and self._vectors.flags.writeable:
+            return
+        vectors = np.empty(
+            (max(size, 2 * len(self._vectors)), self.dimension), dtype=np.float32
+        )
+        vectors[: len(self)] = self.vectors
+        self._vectors = vectors
+
+    def _assign(self, rows):
+        """Add `rows` to the list of their closest centroid."""
+        clusters = self._closest(self._vectors[rows], 1)[:, 0]
+        for cluster in np.unique(clusters):
+            members = rows[clusters == cluster]
+            self._lists[cluster] = np.concatenate([self._lists[cluster], members])
+
+    def _closest(self, vectors, count: int):
+        scores = vectors @ self._centroids.T
+        return np.argsort(-scores, axis=1)[:, :count]
+
+    def train(
+        self,
+        n_lists: Optional[int] = None,
+        iterations: int = 10,
+        sample_size: Optional[int] = None,
+        seed: int = 0,
+    ):
+        """
+        Cluster the vectors in `n_lists` lists (about sqrt(len) by default)
+        with spherical k-means on a sample of `sample_size` vectors.
+        """
+        if not len(self):
+            raise ValueError("Cannot train an empty index")
+        n_lists = min(n_lists or max(int(len(self) ** 0.5), 1), len(self))
+        rng = np.random.default_rng(seed)
+        sample_size = min(sample_size or 256 * n_lists, len(self))
+        sample = self.vectors[rng.choice(len(self), sample_size, replace=False)]
+        norms = np.linalg.norm(sample, axis=1, keepdims=True)
+        sample = sample / np.maximum(norms, 1e-12)
+
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            clusters = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, clusters, sample)
+            counts = np.bincount(clusters, minlength=n_lists)
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+
+        self._centroids = centroids.astype(np.float32)
+        self._lists = [np.empty(0, dtype=np.int64) for _ in range(n_lists)]
+        for start in range(0, len(self), _CHUNK_ROWS):
+            self._assign(np.arange(start, min(start + _CHUNK_ROWS, len(self))))
+
+    def search_arrays(self, queries: Any, k: int = 10, nprobe: Optional[int] = None):
+        """
+        (scores, rows) arrays of shape (queries, k), best first. Rows are -1
+        and scores -inf when fewer than k vectors are candidates.
+        """
+        queries = self._prepare(queries)
+        k = max(k, 1)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        rows = np.full((len(queries), k), -1, dtype=np.int64)
+        if not len(self):
+            return scores, rows
+        if nprobe is not None and self.is_trained:
+            probes = self._closest(queries, min(nprobe, len(self._lists)))
+            for index, query in enumerate(queries):
+                candidates = np.concatenate(
+                    [self._lists[probe] for probe in probes[index]]
+                )
+                self._top_k(
+                    self._vectors[candidates] @ query,
+                    candidates,
+                    scores[index : index + 1],
+                    rows[index : index + 1],
+                )
+            return scores, rows
+        for start in range(0, len(self), _CHUNK_ROWS):
+            block = self._vectors[start : min(start + _CHUNK_ROWS, len(self))]
+            self._top_k(
+                (queries @ block.T), np.arange(start, start + len(block)), scores, rows
+            )
+        return scores, rows
+
+    @staticmethod
+    def _top_k(block_scores, block_rows, scores, rows):
+        """Merge the best scores of a block into the running top-k."""
+        block_scores = np.atleast_2d(block_scores)
+        k = scores.shape[1]
+        all_scores = np.concatenate([scores, block_scores], axis=1)
+        all_rows = np.concatenate(
+            [rows, np.broadcast_to(block_rows, block_scores.shape)], axis=1
+        )
+        if all_scores.shape[1] > k:
+            best = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+            all_scores = np.take_along_axis(all_scores, best, axis=1)
+            all_rows = np.take_along_axis(all_rows, best, axis=1)
+        order = np.argsort(-all_scores, axis=1, kind="stable")
+        scores[:] = np.take_along_axis(all_scores, order, axis=1)[:, :k]
+        rows[:] = np.take_along_axis(all_rows, order, axis=1)[:, :k]
+
+    def search(
+        self,
+        queries: Iterable[Union[Embedding, Sequence[float]]],
+        k: int = 10,
+        nprobe: Optional[int] = None,
+    ) -> list[list[SearchHit]]:
+        """Top-k hits of each query, best first."""
+        if not (np is not None and isinstance(queries, np.ndarray)):
+            queries = [_vector_of(query) for query in queries]
+        scores, rows = self.search_arrays(queries, k, nprobe)
+        return [
+            [
+                SearchHit(id=self.ids[row], score=score, row=row)
+                for score, row in zip(query_scores.tolist(), query_rows.tolist())
+                if row >= 0
+            ]
+            for query_scores, query_rows in zip(scores, rows)
+        ]
+
+    def duplicates(
+        self, threshold: float = 0.95, k: int = 10, nprobe: Optional[int] = None
+    ) -> list[tuple[str, str, float]]:
+        """(id, id, score) pairs of distinct vectors scoring at least `threshold`."""
+        pairs = []
+        for start in range(0, len(self), 1024):
+            block = self.vectors[start : start + 1024]
+            scores, rows = self.search_arrays(block, k + 1, nprobe)
+            for offset, (row_scores, row_rows) in enumerate(zip(scores, rows)):
+                row = start + offset
+                for score, other in zip(row_scores.tolist(), row_rows.tolist()):
+                    if other > row and score >= threshold:
+                        pairs.append((self.ids[row], self.ids[other], score))
+        return pairs
+
+    def save(self, path: Union[str, Path]):
+        """Write the index; vectors, centroids and lists are raw aligned arrays."""
+        lists = self._lists if self.is_trained else []
+        list_sizes = np.asarray([len(rows) for rows in lists], dtype=np.int64)
+        metadata = json.dumps(
+            {"metric": self.metric, "ids": self.ids, "list_sizes": list_sizes.tolist()}
+        ).encode()
+        header = _HEADER.pack(
+            _MAGIC, _VERSION, self.dimension, len(self), len(lists), len(metadata)
+        )
+        arrays = [self.vectors]
+        if self.is_trained:
+            arrays += [self._centroids, np.concatenate(lists).astype(np.int64)]
+        temporary = Path(f"{path}.{os.getpid()}.tmp")
+        with open(temporary, "wb") as file:
+            file.write(header)
+            file.write(metadata)
+            for array in arrays:
+                file.write(b"\0" * (_aligned(file.tell()) - file.tell()))
+                file.write(np.ascontiguousarray(array).tobytes())
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "EmbeddingIndex":
+        """Memory-map an index written by `save`, vectors are copied on `add`."""
+        if np is None:
+            raise ImportError("numpy is required, install zendata[numpy]")
+        with open(path, "rb") as file:
+            magic, version, dimension, rows, n_lists, metadata_size = _HEADER.unpack(
+                file.read(_HEADER.size)
+            )
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not a zendata embedding index")
+            metadata = json.loads(file.read(metadata_size))
+
+        index = cls(dimension, metadata["metric"], capacity=1)
+        offset = _aligned(_HEADER.size + metadata_size)
+        if rows:
+            index._vectors = np.memmap(
+                path, dtype=np.float32, mode="r", offset=offset, shape=(rows, dimension)
+            )
+        index.ids = metadata["ids"]
+        index._rows = {id: row for row, id in enumerate(index.ids)}
+        if n_lists:
+            offset = _aligned(offset + rows * dimension * 4)
+            index._centroids = np.memmap(
+                path,
+                dtype=np.float32,
+                mode="r",
+                offset=offset,
+                shape=(n_lists, dimension),
+            )
+            offset = _aligned(offset + n_lists * dimension * 4)
+            members = np.memmap(
+                path, dtype=np.int64, mode="r", offset=offset, shape=(rows,)
+            )
+            bounds = np.cumsum(metadata["list_sizes"])[:-1]
+            index._lists = np.split(members, bounds)
+        return index
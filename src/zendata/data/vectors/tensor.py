@@ -1,5 +1,10 @@
-from typing import List, Optional
-from pydantic import Field
+import base64
+import json
+import math
+import struct
+from enum import Enum
+from typing import Any, List, Optional
+from pydantic import ConfigDict, Field, field_serializer, model_validator
 from zendata.data.base import BaseData
 
 
@@ -7,3 +12,191 @@ class TensorInput(BaseData):
     data: list = Field(default_factory=list, description="Array of any type")
     shape: Optional[List[int]] = Field(None, description="Shape of your array")
     source_id: Optional[str] = Field(None, description="If any source is available")
+
+
+class DType(str, Enum):
+    BOOL = "bool"
+    INT8 = "int8"
+    UINT8 = "uint8"
+    INT16 = "int16"
+    UINT16 = "uint16"
+    INT32 = "int32"
+    UINT32 = "uint32"
+    INT64 = "int64"
+    UINT64 = "uint64"
+    FLOAT16 = "float16"
+    FLOAT32 = "float32"
+    FLOAT64 = "float64"
+
+    @property
+    def format(self) -> str:
+        """`struct`/`memoryview` format character."""
+        return _FORMATS[self]
+
+    @property
+    def itemsize(self) -> int:
+        return struct.calcsize(self.format)
+
+    @classmethod
+    def from_format(cls, format: str) -> "DType":
+        """DType of a `memoryview` format character such as 'f' or '<l'."""
+        char = format.lstrip("@=<>!")
+        if len(char) != 1:
+            raise ValueError(f"Unsupported buffer format {format}")
+        if char == "?":
+            return cls.BOOL
+        size = struct.calcsize(char) * 8
+        if char in "efd":
+            return cls(f"float{size}")
+        if char in "bhilq":
+            return cls(f"int{size}")
+        if char in "BHILQ":
+            return cls(f"uint{size}")
+        raise ValueError(f"Unsupported buffer format {format}")
+
+
+_FORMATS = {
+    DType.BOOL: "?",
+    DType.INT8: "b",
+    DType.UINT8: "B",
+    DType.INT16: "h",
+    DType.UINT16: "H",
+    DType.INT32: "i",
+    DType.UINT32: "I",
+    DType.INT64: "q",
+    DType.UINT64: "Q",
+    DType.FLOAT16: "e",
+    DType.FLOAT32: "f",
+    DType.FLOAT64: "d",
+}
+_DTYPE_CODES = list(DType)
+
+# magic, version, dtype code, number of dimensions, metadata length
+_HEADER = struct.Struct("<4sBBBI")
+_MAGIC = b"ZTNS"
+_VERSION = 1
+
+
+def as_byte_view(data: Any) -> memoryview:
+    """Zero-copy flat unsigned bytes view of a C-contiguous buffer."""
+    view = memoryview(data)
+    if not view.c_contiguous:
+        raise ValueError("Buffer must be C-contiguous")
+    return view.cast("B") if view.format != "B" or view.ndim != 1 else view
+
+
+class BufferTensorInput(TensorInput):
+    """
+    Tensor backed by a contiguous buffer (bytes, bytearray, memoryview,
+    array.array, numpy array...) with an explicit `dtype` and `shape`.
+    The buffer is kept as given, without copy, and validation only checks
+    its size. It serializes to raw bytes with a small header (`to_bytes`)
+    and exposes the buffer protocol for zero-copy handoff.
+    """
+
+    type: str = "buffer-tensor"
+    data: Any = Field(..., description="Contiguous buffer of the values")
+    dtype: DType = Field(..., description="Type of each value")
+    shape: List[int] = Field(..., description="Shape of your array")
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @model_validator(mode="before")
+    @classmethod
+    def infer_from_buffer(cls, values):
+        if not isinstance(values, dict):
+            return values
+        data = values.get("data")
+        if isinstance(data, str):
+            data = base64.b64decode(data)
+            values = {**values, "data": data}
+        if data is None or (values.get("dtype") and values.get("shape") is not None):
+            return values
+        view = memoryview(data)
+        values = dict(values)
+        values.setdefault("dtype", DType.from_format(view.format))
+        if values.get("shape") is None:
+            values["shape"] = list(view.shape)
+        return values
+
+    @model_validator(mode="after")
+    def check_buffer_size(self):
+        if any(dimension < 0 for dimension in self.shape):
+            raise ValueError(f"Shape {self.shape} has negative dimensions")
+        expected = math.prod(self.shape) * self.dtype.itemsize
+        nbytes = as_byte_view(self.data).nbytes
+        if nbytes != expected:
+            raise ValueError(
+                f"Buffer holds {nbytes} bytes, expected {expected} for shape "
+                f"{self.shape} of {self.dtype.value}"
+            )
+        return self
+
+    @field_serializer("data")
+    def serialize_data(self, data: Any, info):
+        if info.mode_is_json():
+            return base64.b64encode(as_byte_view(data)).decode()
+        return bytes(as_byte_view(data))
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return self.view()
+
+    @property
+    def nbytes(self) -> int:
+        return as_byte_view(self.data).nbytes
+
+    @property
+    def size(self) -> int:
+        return math.prod(self.shape)
+
+    def view(self) -> memoryview:
+        """Zero-copy typed view with the tensor shape."""
+        view = as_byte_view(self.data)
+        if 0 in self.shape:
+            return view.cast(self.dtype.format)
+        return view.cast(self.dtype.format, self.shape)
+
+    def tolist(self) -> list:
+        return self.view().tolist()
+
+    def numpy(self):
+        """Zero-copy numpy array of the buffer, requires numpy."""
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("numpy is required, install zendata[numpy]")
+        array = np.frombuffer(as_byte_view(self.data), dtype=self.dtype.value)
+        return array.reshape(self.shape)
+
+    def to_bytes(self) -> bytes:
+        """Header, metadata then the raw buffer."""
+        metadata = self.model_dump_json(exclude={"data", "dtype", "shape"}).encode()
+        return b"".join(
+            [
+                _HEADER.pack(
+                    _MAGIC,
+                    _VERSION,
+                    _DTYPE_CODES.index(self.dtype),
+                    len(self.shape),
+                    len(metadata),
+                ),
+                struct.pack(f"<{len(self.shape)}Q", *self.shape),
+                metadata,
+                as_byte_view(self.data),
+            ]
+        )
+
+    @classmethod
+    def from_bytes(cls, payload: Any) -> "BufferTensorInput":
+        """Load `to_bytes` output; the data stays a view on `payload`."""
+        view = as_byte_view(payload)
+        magic, version, dtype_code, ndim, metadata_size = _HEADER.unpack_from(view)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a zendata tensor payload")
+        offset = _HEADER.size
+        shape = list(struct.unpack_from(f"<{ndim}Q", view, offset))
+        offset += 8 * ndim
+        values = json.loads(bytes(view[offset : offset + metadata_size]))
+        offset += metadata_size
+        values.update(data=view[offset:], dtype=_DTYPE_CODES[dtype_code], shape=shape)
+        return cls.model_validate(values)
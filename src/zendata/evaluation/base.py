@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Self
+from pydantic import BaseModel
+
+
+class Accumulator(BaseModel, ABC):
+    """
+    Metric state updated with (ground truth, prediction) pairs in constant
+    memory. Accumulators of the same kind and settings built on different
+    workers are combined with `merge`; they are plain pydantic models so
+    they can be pickled or sent as JSON between processes.
+    """
+
+    @abstractmethod
+    def update(self, ground_truth: Any, prediction: Any) -> Self:
+        """Add one pair and return the accumulator."""
+        ...
+
+    @abstractmethod
+    def merge(self, other: Self) -> Self:
+        """Add the state of `other` to this accumulator and return it."""
+        ...
+
+    @abstractmethod
+    def result(self) -> BaseModel: ...
+
+    def update_many(self, pairs: Iterable[tuple[Any, Any]]) -> Self:
+        for ground_truth, prediction in pairs:
+            self.update(ground_truth, prediction)
+        return self
+
+    def check_mergeable(self, other: Self, *settings: str):
+        if type(other) is not type(self):
+            raise TypeError(
+                f"Cannot merge {type(other).__name__} into {type(self).__name__}"
+            )
+        for name in settings:
+            if getattr(self, name) != getattr(other, name):
+                raise ValueError(f"Cannot merge accumulators with different {name}")
@@ -0,0 +1,95 @@
+from typing import Self, Union
+from pydantic import BaseModel, Field
+from zendata.data.ml.classification import GTLabel
+from .base import Accumulator
+
+
+class ClassMetrics(BaseModel):
+    precision: float = Field(0.0, description="Correct predictions / predictions")
+    recall: float = Field(0.0, description="Correct predictions / ground truths")
+    f1: float = Field(0.0, description="Harmonic mean of precision and recall")
+    support: int = Field(0, description="Number of ground truths of the class")
+
+
+class ClassificationMetrics(BaseModel):
+    accuracy: float = Field(0.0, description="Correct predictions / pairs")
+    macro_precision: float = Field(0.0, description="Mean precision of the classes")
+    macro_recall: float = Field(0.0, description="Mean recall of the classes")
+    macro_f1: float = Field(0.0, description="Mean F1 of the classes")
+    classes: dict[str, ClassMetrics] = Field(
+        default_factory=dict, description="Metrics by class"
+    )
+    confusion: dict[str, dict[str, int]] = Field(
+        default_factory=dict,
+        description="Pair count by ground truth label then predicted label",
+    )
+
+
+def label_of(data: Union[GTLabel, BaseModel, str]) -> str:
+    """Label of a GTLabel/PredictLabel or of a model holding one in `label`."""
+    if isinstance(data, str):
+        return data
+    label = data.label
+    return label if isinstance(label, str) else label.label
+
+
+class ClassificationAccumulator(Accumulator):
+    """Confusion matrix of single label classification pairs."""
+
+    confusion: dict[str, dict[str, int]] = Field(
+        default_factory=dict,
+        description="Pair count by ground truth label then predicted label",
+    )
+
+    def update(self, ground_truth, prediction) -> Self:
+        row = self.confusion.setdefault(label_of(ground_truth), {})
+        predicted = label_of(prediction)
+        row[predicted] = row.get(predicted, 0) + 1
+        return self
+
+    def merge(self, other: Self) -> Self:
+        self.check_mergeable(other)
+        for truth, row in other.confusion.items():
+            own = self.confusion.setdefault(truth, {})
+            for predicted, count in row.items():
+                own[predicted] = own.get(predicted, 0) + count
+        return self
+
+    def result(self) -> ClassificationMetrics:
+        labels = sorted(
+            set(self.confusion).union(*(row.keys() for row in self.confusion.values()))
+        )
+        predicted = dict.fromkeys(labels, 0)
+        for row in self.confusion.values():
+            for label, count in row.items():
+                predicted[label] += count
+        total = sum(predicted.values())
+        correct = sum(row.get(label, 0) for label, row in self.confusion.items())
+
+        classes = {}
+        for label in labels:
+            true_positives = self.confusion.get(label, {}).get(label, 0)
+            support = sum(self.confusion.get(label, {}).values())
+            precision = true_positives / predicted[label] if predicted[label] else 0.0
+            recall = true_positives / support if support else 0.0
+            f1 = (
+                2 * precision * recall / (precision + recall)
+                if precision + recall
+                else 0.0
+            )
+            classes[label] = ClassMetrics(
+                precision=precision, recall=recall, f1=f1, support=support
+            )
+
+        def mean(name: str) -> float:
+            values = [getattr(metrics, name) for metrics in classes.values()]
+            return sum(values) / len(values) if values else 0.0
+
+        return ClassificationMetrics(
+            accuracy=correct / total if total else 0.0,
+            macro_precision=mean("precision"),
+            macro_recall=mean("recall"),
+            macro_f1=mean("f1"),
+            classes=classes,
+            confusion={label: dict(row) for label, row in self.confusion.items()},
+        )
@@ -0,0 +1,155 @@
+from typing import Self
+from pydantic import BaseModel, Field
+from zendata.data.ml.computer_vision.detection import (
+    GtImageDetection,
+    PredictedImageDetection,
+)
+from zendata.data.ml.computer_vision.postprocessing import iou_matrix
+from .base import Accumulator
+
+
+class DetectionMetrics(BaseModel):
+    map: float = Field(0.0, description="Mean AP over classes and IoU thresholds")
+    ap: dict[str, float] = Field(
+        default_factory=dict, description="AP of each class over the IoU thresholds"
+    )
+    ap_by_threshold: dict[float, float] = Field(
+        default_factory=dict, description="Mean AP over classes at each IoU threshold"
+    )
+
+
+def average_precision(
+    true_positives: list[int], false_positives: list[int], ground_truths: int
+) -> float:
+    """
+    Area under the interpolated precision/recall curve from score histograms,
+    the highest score bin being the last one.
+    """
+    if not ground_truths:
+        return 0.0
+    recalls, precisions = [0.0], [1.0]
+    tp = fp = 0
+    for bin_tp, bin_fp in zip(reversed(true_positives), reversed(false_positives)):
+        if not bin_tp and not bin_fp:
+            continue
+        tp += bin_tp
+        fp += bin_fp
+        recalls.append(tp / ground_truths)
+        precisions.append(tp / (tp + fp))
+    # Precision envelope: best precision at this recall or higher
+    for index in range(len(precisions) - 2, -1, -1):
+        precisions[index] = max(precisions[index], precisions[index + 1])
+    return sum(
+        (recalls[index] - recalls[index - 1]) * precisions[index]
+        for index in range(1, len(recalls))
+    )
+
+
+class DetectionAccumulator(Accumulator):
+    """
+    Detection mAP at several IoU thresholds. Predictions are matched
+    greedily, by decreasing confidence, to the unmatched ground truth of the
+    same label with the highest IoU. Matches are counted in `bins`
+    confidence bins, so memory does not grow with the number of pairs and
+    AP is exact up to the bin width.
+    """
+
+    iou_thresholds: list[float] = Field(
+        default_factory=lambda: [0.5], description="IoU thresholds of a match"
+    )
+    bins: int = Field(1000, ge=1, description="Number of confidence bins")
+    ground_truths: dict[str, int] = Field(
+        default_factory=dict, description="Ground truth count by label"
+    )
+    true_positives: dict[str, list[list[int]]] = Field(
+        default_factory=dict,
+        description="Matched predictions by label, IoU threshold and confidence bin",
+    )
+    false_positives: dict[str, list[list[int]]] = Field(
+        default_factory=dict,
+        description="Unmatched predictions by label, IoU threshold and confidence bin",
+    )
+
+    def histograms(self, label: str) -> tuple[list[list[int]], list[list[int]]]:
+        if label not in self.true_positives:
+            self.true_positives[label] = [[0] * self.bins for _ in self.iou_thresholds]
+            self.false_positives[label] = [[0] * self.bins for _ in self.iou_thresholds]
+        return self.true_positives[label], self.false_positives[label]
+
+    def update(
+        self, ground_truth: GtImageDetection, prediction: PredictedImageDetection
+    ) -> Self:
+        truths: dict[str, list] = {}
+        for box in ground_truth.bboxes:
+            truths.setdefault(box.label, []).append(box)
+        predictions: dict[str, list] = {}
+        for box in prediction.bboxes:
+            predictions.setdefault(box.label, []).append(box)
+
+        for label, boxes in truths.items():
+            self.ground_truths[label] = self.ground_truths.get(label, 0) + len(boxes)
+        for label, boxes in predictions.items():
+            boxes.sort(key=lambda box: -box.confidence)
+            candidates = truths.get(label, [])
+            ious = iou_matrix(boxes, candidates) if candidates else None
+            if hasattr(ious, "tolist"):
+                ious = ious.tolist()
+            true_positives, false_positives = self.histograms(label)
+            for level, threshold in enumerate(self.iou_thresholds):
+                matched = set()
+                for index, box in enumerate(boxes):
+                    score_bin = min(int(box.confidence * self.bins), self.bins - 1)
+                    best, best_iou = None, threshold
+                    for candidate in range(len(candidates)):
+                        iou = ious[index][candidate]
+                        if candidate not in matched and iou >= best_iou:
+                            best, best_iou = candidate, iou
+                    if best is None:
+                        false_positives[level][score_bin] += 1
+                    else:
+                        matched.add(best)
+                        true_positives[level][score_bin] += 1
+        return self
+
+    def merge(self, other: Self) -> Self:
+        self.check_mergeable(other, "iou_thresholds", "bins")
+        for label, count in other.ground_truths.items():
+            self.ground_truths[label] = self.ground_truths.get(label, 0) + count
+        for label in other.true_positives:
+            own = self.histograms(label)
+            theirs = (other.true_positives[label], other.false_positives[label])
+            for own_levels, their_levels in zip(own, theirs):
+                for own_bins, their_bins in zip(own_levels, their_levels):
+                    for index, count in enumerate(their_bins):
+                        own_bins[index] += count
+        return self
+
+    def result(self) -> DetectionMetrics:
+        labels = sorted(label for label, count in self.ground_truths.items() if count)
+        empty = [0] * self.bins
+        by_label: dict[str, list[float]] = {}
+        for label in labels:
+            true_positives = self.true_positives.get(label)
+            false_positives = self.false_positives.get(label)
+            by_label[label] = [
+                average_precision(
+                    true_positives[level] if true_positives else empty,
+                    false_positives[level] if false_positives else empty,
+                    self.ground_truths[label],
+                )
+                for level in range(len(self.iou_thresholds))
+            ]
+        ap = {label: sum(values) / len(values) for label, values in by_label.items()}
+        ap_by_threshold = {
+            threshold: (
+                sum(values[level] for values in by_label.values()) / len(by_label)
+                if by_label
+                else 0.0
+            )
+            for level, threshold in enumerate(self.iou_thresholds)
+        }
+        return DetectionMetrics(
+            map=sum(ap.values()) / len(ap) if ap else 0.0,
+            ap=ap,
+            ap_by_threshold=ap_by_threshold,
+        )
@@ -0,0 +1,161 @@
+import math
+from typing import Iterable, Self
+from pydantic import BaseModel, Field
+from zendata.data.ml.audio.diarisation import (
+    GroundTruthDiarization,
+    PredictedDiarization,
+    SpeakerLevel,
+)
+from .base import Accumulator
+
+
+class DiarizationErrorRate(BaseModel):
+    der: float = Field(0.0, description="(missed + false alarm + confusion) / speech")
+    missed: float = Field(0.0, description="Reference speech without prediction (s)")
+    false_alarm: float = Field(0.0, description="Predicted speech not in reference (s)")
+    confusion: float = Field(0.0, description="Speech given to the wrong speaker (s)")
+    total: float = Field(0.0, description="Reference speech duration (s)")
+
+
+def speaker_intervals(
+    reference: Iterable[SpeakerLevel], hypothesis: Iterable[SpeakerLevel]
+) -> list[tuple[float, set[str], set[str]]]:
+    """(duration, reference speakers, predicted speakers) of elementary intervals."""
+    events = []
+    for side, segments in ((0, reference), (1, hypothesis)):
+        for segment in segments:
+            if segment.end > segment.start:
+                events.append((segment.start, 1, side, segment.speaker_id))
+                events.append((segment.end, -1, side, segment.speaker_id))
+    events.sort(key=lambda event: event[0])
+
+    active: tuple[dict[str, int], dict[str, int]] = ({}, {})
+    intervals = []
+    previous = None
+    for time, change, side, speaker in events:
+        if previous is not None and time > previous and (active[0] or active[1]):
+            intervals.append((time - previous, set(active[0]), set(active[1])))
+        count = active[side].get(speaker, 0) + change
+        if count:
+            active[side][speaker] = count
+        else:
+            active[side].pop(speaker, None)
+        previous = time
+    return intervals
+
+
+def _assignment(cost: list[list[float]]) -> list[tuple[int, int]]:
+    """
+    Hungarian algorithm: (row, column) pairs of minimal total cost, for a
+    matrix with no more rows than columns.
+    """
+    rows, columns = len(cost), len(cost[0])
+    u, v = [0.0] * (rows + 1), [0.0] * (columns + 1)
+    match, way = [0] * (columns + 1), [0] * (columns + 1)
+    for row in range(1, rows + 1):
+        match[0], column = row, 0
+        minimum = [math.inf] * (columns + 1)
+        used = [False] * (columns + 1)
+        while True:
+            used[column] = True
+            current_row, delta, next_column = match[column], math.inf, 0
+            for j in range(1, columns + 1):
+                if not used[j]:
+                    reduced = cost[current_row - 1][j - 1] - u[current_row] - v[j]
+                    if reduced < minimum[j]:
+                        minimum[j], way[j] = reduced, column
+                    if minimum[j] < delta:
+                        delta, next_column = minimum[j], j
+            for j in range(columns + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    minimum[j] -= delta
+            column = next_column
+            if match[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            match[column] = match[previous]
+            column = previous
+    return [(match[j] - 1, j - 1) for j in range(1, columns + 1) if match[j]]
+
+
+def speaker_mapping(
+    intervals: list[tuple[float, set[str], set[str]]],
+) -> dict[str, str]:
+    """Predicted speaker -> reference speaker maximizing the overlapping time."""
+    overlap: dict[tuple[str, str], float] = {}
+    for duration, reference, hypothesis in intervals:
+        for truth in reference:
+            for predicted in hypothesis:
+                key = (truth, predicted)
+                overlap[key] = overlap.get(key, 0.0) + duration
+    truths = sorted({truth for truth, _ in overlap})
+    predictions = sorted({predicted for _, predicted in overlap})
+    if not truths:
+        return {}
+    transpose = len(truths) > len(predictions)
+    rows, columns = (predictions, truths) if transpose else (truths, predictions)
+    cost = [
+        [
+            -overlap.get((column, row) if transpose else (row, column), 0.0)
+            for column in columns
+        ]
+        for row in rows
+    ]
+    mapping = {}
+    for row, column in _assignment(cost):
+        truth, predicted = (
+            (columns[column], rows[row]) if transpose else (rows[row], columns[column])
+        )
+        if overlap.get((truth, predicted)):
+            mapping[predicted] = truth
+    return mapping
+
+
+class DERAccumulator(Accumulator):
+    """
+    Diarization error rate, without collar. Predicted speakers of each pair
+    are mapped one to one to reference speakers to maximize the matched time.
+    """
+
+    missed: float = 0.0
+    false_alarm: float = 0.0
+    confusion: float = 0.0
+    total: float = 0.0
+
+    def update(
+        self, ground_truth: GroundTruthDiarization, prediction: PredictedDiarization
+    ) -> Self:
+        intervals = speaker_intervals(
+            ground_truth.diarizations, prediction.diarizations
+        )
+        mapping = speaker_mapping(intervals)
+        for duration, reference, hypothesis in intervals:
+            correct = len(reference & {mapping.get(speaker) for speaker in hypothesis})
+            self.missed += duration * max(len(reference) - len(hypothesis), 0)
+            self.false_alarm += duration * max(len(hypothesis) - len(reference), 0)
+            matched = min(len(reference), len(hypothesis))
+            self.confusion += duration * (matched - correct)
+            self.total += duration * len(reference)
+        return self
+
+    def merge(self, other: Self) -> Self:
+        self.check_mergeable(other)
+        self.missed += other.missed
+        self.false_alarm += other.false_alarm
+        self.confusion += other.confusion
+        self.total += other.total
+        return self
+
+    def result(self) -> DiarizationErrorRate:
+        errors = self.missed + self.false_alarm + self.confusion
+        return DiarizationErrorRate(
+            der=errors / self.total if self.total else 0.0,
+            missed=self.missed,
+            false_alarm=self.false_alarm,
+            confusion=self.confusion,
+            total=self.total,
+        )
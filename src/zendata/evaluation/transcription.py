@@ -0,0 +1,88 @@
+from typing import Self, Sequence
+from pydantic import BaseModel, Field
+from zendata.data.ml.audio.transcription import (
+    GroundTruthTranscription,
+    PredictedTranscription,
+)
+from .base import Accumulator
+
+
+class WordErrorRate(BaseModel):
+    wer: float = Field(0.0, description="(S + D + I) / reference words")
+    substitutions: int = Field(0, description="Reference words replaced")
+    deletions: int = Field(0, description="Reference words missing")
+    insertions: int = Field(0, description="Predicted words not in the reference")
+    reference_words: int = Field(0, description="Number of reference words")
+
+
+def edit_operations(reference: Sequence[str], hypothesis: Sequence[str]):
+    """
+    (substitutions, deletions, insertions) of a minimal word alignment,
+    with two rows of the Levenshtein table so memory is O(len(hypothesis)).
+    """
+    # Each cell is (cost, substitutions, deletions, insertions)
+    previous = [(j, 0, 0, j) for j in range(len(hypothesis) + 1)]
+    for i, word in enumerate(reference, 1):
+        current = [(i, 0, i, 0)]
+        for j, predicted in enumerate(hypothesis, 1):
+            diagonal = previous[j - 1]
+            if word == predicted:
+                best = diagonal
+            else:
+                best = (diagonal[0] + 1, diagonal[1] + 1, diagonal[2], diagonal[3])
+            up = previous[j]
+            if up[0] + 1 < best[0]:
+                best = (up[0] + 1, up[1], up[2] + 1, up[3])
+            left = current[j - 1]
+            if left[0] + 1 < best[0]:
+                best = (left[0] + 1, left[1], left[2], left[3] + 1)
+            current.append(best)
+        previous = current
+    return previous[-1][1:]
+
+
+class WERAccumulator(Accumulator):
+    """Word error rate over transcription pairs, words ordered by start time."""
+
+    lowercase: bool = Field(True, description="Compare words case-insensitively")
+    substitutions: int = 0
+    deletions: int = 0
+    insertions: int = 0
+    reference_words: int = 0
+
+    def words(self, transcription) -> list[str]:
+        words = sorted(transcription.transcriptions, key=lambda word: word.start)
+        if self.lowercase:
+            return [word.word.lower() for word in words]
+        return [word.word for word in words]
+
+    def update(
+        self, ground_truth: GroundTruthTranscription, prediction: PredictedTranscription
+    ) -> Self:
+        reference = self.words(ground_truth)
+        substitutions, deletions, insertions = edit_operations(
+            reference, self.words(prediction)
+        )
+        self.substitutions += substitutions
+        self.deletions += deletions
+        self.insertions += insertions
+        self.reference_words += len(reference)
+        return self
+
+    def merge(self, other: Self) -> Self:
+        self.check_mergeable(other, "lowercase")
+        self.substitutions += other.substitutions
+        self.deletions += other.deletions
+        self.insertions += other.insertions
+        self.reference_words += other.reference_words
+        return self
+
+    def result(self) -> WordErrorRate:
+        errors = self.substitutions + self.deletions + self.insertions
+        return WordErrorRate(
+            wer=errors / self.reference_words if self.reference_words else 0.0,
+            substitutions=self.substitutions,
+            deletions=self.deletions,
+            insertions=self.insertions,
+            reference_words=self.reference_words,
+        )
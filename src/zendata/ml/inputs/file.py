@@ -1,6 +1,7 @@
-from pydantic import Field, HttpUrl
+from pydantic import Field, HttpUrl, PrivateAttr
 from pathlib import Path
 from typing import Union, Optional
+from zendata.data.files.payload import FilePayload, local_path
 from .base import BaseInput
 
 
@@ -17,3 +18,12 @@ class File(BaseInput):
         None, description="Path to save file or URL if fetched from web"
     )
     checksum: Optional[str] = Field(None, description="File checksum (MD5/SHA256)")
+
+    _payload: Optional[FilePayload] = PrivateAttr(None)
+
+    @property
+    def payload(self) -> FilePayload:
+        """Content of the local `save_path`, memory-mapped on first read."""
+        if self._payload is None:
+            self._payload = FilePayload(local_path(self))
+        return self._payload
@@ -0,0 +1,2 @@
+# Registers how the binary codec rebuilds tasks, whichever task module is used
+from . import serialization
@@ -0,0 +1,326 @@
+import asyncio
+import inspect
+import time
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Optional,
+    Sequence,
+    Union,
+)
+from abc import abstractmethod
+from zendata.core.batch import Batch
+from .base import BaseTask, ValidationLevel
+from .cache import ResultCache
+from .metrics import ServiceMetrics
+from .policy import RetryPolicy, TaskTimeoutError
+from .progress import Progress
+from .service import Service, _BatchPlan
+from .task import Task
+
+
+class AsyncService(Service):
+    """
+    Asyncio counterpart of `Service`:
+      - `apply` is a coroutine and is awaited by `run`
+      - callbacks may be plain functions or coroutines
+      - at most `max_concurrency` calls to `apply` run at the same time
+        (no limit when None)
+      - an `apply` exceeding `timeout` is cancelled and retries wait with
+        `asyncio.sleep`, without holding a thread
+    """
+
+    def __init__(
+        self,
+        task_definition: BaseTask,
+        name: str,
+        callback: Callable[[Task], Union[None, Awaitable[None]]] = lambda task: print(
+            task.id, task.status, task.created_at, task.updated_at
+        ),
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        validation: ValidationLevel = ValidationLevel.STRICT,
+        cache: Optional[ResultCache] = None,
+        metrics: Union[ServiceMetrics, bool] = True,
+    ):
+        super().__init__(
+            task_definition=task_definition,
+            name=name,
+            callback=callback,
+            timeout=timeout,
+            retry_policy=retry_policy,
+            validation=validation,
+            cache=cache,
+            metrics=metrics,
+        )
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._progress_callbacks: set[asyncio.Future] = set()
+
+    @property
+    def semaphore(self) -> Optional[asyncio.Semaphore]:
+        """Concurrency limit of the running event loop."""
+        if self.max_concurrency is None:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def callback(self, task: Task, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = self._callback(task)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"CallBack Failed {e}")
+        if self.metrics is not None:
+            self.metrics.observe_stage("callback", time.perf_counter() - started)
+
+    def progress(
+        self,
+        task: Task,
+        total: float = 1.0,
+        min_interval: float = 0.5,
+        min_delta: float = 0.01,
+    ) -> Progress:
+        """
+        See `Service.progress`, callbacks are scheduled on the running loop
+        so that the reporter can also be used from worker threads.
+        """
+        loop = asyncio.get_running_loop()
+
+        def schedule(task: Task):
+            future = asyncio.ensure_future(self.callback(task=task))
+            self._progress_callbacks.add(future)
+            future.add_done_callback(self._progress_callbacks.discard)
+
+        def emit(task: Task):
+            loop.call_soon_threadsafe(schedule, task.model_copy())
+
+        return Progress(task, emit, total, min_interval, min_delta)
+
+    @abstractmethod
+    async def apply(self, task: Task, *args, **kwargs) -> Task:
+        """Process the input_data and return the result."""
+        ...
+
+    async def _apply(self, task: Task, *args, **kwargs) -> Task:
+        semaphore = self.semaphore
+        if semaphore is None:
+            return await self._apply_with_timeout(task, *args, **kwargs)
+        async with semaphore:
+            return await self._apply_with_timeout(task, *args, **kwargs)
+
+    async def _apply_with_timeout(self, task: Task, *args, **kwargs) -> Task:
+        if self.timeout is None:
+            return await self.apply(task, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(
+                self.apply(task, *args, **kwargs), timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise TaskTimeoutError(
+                f"apply did not complete within {self.timeout} seconds"
+            )
+
+    async def apply_batch(self, tasks: list[Task], *args, **kwargs) -> list[Task]:
+        """
+        Process a list of tasks at once and return them in the same order.
+        By default `apply` is awaited concurrently on each task, within the
+        concurrency limit, the timeout and the retry policy.
+        """
+        return list(
+            await asyncio.gather(
+                *(self._apply_retrying(task, args, kwargs) for task in tasks)
+            )
+        )
+
+    async def _apply_retrying(self, task: Task, args: tuple, kwargs: dict) -> Task:
+        """See `Service._apply_retrying`."""
+        attempt = 1
+        while True:
+            try:
+                return await self._apply(task, *args, **kwargs)
+            except Exception as e:
+                error = e
+            delay = self.retry_delay(attempt, error)
+            if delay is None:
+                if isinstance(error, TaskTimeoutError):
+                    task.set_status_to_timeout(error=str(error))
+                else:
+                    task.set_status_to_failed(error=str(error))
+                return task
+            task.set_status_to_retrying(error=str(error))
+            await self.callback(task=task)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def run(self, input_data: Any, *args, **kwargs) -> Task:
+        """
+        1. Validates that self.input_data is correct type
+        2. Awaits apply(...)
+        3. Validates that the returned output matches self.output
+           and stores it in self.output_data
+        """
+        if self.metrics is not None:
+            self.metrics.begin()
+        started = time.perf_counter()
+        task = self._validated_task(input_data, id=kwargs.get("id"))
+        return await self._run_task(task, started, *args, **kwargs)
+
+    async def _run_task(self, task: Task, started: float, *args, **kwargs) -> Task:
+        key, hit = self._lookup(task, args, kwargs)
+        if hit:
+            await self.callback(task=task)
+            if self.metrics is not None:
+                self.metrics.observe_stages()
+            return task
+        task = await self._execute(task, started, *args, **kwargs)
+        self._store(key, task)
+        return task
+
+    async def execute(self, task: Task, *args, **kwargs) -> Task:
+        """Run an already created task, retrying it according to the retry policy."""
+        if self.metrics is not None:
+            self.metrics.begin()
+        return await self._execute(task, time.perf_counter(), *args, **kwargs)
+
+    async def _execute(self, task: Task, started: float, *args, **kwargs) -> Task:
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.started()
+        try:
+            task.set_status_to_started()
+            await self.callback(task=task)
+
+            attempt = 1
+            while True:
+                task, error = await self.attempt(task, *args, **kwargs)
+                delay = self.retry_delay(attempt, error) if error else None
+                if delay is None:
+                    return await self.finish(task, error)
+                task.set_status_to_retrying(error=str(error))
+                await self.callback(task=task)
+                await asyncio.sleep(delay)
+                attempt += 1
+        finally:
+            if metrics is not None:
+                metrics.ended()
+                metrics.observe(time.perf_counter() - started)
+
+    async def attempt(
+        self, task: Task, *args, **kwargs
+    ) -> tuple[Task, Optional[Exception]]:
+        """Await apply once, returning the task and the error raised if any."""
+        task.set_status_to_in_progress()
+        await self.callback(task=task)
+        started = time.perf_counter()
+        try:
+            return await self._apply(task, *args, **kwargs), None
+        except Exception as e:
+            return task, e
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe_stage("apply", time.perf_counter() - started)
+
+    async def finish(self, task: Task, error: Optional[Exception] = None) -> Task:
+        """Set the final status of a task after its last attempt."""
+        self._set_final_status(task, error)
+        await self.callback(task=task)
+        return task
+
+    async def run_batch(
+        self,
+        inputs: Union[Batch, Iterable[Any]],
+        *args,
+        ids: Optional[Sequence[str]] = None,
+        **kwargs,
+    ) -> list[Task]:
+        """Batched counterpart of `run`, see `Service.run_batch`."""
+        started = time.perf_counter()
+        plan = _BatchPlan()
+        for task in self._prepare_batch(plan, inputs, ids, args, kwargs):
+            await self.callback(task=task)
+        if not plan.positions:
+            return plan.tasks
+
+        applied = time.perf_counter()
+        try:
+            results = await self.apply_batch(plan.pending, *args, **kwargs)
+            error = None
+        except Exception as e:
+            results, error = None, e
+        if self.metrics is not None:
+            self.metrics.observe_stage("apply", time.perf_counter() - applied)
+        for task in self._collate_batch(plan, results, error, started):
+            await self.callback(task=task)
+        return plan.tasks
+
+    async def _run_item(self, input_data: Any, *args, **kwargs) -> Task:
+        try:
+            return await self.run(input_data, *args, **kwargs)
+        except (TypeError, ValueError) as e:
+            task = self._invalid_task(e, id=kwargs.get("id"))
+            await self.callback(task=task)
+            return task
+
+    async def run_stream(
+        self,
+        inputs: Union[Iterable[Any], AsyncIterable[Any]],
+        *args,
+        max_in_flight: int = 16,
+        ordered: bool = True,
+        **kwargs,
+    ) -> AsyncIterator[Task]:
+        """Asyncio counterpart of `Service.run_stream`, `inputs` may be async."""
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be greater than 0")
+        if isinstance(inputs, AsyncIterable):
+            items = aiter(inputs)
+        else:
+            items = _as_async(inputs)
+        pending: deque[asyncio.Task] = deque()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < max_in_flight:
+                    try:
+                        input_data = await anext(items)
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    future = asyncio.ensure_future(
+                        self._run_item(input_data, *args, **kwargs)
+                    )
+                    pending.append(future)
+                if not pending:
+                    return
+                if ordered:
+                    yield await pending.popleft()
+                    continue
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    pending.remove(future)
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def _as_async(items: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
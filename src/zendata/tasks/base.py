@@ -1,7 +1,7 @@
-from typing import Type, Optional, Any, Dict
+from typing import Type, Optional, Any, Dict, get_origin
 from enum import Enum
-from datetime import datetime
-from uuid import uuid4
+import os
+import time
 from pydantic import (
     BaseModel,
     ConfigDict,
@@ -10,22 +10,33 @@ from pydantic import (
     model_validator,
     field_serializer,
 )
-import importlib
-from typing import Type, Any
+from zendata.core.registry import default_registry, is_generic_alias
 
 
 def deserialize_type(path: str) -> Type[Any]:
     """
     Reconstitue une classe à partir de son chemin 'module.submodule.ClassName'.
+    Les chemins résolus sont mémorisés par `default_registry`.
     """
     if not path:
         return None
-    module_path, class_name = path.rsplit(".", 1)
-    module = importlib.import_module(module_path)
-    try:
-        return getattr(module, class_name)
-    except AttributeError:
-        raise ImportError(f"Cannot import name {class_name} from module {module_path}")
+    return default_registry.resolve(path)
+
+
+def serialize_type(type_: Type[Any]) -> Optional[str]:
+    return default_registry.path_of(type_) if type_ else None
+
+
+def is_instance(value: Any, type_: Type[Any]) -> bool:
+    """`isinstance` that also accepts generic aliases, checking their origin."""
+    if is_generic_alias(type_):
+        type_ = get_origin(type_)
+    return isinstance(value, type_)
+
+
+def new_task_id() -> str:
+    """Random 32 hex characters id, cheaper to generate than `uuid4().hex`."""
+    return os.urandom(16).hex()
 
 
 class TaskStatus(str, Enum):
@@ -40,20 +51,26 @@ class TaskStatus(str, Enum):
     TIMEOUT = "timeout"  # Could not complete within the allowed time
 
 
+class ValidationLevel(str, Enum):
+    STRICT = "strict"  # Full pydantic validation of every task
+    BOUNDARY = "boundary"  # Only isinstance checks of input and output data
+    OFF = "off"  # Trusted data, no check at all
+
+
 class BaseTask(BaseModel):
-    id: str = Field(default_factory=lambda: uuid4().hex, description="Id of the task")
-    name: str = Field(default_factory=lambda: uuid4().hex, description="Id of the task")
-    status: TaskStatus = Field(TaskStatus.CREATED.value, description="Task status")
+    id: str = Field(default_factory=new_task_id, description="Id of the task")
+    name: str = Field(default_factory=new_task_id, description="Id of the task")
+    status: TaskStatus = Field(TaskStatus.CREATED, description="Task status")
     percentage: float = Field(
         0.0, ge=0.0, le=1.0, description="Percentage of process (between 0 and 1)"
     )
     created_at: int = Field(
-        default_factory=lambda: int(datetime.now().timestamp()),
+        default_factory=lambda: int(time.time()),
         description="Created timestamp",
     )
     updated_at: Optional[int] = Field(None, description="Last updated timestamp")
-    input: Type[Any] = Field(None, description="Input Type")
-    output: Type[Any] = Field(None, description="Output Type")
+    input: Any = Field(None, description="Input Type")
+    output: Any = Field(None, description="Output Type")
     error: Optional[str] = Field(None, description="Error message if task failed")
     extras: Dict[str, Any] = Field(
         default_factory=dict, description="Additional fields not defined in the model"
@@ -63,24 +80,23 @@ class BaseTask(BaseModel):
 
     @field_serializer("input")
     def serialize_input(self, v: Type[Any], _info):
-        return f"{v.__module__}.{v.__name__}" if v else None
+        return serialize_type(v)
 
     @field_serializer("output")
     def serialize_output(self, v: Type[Any], _info):
-        return f"{v.__module__}.{v.__name__}" if v else None
+        return serialize_type(v)
 
     @field_validator("input", "output", mode="before")
     @classmethod
     def check_is_type(cls, v, field):
-        if v is not None and not isinstance(v, type):
+        if v is not None and not isinstance(v, type) and not is_generic_alias(v):
             raise TypeError(f"{field.field_name} must be a type, got {type(v)}")
         return v
 
     @model_validator(mode="before")
     @classmethod
     def set_updated_at(cls, values):
-        values["updated_at"] = int(datetime.now().timestamp())
-        return values
+        return {**values, "updated_at": int(time.time())}
 
     @model_validator(mode="before")
     @classmethod
@@ -88,6 +104,8 @@ class BaseTask(BaseModel):
 
         inp = values.get("input")
         out = values.get("output")
+        if isinstance(inp, str) or isinstance(out, str):
+            values = dict(values)
         if isinstance(inp, str):
             values["input"] = deserialize_type(inp)
         if isinstance(out, str):
@@ -95,17 +113,26 @@ class BaseTask(BaseModel):
         return values
 
     def update_updated_at(self):
-        self.updated_at = int(datetime.now().timestamp())
+        self.updated_at = int(time.time())
 
     def set_status(self, status: TaskStatus, error: str = None):
-        self.status = status
-        self.update_updated_at()
+        values = {"status": TaskStatus(status), "updated_at": int(time.time())}
         if error:
-            self.error = error
+            values["error"] = error
+        if self.model_config.get("validate_assignment"):
+            for key, value in values.items():
+                setattr(self, key, value)
+            return
+        # Same as assigning each field without validation, in one update
+        self.__dict__.update(values)
+        self.__pydantic_fields_set__.update(values)
 
     def set_status_to_created(self):
         self.set_status(TaskStatus.CREATED.value)
 
+    def set_status_to_queued(self):
+        self.set_status(TaskStatus.QUEUED.value)
+
     def set_status_to_started(self):
         self.set_status(TaskStatus.STARTED.value)
 
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, NamedTuple, Optional
+from zendata.core.batch import Batch
+from .async_service import AsyncService
+from .service import Service
+from .task import Task
+
+
+class _Pending(NamedTuple):
+    input_data: Any
+    id: Optional[str]
+    future: Future
+    enqueued_at: float
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-item calls into a `Batch` dispatched to
+    `service.run_batch`. A batch is flushed as soon as it holds
+    `max_batch_size` items or its oldest item waited `max_wait_ms`,
+    whichever comes first. Each caller gets back its own `Task`.
+
+    Batches run in a thread of the batcher, `service` must therefore be a
+    `Service` and not an `AsyncService`. Inputs whose future was cancelled
+    before their batch is dispatched are dropped.
+    """
+
+    def __init__(
+        self, service: Service, max_batch_size: int = 32, max_wait_ms: float = 5.0
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be greater than 0")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be positive")
+        if isinstance(service, AsyncService):
+            raise TypeError(
+                f"Service {service.name} is an AsyncService, MicroBatcher "
+                "dispatches batches from a thread and needs a Service"
+            )
+        self.service = service
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: list[_Pending] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._loop, name=f"{service.name}-micro-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, input_data: Any, id: Optional[str] = None) -> Future:
+        """Queue one input and return a future resolved with its `Task`."""
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.append(
+                _Pending(input_data, id, future, time.monotonic())
+            )
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                self._condition.notify()
+        return future
+
+    def run(self, input_data: Any, id: Optional[str] = None) -> Task:
+        return self.submit(input_data, id=id).result()
+
+    async def arun(self, input_data: Any, id: Optional[str] = None) -> Task:
+        return await asyncio.wrap_future(self.submit(input_data, id=id))
+
+    def close(self, wait: bool = True):
+        """Stop accepting inputs; pending inputs are still dispatched."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if wait:
+            self._thread.join()
+
+    def __enter__(self) -> "MicroBatcher":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _next_batch(self) -> list[_Pending]:
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if self._pending:
+                deadline = self._pending[0].enqueued_at + self.max_wait_ms / 1000
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            batch = self._pending[: self.max_batch_size]
+            del self._pending[: self.max_batch_size]
+            return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: list[_Pending]):
+        """Run a batch, every future being resolved whatever happens."""
+        batch = [
+            pending
+            for pending in batch
+            if pending.future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+        try:
+            tasks = self.service.run_batch(
+                Batch(type="batch", items=[pending.input_data for pending in batch]),
+                ids=[pending.id for pending in batch],
+            )
+            if len(tasks) != len(batch):
+                raise ValueError(
+                    f"run_batch returned {len(tasks)} tasks for {len(batch)} inputs"
+                )
+            for pending, task in zip(batch, tasks):
+                pending.future.set_result(task)
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
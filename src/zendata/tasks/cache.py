@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import pickle
+import stat
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Union
+from pydantic import BaseModel, Field
+from pydantic_core import PydanticSerializationError, to_json
+from zendata.data.base import BaseData
+from zendata.data.files.file import File
+from zendata.ml.inputs.file import File as InputFile
+
+MISSING = object()
+
+# Fields that differ between two otherwise identical inputs
+VOLATILE_FIELDS = {"id", "created_at"}
+
+
+def input_key(input_data: Any) -> Optional[str]:
+    """
+    Stable hash of an input: files with a checksum are keyed on it, pydantic
+    models on their content without `id`/`created_at`. None when the input
+    cannot be hashed.
+    """
+    if isinstance(input_data, (File, InputFile)) and input_data.checksum:
+        return f"checksum:{input_data.checksum}"
+    try:
+        if isinstance(input_data, BaseData):
+            payload = input_data.model_dump_json(exclude=VOLATILE_FIELDS).encode()
+        else:
+            payload = to_json(input_data)
+    except PydanticSerializationError:
+        try:
+            payload = pickle.dumps(input_data, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return None
+    name = f"{type(input_data).__module__}.{type(input_data).__qualname__}"
+    return f"{name}:{hashlib.blake2b(payload, digest_size=16).hexdigest()}"
+
+
+class CacheStats(BaseModel):
+    hits: int = Field(0, description="Lookups answered from memory or disk")
+    misses: int = Field(0, description="Lookups without a valid entry")
+    disk_hits: int = Field(0, description="Hits answered from the disk tier")
+    evictions: int = Field(0, description="Entries evicted from memory")
+    items: int = Field(0, description="Entries in memory")
+    bytes: int = Field(0, description="Size of the entries in memory")
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResultCache:
+    """
+    LRU cache of service outputs. Values are stored pickled, so a cached
+    output cannot be changed by the caller and its size is known exactly.
+    Entries expire after `ttl` seconds; memory is bounded by `max_items` and
+    `max_bytes`. With a `directory`, entries are also written to disk and
+    read back when they are not in memory anymore, the least recently used
+    files being deleted beyond `max_disk_bytes`.
+
+    Since cached values are unpickled, the directory must be private: it is
+    created readable by its owner only, an existing one writable by other
+    users is rejected, and files of other users are never read.
+    """
+
+    def __init__(
+        self,
+        max_items: Optional[int] = 1024,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        directory: Optional[Union[str, Path]] = None,
+        max_disk_bytes: Optional[int] = 1 << 30,
+    ):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = Path(directory) if directory is not None else None
+        self._disk_bytes = 0
+        if self.directory is not None:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            _check_private(self.directory)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+        self._entries: OrderedDict[str, tuple[Optional[float], bytes]] = OrderedDict()
+        self._bytes = 0
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """Return the cached value or `MISSING`."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= now:
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return pickle.loads(entry[1])
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self._stats.misses += 1
+                return MISSING
+            self._stats.hits += 1
+            self._stats.disk_hits += 1
+            self._store(key, entry)
+        return pickle.loads(entry[1])
+
+    def set(self, key: str, value: Any):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        entry = (time.time() + self.ttl if self.ttl is not None else None, payload)
+        with self._lock:
+            self._store(key, entry)
+        self._write_disk(key, entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.directory is not None:
+            for path in self.directory.glob("*.cache"):
+                path.unlink(missing_ok=True)
+            with self._lock:
+                self._disk_bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return self._stats.model_copy(
+                update={"items": len(self._entries), "bytes": self._bytes}
+            )
+
+    def _store(self, key: str, entry: tuple[Optional[float], bytes]):
+        if self.max_bytes is not None and len(entry[1]) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += len(entry[1])
+        while (self.max_items is not None and len(self._entries) > self.max_items) or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self._stats.evictions += 1
+
+    def _remove(self, key: str):
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.cache"
+
+    def _read_disk(self, key: str, now: float) -> Optional[tuple[Optional[float], bytes]]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with path.open("rb") as file:
+                if not _is_own(os.fstat(file.fileno())):
+                    return None
+                # A JSON header line, then the pickled value
+                header = json.loads(file.readline())
+                payload = file.read()
+        except (OSError, ValueError):
+            return None
+        if header.get("key") != key:
+            return None
+        expires_at = header.get("expires_at")
+        if expires_at is not None and expires_at <= now:
+            path.unlink(missing_ok=True)
+            return None
+        # Recently read files are the last ones deleted by `_prune_disk`
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return expires_at, payload
+
+    def _write_disk(self, key: str, entry: tuple[Optional[float], bytes]):
+        if self.directory is None:
+            return
+        expires_at, payload = entry
+        if self.max_disk_bytes is not None and len(payload) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        temporary = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        header = json.dumps({"key": key, "expires_at": expires_at}).encode()
+        temporary.write_bytes(header + b"\n" + payload)
+        os.replace(temporary, path)
+        with self._lock:
+            self._disk_bytes += len(header) + 1 + len(payload)
+            prune = (
+                self.max_disk_bytes is not None
+                and self._disk_bytes > self.max_disk_bytes
+            )
+        if prune:
+            self._prune_disk()
+
+    def _disk_files(self) -> list[tuple[float, int, Path]]:
+        """Modification time, size and path of the files of the disk tier."""
+        files = []
+        for path in self.directory.glob("*.cache"):
+            try:
+                status = path.stat()
+            except OSError:
+                continue
+            files.append((status.st_mtime, status.st_size, path))
+        return files
+
+    def _prune_disk(self):
+        """Delete the least recently used files until the disk tier fits."""
+        files = sorted(self._disk_files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+
+def _is_own(status: os.stat_result) -> bool:
+    return not hasattr(os, "getuid") or status.st_uid == os.getuid()
+
+
+def _check_private(directory: Path):
+    """Reject a cache directory that other users could write to."""
+    status = directory.stat()
+    if not _is_own(status) or status.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(
+            f"Cache directory {directory} must be owned by the current user "
+            "and not writable by others"
+        )
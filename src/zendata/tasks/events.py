@@ -0,0 +1,152 @@
+import threading
+import time
+from typing import Callable, Iterable, Literal, Optional
+from pydantic import BaseModel, Field
+from .task import Task
+
+Sink = Callable[[list[Task]], None]
+
+
+class DispatcherStats(BaseModel):
+    published: int = Field(0, description="Events received")
+    coalesced: int = Field(0, description="Events merged into a pending one")
+    dropped: int = Field(0, description="Events dropped because the queue was full")
+    delivered: int = Field(0, description="Events delivered to the sinks")
+    failed: int = Field(0, description="Sink calls that raised")
+    pending: int = Field(0, description="Events waiting to be delivered")
+
+
+class EventDispatcher:
+    """
+    Non-blocking task status callback, to give as `callback` to a service.
+
+    Events go through a queue bounded to `maxsize` tasks and are delivered
+    by a background thread, in batches of at most `batch_size`, to every
+    sink. Pending events of the same task id are coalesced into the latest
+    one. When the queue is full, `overflow` either drops the oldest pending
+    event or blocks the publisher until there is room.
+    """
+
+    def __init__(
+        self,
+        sinks: Iterable[Sink] = (),
+        maxsize: int = 10_000,
+        overflow: Literal["drop_oldest", "block"] = "drop_oldest",
+        batch_size: int = 100,
+        flush_interval: float = 0.05,
+    ):
+        if maxsize < 1 or batch_size < 1:
+            raise ValueError("maxsize and batch_size must be greater than 0")
+        if overflow not in ("drop_oldest", "block"):
+            raise ValueError(f"Unknown overflow {overflow}")
+        self.sinks: list[Sink] = list(sinks)
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: dict[str, Task] = {}
+        self._delivering = 0
+        self._stats = DispatcherStats()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._loop, name="zendata-event-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, task: Task):
+        self.publish(task)
+
+    def add_sink(self, sink: Sink) -> Sink:
+        self.sinks.append(sink)
+        return sink
+
+    def publish(self, task: Task):
+        """Queue a snapshot of the task state."""
+        snapshot = task.model_copy()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("EventDispatcher is closed")
+            self._stats.published += 1
+            if task.id in self._pending:
+                self._pending[task.id] = snapshot
+                self._stats.coalesced += 1
+                return
+            while len(self._pending) >= self.maxsize:
+                if self.overflow == "drop_oldest":
+                    del self._pending[next(iter(self._pending))]
+                    self._stats.dropped += 1
+                else:
+                    self._condition.wait()
+                    if self._closed:
+                        raise RuntimeError("EventDispatcher is closed")
+            self._pending[task.id] = snapshot
+            if len(self._pending) == 1 or len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every pending event is delivered, False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._condition.notify_all()
+            while self._pending or self._delivering:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None):
+        """Deliver pending events then stop the background thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self) -> DispatcherStats:
+        with self._condition:
+            return self._stats.model_copy(update={"pending": len(self._pending)})
+
+    def __enter__(self) -> "EventDispatcher":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _next_batch(self) -> list[Task]:
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if len(self._pending) < self.batch_size and not self._closed:
+                self._condition.wait(self.flush_interval)
+            batch = []
+            while self._pending and len(batch) < self.batch_size:
+                task_id = next(iter(self._pending))
+                batch.append(self._pending.pop(task_id))
+            self._delivering = len(batch)
+            self._condition.notify_all()
+            return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._deliver(batch)
+            else:
+                with self._condition:
+                    if self._closed and not self._pending:
+                        return
+
+    def _deliver(self, batch: list[Task]):
+        failed = 0
+        for sink in list(self.sinks):
+            try:
+                sink(batch)
+            except Exception as e:
+                failed += 1
+                print(f"Event sink failed {e}")
+        with self._condition:
+            self._stats.delivered += len(batch)
+            self._stats.failed += failed
+            self._delivering = 0
+            self._condition.notify_all()
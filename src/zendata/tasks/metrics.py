@@ -0,0 +1,374 @@
+import contextvars
+import threading
+import weakref
+from bisect import bisect_left
+from itertools import groupby
+from typing import Iterable, Optional, Sequence
+from pydantic import BaseModel, Field
+from .base import TaskStatus
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+# Upper bounds of the batch size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+# Stages timed separately, with the latency buckets
+STAGES = ("validation", "apply", "output_check", "callback")
+
+
+class _Shards:
+    """
+    Values written by one thread each: a writer only touches the shard of
+    its own thread and never takes a lock, readers sum every shard. Shards
+    of finished threads are folded together when a new thread starts.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.local = threading.local()
+        self._shards: list[tuple[threading.Thread, list]] = []
+        self._retired = [0] * size
+        self._lock = threading.Lock()
+
+    def shard(self) -> list:
+        """Shard of the calling thread, read `local.shard` first on hot paths."""
+        try:
+            return self.local.shard
+        except AttributeError:
+            shard = self.local.shard = [0] * self.size
+            with self._lock:
+                alive = []
+                for thread, values in self._shards:
+                    if thread.is_alive():
+                        alive.append((thread, values))
+                    else:
+                        self._retired = [a + b for a, b in zip(self._retired, values)]
+                alive.append((threading.current_thread(), shard))
+                self._shards = alive
+            return shard
+
+    def total(self) -> list:
+        with self._lock:
+            totals = list(self._retired)
+            for _, values in self._shards:
+                totals = [a + b for a, b in zip(totals, values)]
+        return totals
+
+    def reset(self):
+        with self._lock:
+            self._retired = [0] * self.size
+            for _, values in self._shards:
+                values[:] = [0] * self.size
+
+
+class HistogramSnapshot(BaseModel):
+    buckets: list[float] = Field(..., description="Upper bound of each bucket")
+    counts: list[int] = Field(
+        ..., description="Observations per bucket, the last one above all bounds"
+    )
+    count: int = Field(0, description="Number of observations")
+    sum: float = Field(0.0, description="Sum of the observations")
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the `q` quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class MetricsSnapshot(BaseModel):
+    service: str = Field(..., description="Name of the service")
+    statuses: dict[str, int] = Field(
+        default_factory=dict, description="Tasks by final status"
+    )
+    in_flight: int = Field(0, description="Tasks being processed")
+    latency: HistogramSnapshot = Field(
+        ..., description="Seconds from the start of a task to its final status"
+    )
+    stages: dict[str, HistogramSnapshot] = Field(
+        ..., description="Seconds spent in each stage, one observation per task"
+    )
+    batch_sizes: HistogramSnapshot = Field(
+        ..., description="Tasks given to each apply_batch call"
+    )
+
+
+# Layout of a shard: a count per status, the tasks in flight, then for each
+# histogram (latency, each stage, batch sizes) a count per bucket, one above
+# the last bound, the count and sum
+_STATUSES = list(TaskStatus)
+_IN_FLIGHT = len(_STATUSES)
+_HISTOGRAM_SIZE = len(LATENCY_BUCKETS) + 3
+_LATENCY_OFFSET = _IN_FLIGHT + 1
+_STAGE_OFFSETS = [
+    _LATENCY_OFFSET + (index + 1) * _HISTOGRAM_SIZE for index in range(len(STAGES))
+]
+_STAGE_INDEX = {stage: index for index, stage in enumerate(STAGES)}
+_BATCH_OFFSET = _LATENCY_OFFSET + (len(STAGES) + 1) * _HISTOGRAM_SIZE
+_SHARD_SIZE = _BATCH_OFFSET + len(BATCH_SIZE_BUCKETS) + 3
+
+
+def _add(shard: list, offset: int, seconds: float, tasks: int):
+    shard[offset + bisect_left(LATENCY_BUCKETS, seconds)] += tasks
+    shard[offset + _HISTOGRAM_SIZE - 2] += tasks
+    shard[offset + _HISTOGRAM_SIZE - 1] += seconds * tasks
+
+
+class ServiceMetrics:
+    """
+    Metrics recorded by a `Service`: tasks by final status, tasks in
+    flight, seconds from the start of each applied task (validation
+    included) to its final status, seconds spent in each of the `STAGES`
+    and the size of the batches given to `apply_batch`. Every recording
+    only updates a list owned by the calling thread, without locks,
+    `snapshot` sums them.
+
+    The stages of a task begun with `begin` are added up in the current
+    thread or asyncio task and recorded once with its latency, so that
+    timing them only costs a clock read per stage boundary.
+
+    Registered metrics are exposed by `default_metrics`, those of services
+    sharing the same name being added together.
+    """
+
+    def __init__(self, service: str, register: bool = True):
+        self.service = service
+        self._status_index = {status: i for i, status in enumerate(_STATUSES)}
+        self._shards = _Shards(_SHARD_SIZE)
+        self._local = self._shards.local
+        self._stages: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar(
+            "zendata_stages", default=None
+        )
+        if register:
+            default_metrics.add(self)
+
+    def _shard(self) -> list:
+        try:
+            return self._local.shard
+        except AttributeError:
+            return self._shards.shard()
+
+    def begin(self):
+        """Add up the next stages of the current thread or asyncio task."""
+        self._stages.set([0.0] * len(STAGES))
+
+    def observe_stage(self, stage: str, seconds: float):
+        """
+        Add `seconds` spent in one of the `STAGES` to the task begun with
+        `begin`, or record them at once outside of such a task.
+        """
+        stages = self._stages.get()
+        if stages is None:
+            index = _STAGE_INDEX[stage]
+            _add(self._shard(), _STAGE_OFFSETS[index], seconds, 1)
+        else:
+            stages[_STAGE_INDEX[stage]] += seconds
+
+    def observe(self, seconds: float, tasks: int = 1):
+        """
+        Record `tasks` reaching their final status after `seconds`, and the
+        stages added up since `begin`, split between them.
+        """
+        shard = self._shard()
+        _add(shard, _LATENCY_OFFSET, seconds, tasks)
+        self._fold(shard, tasks)
+
+    def observe_stages(self, tasks: int = 1):
+        """Record the stages added up since `begin`, split between `tasks`."""
+        self._fold(self._shard(), tasks)
+
+    def _fold(self, shard: list, tasks: int):
+        stages = self._stages.get()
+        if stages is None:
+            return
+        self._stages.set(None)
+        for offset, seconds in zip(_STAGE_OFFSETS, stages):
+            if seconds:
+                _add(shard, offset, seconds / tasks, tasks)
+
+    def observe_batch(self, size: int):
+        shard = self._shards.shard()
+        shard[_BATCH_OFFSET + bisect_left(BATCH_SIZE_BUCKETS, size)] += 1
+        shard[_SHARD_SIZE - 2] += 1
+        shard[_SHARD_SIZE - 1] += size
+
+    def count(self, status: TaskStatus):
+        """Record a task ending with `status`."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shards.shard()
+        shard[self._status_index[status]] += 1
+
+    def started(self, tasks: int = 1):
+        self._shards.shard()[_IN_FLIGHT] += tasks
+
+    def ended(self, tasks: int = 1):
+        self._shards.shard()[_IN_FLIGHT] -= tasks
+
+    @staticmethod
+    def _histogram(values: list, buckets: Sequence[float]) -> HistogramSnapshot:
+        *counts, count, total = values
+        return HistogramSnapshot(
+            buckets=list(buckets),
+            counts=[int(value) for value in counts],
+            count=int(count),
+            sum=total,
+        )
+
+    def snapshot(self) -> MetricsSnapshot:
+        return self._snapshot(self.service, self._shards.total())
+
+    @classmethod
+    def _snapshot(cls, service: str, totals: list) -> MetricsSnapshot:
+        return MetricsSnapshot(
+            service=service,
+            statuses={
+                status.value: int(count)
+                for status, count in zip(_STATUSES, totals)
+                if count
+            },
+            in_flight=int(totals[_IN_FLIGHT]),
+            latency=cls._histogram(
+                totals[_LATENCY_OFFSET : _LATENCY_OFFSET + _HISTOGRAM_SIZE],
+                LATENCY_BUCKETS,
+            ),
+            stages={
+                stage: cls._histogram(
+                    totals[offset : offset + _HISTOGRAM_SIZE], LATENCY_BUCKETS
+                )
+                for stage, offset in zip(STAGES, _STAGE_OFFSETS)
+            },
+            batch_sizes=cls._histogram(totals[_BATCH_OFFSET:], BATCH_SIZE_BUCKETS),
+        )
+
+    def reset(self):
+        """Forget every recording but the tasks in flight."""
+        in_flight = self._shards.total()[_IN_FLIGHT]
+        self._shards.reset()
+        self._shards.shard()[_IN_FLIGHT] = in_flight
+
+
+class MetricsRegistry:
+    """Metrics of every live service, for a single exposition endpoint."""
+
+    def __init__(self):
+        self._metrics: "weakref.WeakSet[ServiceMetrics]" = weakref.WeakSet()
+
+    def add(self, metrics: ServiceMetrics):
+        self._metrics.add(metrics)
+
+    def snapshot(self) -> list[MetricsSnapshot]:
+        """One snapshot per service name, summing the metrics sharing it."""
+        by_service = sorted(self._metrics, key=lambda metrics: metrics.service)
+        snapshots = []
+        for service, group in groupby(by_service, key=lambda metrics: metrics.service):
+            shards = [metrics._shards.total() for metrics in group]
+            totals = [sum(values) for values in zip(*shards)]
+            snapshots.append(ServiceMetrics._snapshot(service, totals))
+        return snapshots
+
+    def prometheus(self) -> str:
+        return prometheus_text(self.snapshot())
+
+
+default_metrics = MetricsRegistry()
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{name}="{escape(str(value))}"' for name, value in labels.items())
+
+
+def _histogram_lines(
+    name: str, histogram: HistogramSnapshot, **labels: str
+) -> Iterable[str]:
+    bounds = [f"{bound:g}" for bound in histogram.buckets] + ["+Inf"]
+    cumulative = 0
+    for bound, count in zip(bounds, histogram.counts):
+        cumulative += count
+        yield f"{name}_bucket{{{_labels(**labels, le=bound)}}} {cumulative}"
+    yield f"{name}_sum{{{_labels(**labels)}}} {histogram.sum!r}"
+    yield f"{name}_count{{{_labels(**labels)}}} {histogram.count}"
+
+
+def prometheus_text(
+    snapshots: Iterable[MetricsSnapshot], prefix: str = "zendata"
+) -> str:
+    """Prometheus text exposition format of metrics snapshots."""
+    snapshots = list(snapshots)
+    lines = [
+        f"# HELP {prefix}_tasks_total Tasks by final status",
+        f"# TYPE {prefix}_tasks_total counter",
+    ]
+    for snapshot in snapshots:
+        for status, count in snapshot.statuses.items():
+            labels = _labels(service=snapshot.service, status=status)
+            lines.append(f"{prefix}_tasks_total{{{labels}}} {count}")
+
+    lines += [
+        f"# HELP {prefix}_tasks_in_flight Tasks being processed",
+        f"# TYPE {prefix}_tasks_in_flight gauge",
+    ]
+    for snapshot in snapshots:
+        labels = _labels(service=snapshot.service)
+        lines.append(f"{prefix}_tasks_in_flight{{{labels}}} {snapshot.in_flight}")
+
+    name = f"{prefix}_task_seconds"
+    lines += [
+        f"# HELP {name} Seconds from the start of a task to its final status",
+        f"# TYPE {name} histogram",
+    ]
+    for snapshot in snapshots:
+        lines.extend(_histogram_lines(name, snapshot.latency, service=snapshot.service))
+
+    name = f"{prefix}_stage_seconds"
+    lines += [
+        f"# HELP {name} Seconds spent in each stage of a task",
+        f"# TYPE {name} histogram",
+    ]
+    for snapshot in snapshots:
+        for stage, histogram in snapshot.stages.items():
+            lines.extend(
+                _histogram_lines(name, histogram, service=snapshot.service, stage=stage)
+            )
+
+    name = f"{prefix}_batch_size"
+    lines += [
+        f"# HELP {name} Tasks given to each apply_batch call",
+        f"# TYPE {name} histogram",
+    ]
+    for snapshot in snapshots:
+        lines.extend(
+            _histogram_lines(name, snapshot.batch_sizes, service=snapshot.service)
+        )
+    return "\n".join(lines) + "\n"
+
@@ -0,0 +1,249 @@
+import queue
+import threading
+import time
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union, get_origin
+from pydantic import BaseModel, Field
+from zendata.core.batch import Batch
+from .base import TaskStatus
+from .async_service import AsyncService
+from zendata.core.registry import is_generic_alias
+from .service import Service
+from .task import Task
+
+_DONE = object()
+
+
+class StageTiming(BaseModel):
+    name: str = Field(..., description="Name of the stage service")
+    items: int = Field(0, description="Tasks that went through the stage")
+    failed: int = Field(0, description="Tasks that did not complete in the stage")
+    busy_seconds: float = Field(0.0, description="Time spent processing tasks")
+    idle_seconds: float = Field(0.0, description="Time spent waiting for inputs")
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.busy_seconds / self.items if self.items else 0.0
+
+
+def _origin(type_: Any) -> Any:
+    return get_origin(type_) if is_generic_alias(type_) else type_
+
+
+def is_compatible(output: Any, input: Any) -> bool:
+    """Whether what a stage produces can always be given to the next one."""
+    if input is None or input is Any:
+        return True
+    if output is None or output is Any:
+        return False
+    output, input = _origin(output), _origin(input)
+    return isinstance(output, type) and issubclass(output, input)
+
+
+class Pipeline:
+    """
+    Chain of services, the output of each stage being the input of the next.
+
+    Stage types are checked once, when the pipeline is built. Each stage
+    runs in its own thread and stages are connected by queues of at most
+    `queue_size` items, so that while a stage processes an item the
+    previous one already works on the next items. Only the first stage
+    validates its inputs: the tasks of the next stages are built with
+    `Task.trusted` from outputs already checked by the previous stage.
+
+    A task that does not complete in a stage is not given to the next ones
+    and is returned as it is. Stages must be `Service`s, not `AsyncService`s.
+    """
+
+    def __init__(self, stages: Sequence[Service], queue_size: int = 8):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        if queue_size < 1:
+            raise ValueError("queue_size must be greater than 0")
+        for stage in stages:
+            if isinstance(stage, AsyncService):
+                raise TypeError(
+                    f"Stage {stage.name} is an AsyncService, pipeline stages run "
+                    "in threads and need a Service"
+                )
+        for previous, current in zip(stages, stages[1:]):
+            output = previous.task_definition.output
+            expected = current.task_definition.input
+            if not is_compatible(output, expected):
+                raise TypeError(
+                    f"Stage {current.name} expects {expected} but stage "
+                    f"{previous.name} produces {output}"
+                )
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self.timings = [StageTiming(name=stage.name) for stage in self.stages]
+
+    @property
+    def input(self) -> Any:
+        return self.stages[0].task_definition.input
+
+    @property
+    def output(self) -> Any:
+        return self.stages[-1].task_definition.output
+
+    def run(
+        self,
+        inputs: Union[Batch, Iterable[Any]],
+        *args,
+        ids: Optional[Sequence[str]] = None,
+        **kwargs,
+    ) -> list[Task]:
+        """Tasks of the last stage (or of the failing one), in input order."""
+        return list(self.stream(inputs, *args, ids=ids, **kwargs))
+
+    def stream(
+        self,
+        inputs: Union[Batch, Iterable[Any]],
+        *args,
+        ids: Optional[Sequence[str]] = None,
+        **kwargs,
+    ) -> Iterator[Task]:
+        """
+        Lazily feed `inputs` to the pipeline and yield the final tasks in
+        input order as soon as they are done. `args` and `kwargs` are given
+        to the `apply` of every stage. `timings` are reset at each call.
+        """
+        items = inputs.items if isinstance(inputs, Batch) else inputs
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        stop = threading.Event()
+        errors: list[BaseException] = []
+        self.timings = [StageTiming(name=stage.name) for stage in self.stages]
+
+        threads = [
+            threading.Thread(
+                target=self._feed,
+                args=(items, ids, queues[0], stop, errors),
+                name="pipeline-feed",
+                daemon=True,
+            )
+        ]
+        for index, stage in enumerate(self.stages):
+            threads.append(
+                threading.Thread(
+                    target=self._work,
+                    args=(index, queues[index], queues[index + 1], stop, errors),
+                    kwargs=dict(args=args, kwargs=kwargs),
+                    name=f"pipeline-{stage.name}",
+                    daemon=True,
+                )
+            )
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+
+    @staticmethod
+    def _put(target: queue.Queue, item: Any, stop: threading.Event) -> bool:
+        """Put `item` once there is room, False if the pipeline was stopped."""
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed(
+        self,
+        items: Iterable[Any],
+        ids: Optional[Sequence[str]],
+        target: queue.Queue,
+        stop: threading.Event,
+        errors: list,
+    ):
+        first = self.stages[0]
+        try:
+            for index, input_data in enumerate(items):
+                task_id = ids[index] if ids is not None else None
+                try:
+                    task = first._validated_task(input_data, id=task_id)
+                except (TypeError, ValueError) as e:
+                    task = first._invalid_task(e, id=task_id)
+                    first.callback(task=task)
+                if not self._put(target, task, stop):
+                    return
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            self._put(target, _DONE, stop)
+
+    def _work(
+        self,
+        index: int,
+        source: queue.Queue,
+        target: queue.Queue,
+        stop: threading.Event,
+        errors: list,
+        args: tuple,
+        kwargs: dict,
+    ):
+        stage = self.stages[index]
+        timing = self.timings[index]
+        try:
+            while not stop.is_set():
+                waited = time.perf_counter()
+                try:
+                    task = source.get(timeout=0.05)
+                except queue.Empty:
+                    timing.idle_seconds += time.perf_counter() - waited
+                    continue
+                started = time.perf_counter()
+                timing.idle_seconds += started - waited
+                if task is _DONE:
+                    break
+                if stage.metrics is not None:
+                    stage.metrics.begin()
+                if index and task.status == TaskStatus.COMPLETED:
+                    task = self._run_stage(
+                        stage, task.output_data, task.id, started, args, kwargs
+                    )
+                elif not index and task.status == TaskStatus.CREATED:
+                    task = stage._run_task(task, started, *args, **kwargs)
+                else:
+                    # Failed upstream, forwarded as is
+                    if not self._put(target, task, stop):
+                        return
+                    continue
+                timing.items += 1
+                timing.failed += task.status != TaskStatus.COMPLETED
+                timing.busy_seconds += time.perf_counter() - started
+                if not self._put(target, task, stop):
+                    return
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            self._put(target, _DONE, stop)
+
+    def _run_stage(
+        self,
+        stage: Service,
+        input_data: Any,
+        id: str,
+        started: float,
+        args: tuple,
+        kwargs: dict,
+    ) -> Task:
+        # Types were checked when the pipeline was built
+        task = Task.trusted(
+            id=id,
+            name=stage.name,
+            input=stage.task_definition.input,
+            input_data=input_data,
+            output=stage.task_definition.output,
+        )
+        return stage._run_task(task, started, *args, **kwargs)
@@ -0,0 +1,46 @@
+import random
+from typing import Callable, Optional
+from pydantic import BaseModel, Field
+
+
+class TaskTimeoutError(TimeoutError):
+    """Raised when `apply` does not complete within the service timeout."""
+
+
+def retry_always(error: BaseException) -> bool:
+    """Default `RetryPolicy.retry_on`, a module function so policies pickle."""
+    return True
+
+
+class RetryPolicy(BaseModel):
+    max_attempts: int = Field(3, ge=1, description="Number of attempts, first included")
+    initial_delay: float = Field(
+        0.1, ge=0, description="Delay before the first retry in seconds"
+    )
+    max_delay: float = Field(30.0, ge=0, description="Upper bound of a delay in seconds")
+    multiplier: float = Field(2.0, ge=1, description="Growth factor between delays")
+    jitter: float = Field(
+        0.5,
+        ge=0,
+        le=1,
+        description="Part of each delay that is randomized (0: none, 1: full jitter)",
+    )
+    retry_on: Callable[[BaseException], bool] = Field(
+        retry_always, description="Whether an exception raised by apply is retried"
+    )
+    retry_on_timeout: bool = Field(True, description="Whether timeouts are retried")
+
+    def delay(self, attempt: int) -> float:
+        """Delay in seconds after the failed `attempt` (starting at 1)."""
+        delay = min(self.max_delay, self.initial_delay * self.multiplier ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    def next_delay(self, attempt: int, error: BaseException) -> Optional[float]:
+        """Delay before the next attempt or None when `error` must not be retried."""
+        if attempt >= self.max_attempts:
+            return None
+        if isinstance(error, TaskTimeoutError):
+            retry = self.retry_on_timeout
+        else:
+            retry = self.retry_on(error)
+        return self.delay(attempt) if retry else None
@@ -0,0 +1,126 @@
+import copy
+import threading
+import time
+from typing import Any, Callable
+from .task import Task
+
+
+class _Throttle:
+    """Emission state shared by a progress and its children."""
+
+    def __init__(
+        self,
+        task: Task,
+        emit: Callable[[Task], Any],
+        min_interval: float,
+        min_delta: float,
+    ):
+        self.task = task
+        self.emit = emit
+        self.min_interval = min_interval
+        self.min_delta = min_delta
+        self.lock = threading.Lock()
+        self.emitted_at = -float("inf")
+        self.emitted = task.percentage
+
+    def report(self, percentage: float):
+        with self.lock:
+            percentage = min(percentage, 1.0)
+            if percentage <= self.task.percentage:
+                return
+            self.task.percentage = percentage
+            now = time.monotonic()
+            if percentage < 1.0 and (
+                now - self.emitted_at < self.min_interval
+                or percentage - self.emitted < self.min_delta
+            ):
+                return
+            self.emitted_at, self.emitted = now, percentage
+        self.flush()
+
+    def flush(self):
+        self.task.set_status_to_in_progress()
+        self.emit(self.task)
+
+
+class Progress:
+    """
+    Progress of a task inside `apply`, counted in steps out of `total`.
+
+    Each update sets `task.percentage`, but the task is only emitted (set
+    IN_PROGRESS and given to `emit`, usually the service callback) when at
+    least `min_interval` seconds and `min_delta` of percentage passed since
+    the last emission, so that reporting every item of a large loop is
+    cheap. Reaching 100% is always emitted and the percentage never goes
+    back.
+
+    `child` splits a number of steps into a sub-progress with its own
+    total, e.g. the items of a batch or the windows of a long media, all
+    sharing the same throttling. Steps done by a child count for its
+    parent.
+    """
+
+    def __init__(
+        self,
+        task: Task,
+        emit: Callable[[Task], Any],
+        total: float = 1.0,
+        min_interval: float = 0.5,
+        min_delta: float = 0.01,
+    ):
+        if total <= 0:
+            raise ValueError("total must be greater than 0")
+        self.task = task
+        self.total = total
+        self.done = 0.0
+        self._throttle = _Throttle(task, emit, min_interval, min_delta)
+        self._start = task.percentage
+        self._span = 1.0 - task.percentage
+        self._parent = None
+        self._offset = 0.0
+        self._steps = total
+
+    def child(self, steps: float = 1.0, total: float = 1.0) -> "Progress":
+        """Sub-progress of `total` steps covering the next `steps` of this one."""
+        if total <= 0:
+            raise ValueError("total must be greater than 0")
+        steps = min(steps, self.total - self.done)
+        child = copy.copy(self)
+        child.total = total
+        child.done = 0.0
+        child._start = self._percentage(self.done)
+        child._span = self._span * steps / self.total
+        child._parent, child._offset, child._steps = self, self.done, steps
+        return child
+
+    def _percentage(self, done: float) -> float:
+        return self._start + self._span * min(done / self.total, 1.0)
+
+    def update(self, done: float):
+        """Set the number of steps done."""
+        self.done = max(self.done, min(done, self.total))
+        progress = self
+        while progress._parent is not None:
+            parent = progress._parent
+            done = progress._offset + progress._steps * progress.done / progress.total
+            parent.done = max(parent.done, done)
+            progress = parent
+        self._throttle.report(self._percentage(self.done))
+
+    def advance(self, steps: float = 1.0):
+        """Add `steps` to the number of steps done."""
+        self.update(self.done + steps)
+
+    def finish(self):
+        self.update(self.total)
+
+    def __enter__(self) -> "Progress":
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.finish()
+
+    def flush(self):
+        """Emit the task now, whatever the throttling."""
+        self._throttle.flush()
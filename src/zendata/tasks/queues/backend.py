@@ -0,0 +1,174 @@
+import heapq
+import itertools
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+from zendata.tasks.base import TaskStatus
+from zendata.tasks.serialization import task_from_json, task_to_json
+from zendata.tasks.task import Task
+
+READY_STATUSES = (TaskStatus.QUEUED.value, TaskStatus.RETRYING.value)
+CLAIMED_STATUSES = (TaskStatus.STARTED.value, TaskStatus.IN_PROGRESS.value)
+FINAL_STATUSES = (
+    TaskStatus.COMPLETED.value,
+    TaskStatus.FAILED.value,
+    TaskStatus.CANCELED.value,
+    TaskStatus.TIMEOUT.value,
+)
+
+
+class LeaseExpiredError(RuntimeError):
+    """Raised when a worker stores a task that was claimed again since."""
+
+
+def _claimed_at(task: Task) -> Optional[float]:
+    """When the stored task was claimed by the worker holding it, if it was."""
+    return task.extras.get("claimed_at")
+
+
+class QueueBackend(ABC):
+    """
+    Storage of serialized tasks. Tasks with a QUEUED or RETRYING status are
+    waiting to be claimed by a worker once `available_at` is reached.
+
+    A claimed task is leased for `lease` seconds: when its lease is neither
+    renewed nor the task updated before, e.g. because its worker died, it
+    can be claimed again. The `claimed_at` extra identifies each claim, so
+    that the updates of the worker that lost the lease are rejected.
+    """
+
+    lease: float = 300.0
+
+    @abstractmethod
+    def put(self, task: Task, available_at: Optional[float] = None):
+        """
+        Store a new task, it can be claimed when its status is QUEUED or
+        RETRYING. Raise a ValueError if a task with the same id exists.
+        """
+        ...
+
+    @abstractmethod
+    def update(self, task: Task, available_at: Optional[float] = None):
+        """
+        Store the new state of a task, raise a KeyError if it is unknown and
+        a `LeaseExpiredError` if it was claimed again since its `claimed_at`.
+        """
+        ...
+
+    @abstractmethod
+    def renew(self, task: Task, lease: Optional[float] = None) -> bool:
+        """
+        Extend the lease of a claimed task to `lease` seconds from now
+        (`self.lease` by default), False if it was claimed again or is no
+        longer claimed.
+        """
+        ...
+
+    @abstractmethod
+    def claim(self) -> Optional[Task]:
+        """
+        Atomically take the oldest available task, or one whose lease
+        expired, mark it STARTED and record its `claimed_at` in extras.
+        """
+        ...
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Task]:
+        """Return the stored task or None if unknown."""
+        ...
+
+    def close(self):
+        """Release the resources held by the backend."""
+
+
+class InMemoryQueueBackend(QueueBackend):
+    """
+    Queue backend of a single process. Only the last `max_finished` tasks
+    reaching a final status are kept, older ones are forgotten.
+    """
+
+    def __init__(self, lease: float = 300.0, max_finished: int = 10_000):
+        if lease <= 0:
+            raise ValueError("lease must be greater than 0")
+        if max_finished < 0:
+            raise ValueError("max_finished must be positive")
+        self.lease = lease
+        self.max_finished = max_finished
+        self._tasks: dict[str, str] = {}
+        # When each waiting or claimed task becomes claimable
+        self._available_at: dict[str, float] = {}
+        self._ready: list[tuple[float, int, str]] = []
+        self._finished: OrderedDict[str, None] = OrderedDict()
+        # `claimed_at` of the last claim of each task, and the claimed tasks
+        self._claims: dict[str, float] = {}
+        self._leased: set[str] = set()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def put(self, task: Task, available_at: Optional[float] = None):
+        with self._lock:
+            if task.id in self._tasks:
+                raise ValueError(f"Task {task.id} already exists")
+            self._store(task, available_at)
+
+    def update(self, task: Task, available_at: Optional[float] = None):
+        with self._lock:
+            if task.id not in self._tasks:
+                raise KeyError(f"Unknown task {task.id}")
+            claim = _claimed_at(task)
+            if claim is not None and self._claims.get(task.id, claim) != claim:
+                raise LeaseExpiredError(f"Task {task.id} was claimed again")
+            self._store(task, available_at)
+
+    def renew(self, task: Task, lease: Optional[float] = None) -> bool:
+        with self._lock:
+            claim = _claimed_at(task)
+            if task.id not in self._leased or self._claims[task.id] != claim:
+                return False
+            self._schedule(task.id, time.time() + (lease or self.lease))
+            return True
+
+    def _store(self, task: Task, available_at: Optional[float]):
+        self._tasks[task.id] = task_to_json(task)
+        self._available_at.pop(task.id, None)
+        self._leased.discard(task.id)
+        if task.status in READY_STATUSES:
+            self._schedule(task.id, available_at or time.time())
+        elif task.status in CLAIMED_STATUSES and task.id in self._claims:
+            self._leased.add(task.id)
+            self._schedule(task.id, available_at or time.time() + self.lease)
+        elif task.status in FINAL_STATUSES:
+            self._finished[task.id] = None
+            while len(self._finished) > self.max_finished:
+                evicted, _ = self._finished.popitem(last=False)
+                del self._tasks[evicted]
+                self._claims.pop(evicted, None)
+
+    def _schedule(self, task_id: str, available_at: float):
+        self._available_at[task_id] = available_at
+        heapq.heappush(self._ready, (available_at, next(self._counter), task_id))
+
+    def claim(self) -> Optional[Task]:
+        with self._lock:
+            now = time.time()
+            while self._ready and self._ready[0][0] <= now:
+                available_at, _, task_id = heapq.heappop(self._ready)
+                # Entries of tasks stored again since they were scheduled
+                if self._available_at.get(task_id) != available_at:
+                    continue
+                task = task_from_json(self._tasks[task_id])
+                task.set_status_to_started()
+                task.extras["claimed_at"] = now
+                self._tasks[task_id] = task_to_json(task)
+                self._claims[task_id] = now
+                self._leased.add(task_id)
+                self._schedule(task_id, now + self.lease)
+                return task
+        return None
+
+    def get(self, task_id: str) -> Optional[Task]:
+        with self._lock:
+            payload = self._tasks.get(task_id)
+        return task_from_json(payload) if payload is not None else None
@@ -0,0 +1,152 @@
+import threading
+import time
+from typing import Any, Optional, Union
+from zendata.tasks.async_service import AsyncService
+from zendata.tasks.service import Service
+from zendata.tasks.task import Task
+from .backend import (
+    FINAL_STATUSES,
+    InMemoryQueueBackend,
+    LeaseExpiredError,
+    QueueBackend,
+)
+
+
+class _LeaseKeeper:
+    """
+    Renew the lease of a claimed task every third of `lease` seconds, in a
+    background thread, until the `with` block ends.
+    """
+
+    def __init__(self, backend: QueueBackend, task: Task, lease: float):
+        self.backend = backend
+        self.task = task
+        self.lease = lease
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._renew, name=f"zendata-lease-{task.id}", daemon=True
+        )
+
+    def __enter__(self) -> "_LeaseKeeper":
+        # The first renewal covers the service timeout right away
+        self.lost = not self.backend.renew(self.task, self.lease)
+        if not self.lost:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _renew(self):
+        while not self._stop.wait(self.lease / 3):
+            try:
+                renewed = self.backend.renew(self.task, self.lease)
+            except Exception as e:
+                print(f"Lease renewal of task {self.task.id} failed {e}")
+                continue
+            if not renewed:
+                self.lost = True
+                return
+
+
+class TaskQueue:
+    """
+    Queue of tasks executed later by registered services.
+    Tasks are submitted as QUEUED, claimed by workers and executed by the
+    service whose name matches the task name. When the retry policy of the
+    service allows it, a failed attempt is put back as RETRYING and becomes
+    available again after the backoff delay, so no worker waits for it.
+    Workers run in threads, services must be `Service`s, not `AsyncService`s.
+
+    While a task is executed its worker renews its lease, which lasts at
+    least the timeout of the service, so that it is only claimed again
+    when the worker died. A worker whose lease expired anyway does not
+    store its result and raises a `LeaseExpiredError`.
+    """
+
+    def __init__(self, backend: Optional[QueueBackend] = None):
+        self.backend = backend if backend is not None else InMemoryQueueBackend()
+        self.services: dict[str, Service] = {}
+
+    def register(self, service: Service) -> Service:
+        if isinstance(service, AsyncService):
+            raise TypeError(
+                f"Service {service.name} is an AsyncService, queue workers run "
+                "in threads and need a Service"
+            )
+        self.services[service.name] = service
+        return service
+
+    def submit(
+        self, service: Union[str, Service], input_data: Any, id: Optional[str] = None
+    ) -> Task:
+        """
+        Validate the input against the service and enqueue it, raise a
+        ValueError if a task with the same id was already submitted.
+        """
+        name = service if isinstance(service, str) else service.name
+        if name not in self.services:
+            raise KeyError(f"No service registered with name {name}")
+        task = self.services[name]._create_task(input_data, id=id)
+        task.set_status_to_queued()
+        self.backend.put(task)
+        return task
+
+    def get(self, task_id: str) -> Optional[Task]:
+        return self.backend.get(task_id)
+
+    def wait(
+        self, task_id: str, timeout: Optional[float] = None, poll_interval: float = 0.05
+    ) -> Task:
+        """Poll a task until it reaches a final status."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            task = self.get(task_id)
+            if task is None:
+                raise KeyError(f"Unknown task {task_id}")
+            if task.status in FINAL_STATUSES:
+                return task
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Task {task_id} is still {task.status.value}")
+            time.sleep(poll_interval)
+
+    def lease(self, service: Service) -> float:
+        """Seconds a task of `service` is leased for, at least its timeout."""
+        if service.timeout is None:
+            return self.backend.lease
+        return max(self.backend.lease, service.timeout)
+
+    def process_next(self) -> Optional[Task]:
+        """Claim one available task, execute it and store the result."""
+        task = self.backend.claim()
+        if task is None:
+            return None
+
+        service = self.services.get(task.name)
+        if service is None:
+            task.set_status_to_failed(error=f"No service registered with name {task.name}")
+            self.backend.update(task)
+            return task
+
+        attempts = task.extras.get("attempts", 0) + 1
+        if attempts == 1:
+            service.callback(task=task)
+        with _LeaseKeeper(self.backend, task, self.lease(service)) as lease:
+            task, error = service.attempt(task)
+        if lease.lost:
+            raise LeaseExpiredError(
+                f"Task {task.id} was claimed again while being executed"
+            )
+        task.extras["attempts"] = attempts
+        delay = service.retry_delay(attempts, error) if error else None
+        if delay is None:
+            task = service.finish(task, error)
+            self.backend.update(task)
+        else:
+            task.set_status_to_retrying(error=str(error))
+            service.callback(task=task)
+            self.backend.update(task, available_at=time.time() + delay)
+        return task
@@ -0,0 +1,181 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+from zendata.tasks.base import TaskStatus
+from zendata.tasks.serialization import task_from_json, task_to_json
+from zendata.tasks.task import Task
+from .backend import (
+    CLAIMED_STATUSES,
+    READY_STATUSES,
+    LeaseExpiredError,
+    QueueBackend,
+    _claimed_at,
+)
+
+# Tasks that can be claimed once `available_at` is reached, the end of the
+# lease for claimed ones
+_CLAIMABLE_STATUSES = READY_STATUSES + CLAIMED_STATUSES
+
+
+class SQLiteQueueBackend(QueueBackend):
+    """Queue backend persisted in a SQLite file, shareable between processes."""
+
+    def __init__(
+        self, path: Union[str, Path], timeout: float = 30.0, lease: float = 300.0
+    ):
+        if lease <= 0:
+            raise ValueError("lease must be greater than 0")
+        self.path = str(path)
+        self.lease = lease
+        self._connection = sqlite3.connect(
+            self.path, timeout=timeout, check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT NOT NULL UNIQUE,
+                    name TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    available_at REAL NOT NULL,
+                    payload TEXT NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS tasks_ready "
+                "ON tasks (status, available_at, seq)"
+            )
+
+    def put(self, task: Task, available_at: Optional[float] = None):
+        with self._lock:
+            try:
+                self._connection.execute(
+                    """
+                    INSERT INTO tasks (id, name, status, available_at, payload)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (
+                        task.id,
+                        task.name,
+                        TaskStatus(task.status).value,
+                        available_at or time.time(),
+                        task_to_json(task),
+                    ),
+                )
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Task {task.id} already exists")
+
+    def update(self, task: Task, available_at: Optional[float] = None):
+        status = TaskStatus(task.status).value
+        if available_at is None:
+            available_at = time.time()
+            if status in CLAIMED_STATUSES:
+                available_at += self.lease
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._check_claim(task)
+                self._connection.execute(
+                    """
+                    UPDATE tasks SET status = ?, available_at = ?, payload = ?
+                    WHERE id = ?
+                    """,
+                    (status, available_at, task_to_json(task), task.id),
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def _check_claim(self, task: Task, claimed: bool = False):
+        """
+        Raise a KeyError if the task is unknown and a `LeaseExpiredError`
+        if it was claimed again, or when `claimed` is no longer claimed.
+        """
+        row = self._connection.execute(
+            "SELECT status, payload FROM tasks WHERE id = ?", (task.id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown task {task.id}")
+        claim = _claimed_at(task)
+        if claim is None and not claimed:
+            return
+        stored = json.loads(row[1])["extras"].get("claimed_at", claim)
+        if stored != claim or (claimed and row[0] not in CLAIMED_STATUSES):
+            raise LeaseExpiredError(f"Task {task.id} was claimed again")
+
+    def renew(self, task: Task, lease: Optional[float] = None) -> bool:
+        if _claimed_at(task) is None:
+            return False
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._check_claim(task, claimed=True)
+                self._connection.execute(
+                    "UPDATE tasks SET available_at = ? WHERE id = ?",
+                    (time.time() + (lease or self.lease), task.id),
+                )
+                self._connection.execute("COMMIT")
+            except (KeyError, LeaseExpiredError):
+                self._connection.execute("ROLLBACK")
+                return False
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return True
+
+    def claim(self) -> Optional[Task]:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            try:
+                row = self._connection.execute(
+                    f"""
+                    SELECT payload FROM tasks
+                    WHERE status IN ({", ".join("?" * len(_CLAIMABLE_STATUSES))})
+                    AND available_at <= ?
+                    ORDER BY available_at, seq LIMIT 1
+                    """,
+                    (*_CLAIMABLE_STATUSES, now),
+                ).fetchone()
+                if row is None:
+                    self._connection.execute("COMMIT")
+                    return None
+                task = task_from_json(row[0])
+                task.set_status_to_started()
+                task.extras["claimed_at"] = now
+                self._connection.execute(
+                    """
+                    UPDATE tasks SET status = ?, available_at = ?, payload = ?
+                    WHERE id = ?
+                    """,
+                    (
+                        TaskStatus(task.status).value,
+                        now + self.lease,
+                        task_to_json(task),
+                        task.id,
+                    ),
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return task
+
+    def get(self, task_id: str) -> Optional[Task]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        return task_from_json(row[0]) if row is not None else None
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
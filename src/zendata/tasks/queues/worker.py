@@ -0,0 +1,55 @@
+import threading
+from typing import Optional
+from .queue import TaskQueue
+
+
+class WorkerPool:
+    """Threads pulling tasks from a `TaskQueue` and executing them."""
+
+    def __init__(self, queue: TaskQueue, workers: int = 1, poll_interval: float = 0.1):
+        if workers < 1:
+            raise ValueError("workers must be greater than 0")
+        self.queue = queue
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"zendata-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, wait: bool = True, timeout: Optional[float] = None):
+        """Stop after the tasks being executed are done."""
+        self._stop.set()
+        if wait:
+            for thread in self._threads:
+                thread.join(timeout)
+
+    def __enter__(self) -> "WorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                task = self.queue.process_next()
+            except Exception as e:
+                print(f"Worker failed {e}")
+                task = None
+            if task is None:
+                self._stop.wait(self.poll_interval)
@@ -0,0 +1,9 @@
+# The registry lives in zendata.core so that core modules such as the codec
+# can use it without depending on zendata.tasks
+from zendata.core.registry import (
+    TypeRegistry,
+    default_path,
+    default_registry,
+    is_generic_alias,
+    register_type,
+)
@@ -0,0 +1,239 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence, Union
+from pydantic import Field
+from zendata.core.batch import Batch
+from zendata.data.base import BaseData
+from zendata.data.files.file import File
+from zendata.data.ml.audio.diarisation import PredicSpeakerLevel, PredictedDiarization
+from zendata.data.ml.audio.transcription import PredictedTranscription
+from zendata.evaluation.diarization import speaker_intervals, speaker_mapping
+from zendata.ml.inputs.file import File as InputFile
+from .base import TaskStatus
+from .service import Service
+from .task import Task
+
+Media = Union[File, InputFile]
+Stitchable = Union[PredictedTranscription, PredictedDiarization]
+
+
+class MediaWindow(BaseData):
+    type: str = "media-window"
+    index: int = Field(..., ge=0, description="Position of the window in the media")
+    start: float = Field(..., ge=0, description="Start of the window in seconds")
+    end: float = Field(..., ge=0, description="End of the window in seconds")
+    start_frame: int = Field(..., ge=0, description="First frame of the window")
+    end_frame: int = Field(..., ge=0, description="Frame after the last one")
+    media: Media = Field(..., description="Audio or Video the window is taken from")
+
+
+def frame_rate(media: Media) -> float:
+    """Frames per second of an Audio (`sample_rate`) or a Video (`fps`)."""
+    rate = getattr(media, "sample_rate", None) or getattr(media, "fps", None)
+    if not rate:
+        raise ValueError(f"{type(media).__name__} has no sample_rate or fps")
+    return rate
+
+
+class SegmentPlanner:
+    """
+    Split a long Audio/Video in overlapping windows of `window` seconds,
+    run them concurrently through a service, then stitch the window
+    transcriptions or diarizations back into one timeline.
+
+    Outputs of the service are expected relative to the window start. In
+    the overlap of two windows, each one keeps what is before, respectively
+    after, the middle of the overlap, so nothing is duplicated.
+    """
+
+    def __init__(self, window: float = 30.0, overlap: float = 1.0):
+        if window <= 0 or not 0 <= overlap < window:
+            raise ValueError("window must be positive and overlap in [0, window)")
+        self.window = window
+        self.overlap = overlap
+
+    def plan(self, media: Media) -> Batch[MediaWindow]:
+        rate = frame_rate(media)
+        size = max(int(round(self.window * rate)), 1)
+        step = max(int(round((self.window - self.overlap) * rate)), 1)
+        windows = []
+        start = 0
+        while True:
+            end = min(start + size, media.frames)
+            windows.append(
+                MediaWindow(
+                    index=len(windows),
+                    start=start / rate,
+                    end=end / rate,
+                    start_frame=start,
+                    end_frame=end,
+                    media=media,
+                )
+            )
+            if end >= media.frames:
+                break
+            start += step
+        return Batch[MediaWindow](type="batch", items=windows)
+
+    def fan_out(
+        self,
+        service: Service,
+        windows: Batch[MediaWindow],
+        max_workers: Optional[int] = None,
+        *args,
+        **kwargs,
+    ) -> list[Task]:
+        """Run `service` on every window concurrently, tasks in window order."""
+        with ThreadPoolExecutor(
+            max_workers, thread_name_prefix="zendata-segments"
+        ) as pool:
+            return list(
+                pool.map(
+                    lambda window: service.run(window, *args, **kwargs), windows.items
+                )
+            )
+
+    def bounds(self, windows: Sequence[MediaWindow]) -> list[tuple[float, float]]:
+        """[low, high) part of the timeline kept from each window."""
+        cuts = [
+            (previous.end + current.start) / 2
+            for previous, current in zip(windows, windows[1:])
+        ]
+        return list(zip([-math.inf, *cuts], [*cuts, math.inf]))
+
+    def stitch(
+        self, windows: Batch[MediaWindow], outputs: Sequence[Stitchable]
+    ) -> Stitchable:
+        if len(outputs) != len(windows.items):
+            raise ValueError(
+                f"Got {len(outputs)} outputs for {len(windows.items)} windows"
+            )
+        if not outputs:
+            raise ValueError("Nothing to stitch")
+        if isinstance(outputs[0], PredictedTranscription):
+            return self.stitch_transcriptions(windows.items, outputs)
+        if isinstance(outputs[0], PredictedDiarization):
+            return self.stitch_diarizations(windows.items, outputs)
+        raise TypeError(f"Cannot stitch {type(outputs[0]).__name__}")
+
+    def stitch_transcriptions(
+        self,
+        windows: Sequence[MediaWindow],
+        outputs: Sequence[PredictedTranscription],
+    ) -> PredictedTranscription:
+        words = []
+        for window, output, (low, high) in zip(windows, outputs, self.bounds(windows)):
+            for word in output.transcriptions:
+                start, end = word.start + window.start, word.end + window.start
+                if low <= (start + end) / 2 < high:
+                    words.append(word.model_copy(update={"start": start, "end": end}))
+        words.sort(key=lambda word: word.start)
+        return outputs[0].model_copy(
+            update={"transcriptions": words, "source_id": windows[0].media.id}
+        )
+
+    def stitch_diarizations(
+        self,
+        windows: Sequence[MediaWindow],
+        outputs: Sequence[PredictedDiarization],
+    ) -> PredictedDiarization:
+        """
+        Window speaker ids are linked to the ones of the previous window by
+        the time they share in the overlap, unmatched speakers get new ids.
+        Touching segments of the same speaker are merged.
+        """
+        segments: list[PredicSpeakerLevel] = []
+        previous: list[PredicSpeakerLevel] = []
+        previous_end = 0.0
+        speakers: set[str] = set()
+        for window, output, (low, high) in zip(windows, outputs, self.bounds(windows)):
+            shifted = [
+                segment.model_copy(
+                    update={
+                        "start": segment.start + window.start,
+                        "end": segment.end + window.start,
+                    }
+                )
+                for segment in output.diarizations
+            ]
+            mapping = self._link_speakers(previous, shifted, window.start, previous_end)
+            for segment in shifted:
+                speaker = mapping.get(segment.speaker_id)
+                if speaker is None:
+                    speaker = segment.speaker_id
+                    while speaker in speakers:
+                        speaker = f"{speaker}-{window.index}"
+                    mapping[segment.speaker_id] = speaker
+                speakers.add(speaker)
+                segment.speaker_id = speaker
+            previous, previous_end = shifted, window.end
+            segments.extend(
+                segment.model_copy(
+                    update={
+                        "start": max(segment.start, low),
+                        "end": min(segment.end, high),
+                    }
+                )
+                for segment in shifted
+                if segment.start < high and segment.end > low
+            )
+
+        segments.sort(key=lambda segment: (segment.speaker_id, segment.start))
+        merged: list[PredicSpeakerLevel] = []
+        for segment in segments:
+            last = merged[-1] if merged else None
+            if (
+                last is not None
+                and last.speaker_id == segment.speaker_id
+                and segment.start <= last.end
+            ):
+                last.end = max(last.end, segment.end)
+                last.confidence = max(last.confidence, segment.confidence)
+            else:
+                merged.append(segment)
+        merged.sort(key=lambda segment: segment.start)
+        return outputs[0].model_copy(
+            update={"diarizations": merged, "source_id": windows[0].media.id}
+        )
+
+    @staticmethod
+    def _link_speakers(
+        previous: list[PredicSpeakerLevel],
+        current: list[PredicSpeakerLevel],
+        overlap_start: float,
+        overlap_end: float,
+    ) -> dict[str, str]:
+        """Window speaker id -> id of the previous window speaker it overlaps most."""
+        if not previous or overlap_end <= overlap_start:
+            return {}
+        clipped = []
+        for side in (previous, current):
+            clipped.append(
+                [
+                    segment.model_copy(
+                        update={
+                            "start": max(segment.start, overlap_start),
+                            "end": min(segment.end, overlap_end),
+                        }
+                    )
+                    for segment in side
+                ]
+            )
+        return speaker_mapping(speaker_intervals(*clipped))
+
+    def run(
+        self,
+        service: Service,
+        media: Media,
+        max_workers: Optional[int] = None,
+        *args,
+        **kwargs,
+    ) -> Stitchable:
+        """Plan, fan out and stitch; raise RuntimeError if a window failed."""
+        windows = self.plan(media)
+        tasks = self.fan_out(service, windows, max_workers, *args, **kwargs)
+        failed = [task for task in tasks if task.status != TaskStatus.COMPLETED]
+        if failed:
+            errors = "; ".join(f"{task.id}: {task.error}" for task in failed)
+            raise RuntimeError(f"{len(failed)} windows failed: {errors}")
+        return self.stitch(windows, [task.output_data for task in tasks])
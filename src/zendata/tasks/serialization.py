@@ -0,0 +1,48 @@
+import json
+from functools import lru_cache
+from typing import Any, Type
+from pydantic import TypeAdapter
+from zendata.core.codec import register_loader
+from .base import BaseTask, deserialize_type, is_instance
+from .task import Task
+
+
+@lru_cache(maxsize=256)
+def _type_adapter(type_: Type[Any]) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+def dump_task(task: Task) -> dict:
+    """
+    Serialize a task to plain python data: `input`/`output` become their
+    type path and pydantic models in `input_data`/`output_data` become dicts.
+    """
+    return task.model_dump()
+
+
+def load_task(payload: dict) -> Task:
+    """
+    Rebuild a task dumped by `dump_task`, validating `input_data` and
+    `output_data` back into their `input`/`output` types.
+    """
+    payload = dict(payload)
+    for type_key, data_key in (("input", "input_data"), ("output", "output_data")):
+        type_ = payload.get(type_key)
+        if isinstance(type_, str):
+            type_ = payload[type_key] = deserialize_type(type_)
+        data = payload.get(data_key)
+        if type_ is not None and data is not None and not is_instance(data, type_):
+            payload[data_key] = _type_adapter(type_).validate_python(data)
+    return Task.model_validate(payload)
+
+
+def task_to_json(task: Task) -> str:
+    return task.model_dump_json()
+
+
+def task_from_json(data: str) -> Task:
+    return load_task(json.loads(data))
+
+
+# Decoded tasks get their `input_data`/`output_data` back as their types
+register_loader(BaseTask, load_task)
@@ -1,8 +1,114 @@
-from typing import Any, Callable
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, Union
 from abc import ABC, abstractmethod
-from .base import BaseTask, TaskStatus
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeoutError,
+    wait,
+)
+from zendata.core.batch import Batch
+from .base import BaseTask, TaskStatus, ValidationLevel, is_instance, new_task_id
+from .cache import MISSING, ResultCache, input_key
+from .metrics import ServiceMetrics
+from .policy import RetryPolicy, TaskTimeoutError
+from .progress import Progress
+from .serialization import dump_task, load_task
 from .task import Task
 
+# Statuses of the tasks failed by apply_batch, their output is not checked
+_FAILED_STATUSES = (TaskStatus.FAILED.value, TaskStatus.TIMEOUT.value)
+
+
+# Services received by this executor process, by `Service._executor_key`
+_executor_services: dict[str, "Service"] = {}
+
+
+class _ServiceNotSent(Exception):
+    """
+    Raised in an executor process that has not received the service yet,
+    with the arguments of the call so that the caller can send it again.
+    """
+
+
+def _apply_in_executor(
+    key: str, service: Optional["Service"], payload: dict, args, kwargs
+) -> dict:
+    if service is None:
+        service = _executor_services.get(key)
+        if service is None:
+            raise _ServiceNotSent(payload, args, kwargs)
+    else:
+        _executor_services[key] = service
+    task = service.apply(load_task(payload), *args, **kwargs)
+    return dump_task(task)
+
+
+class _BatchPlan:
+    """Tasks of a `run_batch` call, and which of them are given to apply_batch."""
+
+    def __init__(self):
+        self.tasks: list[Task] = []
+        self.positions: list[int] = []
+        self.keys: dict[int, Optional[str]] = {}
+
+    @property
+    def pending(self) -> list[Task]:
+        return [self.tasks[index] for index in self.positions]
+
+
+def _run_into_future(future: Future, function: Callable, *args, **kwargs):
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        future.set_result(function(*args, **kwargs))
+    except BaseException as e:
+        future.set_exception(e)
+
+
+class _DaemonPool:
+    """
+    At most `max_workers` reusable daemon threads running the calls to
+    `apply` that have a timeout. A hung call keeps its thread but, unlike
+    with a `ThreadPoolExecutor`, does not block the interpreter at exit.
+    """
+
+    def __init__(self, max_workers: int, name: str):
+        self.max_workers = max_workers
+        self.name = name
+        self._calls: queue.SimpleQueue = queue.SimpleQueue()
+        self._threads: list[threading.Thread] = []
+        self._idle = threading.Semaphore(0)
+        self._lock = threading.Lock()
+
+    def submit(self, function: Callable, *args, **kwargs) -> Future:
+        future = Future()
+        self._calls.put((future, function, args, kwargs))
+        if self._idle.acquire(blocking=False):
+            return future
+        with self._lock:
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"{self.name}-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def _work(self):
+        while True:
+            future, function, args, kwargs = self._calls.get()
+            _run_into_future(future, function, *args, **kwargs)
+            del future, function, args, kwargs
+            self._idle.release()
+
 
 class Service(ABC):
     """
@@ -10,8 +116,45 @@ class Service(ABC):
       - `input` and `output` class attributes must be set to a type
       - the `apply` method’s signature matches those types
       - runtime checks of input/output in `run`
+
+    When an `executor` (e.g. a `ProcessPoolExecutor`) is given, `apply` runs
+    in it: tasks cross the boundary through `dump_task`/`load_task`, status
+    transitions and callbacks stay in the calling process. The service
+    itself is sent once to each executor process, which keeps it.
+
+    When a `timeout` (in seconds) is given, a task whose `apply` does not
+    complete in time ends with the TIMEOUT status. Without an executor,
+    such calls run in at most `timeout_workers` threads, a hung call
+    holding its thread. A `retry_policy` retries
+    failed or timed out attempts, the task being RETRYING in between.
+
+    `validation` sets how tasks are checked: STRICT validates each task with
+    pydantic, BOUNDARY only checks the input and output types and builds
+    tasks through `Task.trusted`, OFF trusts the data entirely.
+
+    With a `cache`, `run` and `run_batch` return the completed output of a
+    previous call with the same input (see `input_key`) and arguments
+    without calling `apply`.
+
+    The service records its `metrics` (see `ServiceMetrics`): tasks by
+    final status, tasks in flight, their latency, the time spent in each
+    stage and batch sizes, into a `ServiceMetrics` named after the service
+    by default. Pass a `ServiceMetrics` to share it or False to record
+    nothing.
     """
 
+    # Threads running the calls to apply that have a timeout
+    timeout_workers: int = 32
+    # Attributes that are not sent to executor processes
+    _process_local_attributes: tuple[str, ...] = (
+        "_callback",
+        "_executor",
+        "_timeout_pool",
+        "cache",
+        "metrics",
+        "retry_policy",
+    )
+
     def __init__(
         self,
         task_definition: BaseTask,
@@ -19,16 +162,54 @@ class Service(ABC):
         callback: Callable[[Task], None] = lambda task: print(
             task.id, task.status, task.created_at, task.updated_at
         ),
+        executor: Optional[Executor] = None,
+        timeout: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        validation: ValidationLevel = ValidationLevel.STRICT,
+        cache: Optional[ResultCache] = None,
+        metrics: Union[ServiceMetrics, bool] = True,
     ):
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be greater than 0")
         self.task_definition = task_definition
         self.__name = name
         self._callback = callback
+        self._executor = executor
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.validation = ValidationLevel(validation)
+        self.cache = cache
+        self.metrics: Optional[ServiceMetrics] = (
+            ServiceMetrics(name) if metrics is True else metrics or None
+        )
+        self._timeout_pool = _DaemonPool(self.timeout_workers, f"{name}-timeout")
+        # Identifies the service in executor processes, once it has been sent
+        self._executor_key = f"{name}-{new_task_id()}"
+        self._executor_sent = False
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for attribute in self._process_local_attributes:
+            state.pop(attribute, None)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._callback = lambda task: None
+        self._executor = None
+        self._timeout_pool = None
+        self.cache = None
+        self.metrics = None
+        self.retry_policy = None
 
     def callback(self, task: Task, *args, **kwargs):
+        started = time.perf_counter()
         try:
             self._callback(task)
         except Exception as e:
             print(f"CallBack Failed {e}")
+        if self.metrics is not None:
+            self.metrics.observe_stage("callback", time.perf_counter() - started)
 
     @property
     def name(self) -> str:
@@ -39,35 +220,170 @@ class Service(ABC):
         """Process the input_data and return the result."""
         ...
 
-    def run(self, input_data: Any, *args, **kwargs) -> Task:
+    def progress(
+        self,
+        task: Task,
+        total: float = 1.0,
+        min_interval: float = 0.5,
+        min_delta: float = 0.01,
+    ) -> Progress:
         """
-        1. Validates that self.input_data is correct type
-        2. Calls apply(...)
-        3. Validates that the returned output matches self.output
-           and stores it in self.output_data
+        Progress reporter to use inside `apply`: it updates `task.percentage`
+        and gives the task, IN_PROGRESS, to the callback at most every
+        `min_interval` seconds and `min_delta` of percentage. Updates made
+        in an executor process are not reported.
+        """
+        return Progress(task, self.callback, total, min_interval, min_delta)
+
+    def apply_batch(self, tasks: list[Task], *args, **kwargs) -> list[Task]:
+        """
+        Process a list of tasks at once and return them in the same order.
+        Override it for vectorized inference. To fail a single item, call
+        `task.set_status_to_failed` on it instead of raising.
+        By default `apply` is called on each task, concurrently when the
+        service has an executor, within the timeout and retry policy of the
+        service.
+        """
+        futures = [
+            self._start(task, *args, **kwargs) if self._executor is not None else None
+            for task in tasks
+        ]
+        return [
+            self._apply_retrying(task, future, args, kwargs)
+            for task, future in zip(tasks, futures)
+        ]
+
+    def _apply_retrying(
+        self, task: Task, future: Optional[Future], args: tuple, kwargs: dict
+    ) -> Task:
+        """
+        `_apply` of a task of a batch, `future` being its first attempt if
+        already started, retried according to the retry policy. The task
+        ends FAILED or TIMEOUT instead of raising.
+        """
+        attempt = 1
+        while True:
+            try:
+                if future is not None:
+                    return self._result(task, future)
+                return self._apply(task, *args, **kwargs)
+            except Exception as e:
+                error = e
+            future = None
+            delay = self.retry_delay(attempt, error)
+            if delay is None:
+                if isinstance(error, TaskTimeoutError):
+                    task.set_status_to_timeout(error=str(error))
+                else:
+                    task.set_status_to_failed(error=str(error))
+                return task
+            task.set_status_to_retrying(error=str(error))
+            self.callback(task=task)
+            time.sleep(delay)
+            attempt += 1
+
+    def _submit(self, task: Task, *args, **kwargs):
+        # Only the first call sends the service, the executor processes that
+        # have not received it yet raise _ServiceNotSent (see `_result`)
+        service = None if self._executor_sent else self
+        self._executor_sent = True
+        payload = dump_task(task)
+        return self._executor.submit(
+            _apply_in_executor, self._executor_key, service, payload, args, kwargs
+        )
+
+    def _merge(self, task: Task, payload: dict) -> Task:
+        """Copy the result of an executor call back onto the local task."""
+        result = load_task(payload)
+        task.status = result.status
+        task.error = result.error
+        task.output_data = result.output_data
+        task.percentage = result.percentage
+        task.extras = result.extras
+        return task
+
+    def _apply(self, task: Task, *args, **kwargs) -> Task:
+        future = self._start(task, *args, **kwargs)
+        if future is None:
+            return self.apply(task, *args, **kwargs)
+        return self._result(task, future)
+
+    def _start(self, task: Task, *args, **kwargs) -> Optional[Future]:
+        """
+        Start `apply` in the executor or, with a timeout, in the timeout
+        pool. None when it is to be called directly.
         """
-        task = Task(
+        if self._executor is not None:
+            return self._submit(task, *args, **kwargs)
+        if self.timeout is not None:
+            # A hung apply cannot be interrupted: it keeps a copy of the task
+            # so that it does not change the returned one after the timeout.
+            return self._timeout_pool.submit(
+                self.apply, task.model_copy(), *args, **kwargs
+            )
+        return None
+
+    def _result(self, task: Task, future: Future) -> Task:
+        """Task of an `apply` started by `_start`, within the timeout."""
+        try:
+            result = future.result(timeout=self.timeout)
+        except _ServiceNotSent as error:
+            future = self._executor.submit(
+                _apply_in_executor, self._executor_key, self, *error.args
+            )
+            return self._result(task, future)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TaskTimeoutError(
+                f"apply did not complete within {self.timeout} seconds"
+            )
+        return result if isinstance(result, Task) else self._merge(task, result)
+
+    def _create_task(self, input_data: Any, id: Optional[str] = None) -> Task:
+        if self.validation == ValidationLevel.STRICT:
+            task = Task(
+                name=self.name,
+                status=TaskStatus.CREATED.value,
+                input=self.task_definition.input,
+                input_data=input_data,
+                output=self.task_definition.output,
+            )
+            if id:
+                task.id = id
+            return task
+
+        expected = self.task_definition.input
+        if (
+            self.validation == ValidationLevel.BOUNDARY
+            and input_data is not None
+            and expected is not None
+            and not is_instance(input_data, expected)
+        ):
+            raise TypeError(f"{input_data!r} is not instance of {expected}")
+        values = dict(
             name=self.name,
-            status=TaskStatus.CREATED.value,
-            input=self.task_definition.input,
+            input=expected,
             input_data=input_data,
             output=self.task_definition.output,
         )
-        task.set_status_to_started()
-        if kwargs.get("id"):
-            task.id = kwargs.get("id")
-        self.callback(task=task)
+        if id:
+            values["id"] = id
+        return Task.trusted(**values)
 
-        try:
-            task.set_status_to_in_progress()
-            self.callback(task=task)
-            task = self.apply(task=task, *args, **kwargs)
-        except Exception as e:
-            task.set_status_to_failed(error=str(e))
-            self.callback(task=task)
-            return task
+    def _validated_task(self, input_data: Any, id: Optional[str] = None) -> Task:
+        """`_create_task`, timed as the validation stage."""
+        if self.metrics is None:
+            return self._create_task(input_data, id=id)
+        started = time.perf_counter()
+        task = self._create_task(input_data, id=id)
+        self.metrics.observe_stage("validation", time.perf_counter() - started)
+        return task
 
-        if self.task_definition.output is not None and not isinstance(
+    def _check_output(self, task: Task) -> bool:
+        """Fail the task if its output_data does not match the expected output type."""
+        if self.validation == ValidationLevel.OFF:
+            return True
+        if self.task_definition.output is not None and not is_instance(
             task.output_data, self.task_definition.output
         ):
             message = (
@@ -76,9 +392,339 @@ class Service(ABC):
             )
             task.output_data = None
             task.set_status_to_failed(error=message)
+            return False
+        return True
+
+    def _cache_key(
+        self, task: Task, args: tuple = (), kwargs: Optional[dict] = None
+    ) -> Optional[str]:
+        """
+        Key of the output of `apply` for the task input and the extra
+        arguments given to it, None when they cannot be hashed.
+        """
+        if self.cache is None:
+            return None
+        key = input_key(task.input_data)
+        if key is None:
+            return None
+        # `id` names the task and is not an argument of `apply`
+        kwargs = {name: value for name, value in (kwargs or {}).items() if name != "id"}
+        if args or kwargs:
+            arguments = input_key([list(args), kwargs])
+            if arguments is None:
+                return None
+            key = f"{key}:{arguments}"
+        return f"{self.name}:{key}"
+
+    def _from_cache(self, task: Task, output: Any) -> Task:
+        task.output_data = output
+        task.extras["cached"] = True
+        return task
+
+    def _check_completed(self, task: Task):
+        """Complete the task if its output is valid, recording its status."""
+        metrics = self.metrics
+        if metrics is None:
+            if self._check_output(task):
+                task.set_status_to_completed()
+            return
+        started = time.perf_counter()
+        if self._check_output(task):
+            task.set_status_to_completed()
+        metrics.observe_stage("output_check", time.perf_counter() - started)
+        metrics.count(task.status)
+
+    def _set_final_status(self, task: Task, error: Optional[Exception] = None):
+        """Final status of a task after its last attempt, `error` being its cause."""
+        if error is None:
+            self._check_completed(task)
+            return
+        if isinstance(error, TaskTimeoutError):
+            task.set_status_to_timeout(error=str(error))
+        else:
+            task.set_status_to_failed(error=str(error))
+        if self.metrics is not None:
+            self.metrics.count(task.status)
+
+    def _invalid_task(self, error: Exception, id: Optional[str] = None) -> Task:
+        """Failed task standing for an input that could not be validated."""
+        task = self._create_task(None, id=id)
+        task.set_status_to_failed(error=str(error))
+        if self.metrics is not None:
+            self.metrics.count(task.status)
+        return task
+
+    def _lookup(
+        self, task: Task, args: tuple = (), kwargs: Optional[dict] = None
+    ) -> tuple[Optional[str], bool]:
+        """
+        Cache key of the task and whether it was found in the cache, in
+        which case the task is completed with the cached output.
+        """
+        key = self._cache_key(task, args, kwargs)
+        if key is None:
+            return None, False
+        output = self.cache.get(key)
+        if output is MISSING:
+            return key, False
+        self._check_completed(self._from_cache(task, output))
+        return key, True
+
+    def _store(self, key: Optional[str], task: Task):
+        if key is not None and task.status == TaskStatus.COMPLETED.value:
+            self.cache.set(key, task.output_data)
+
+    def _prepare_batch(
+        self,
+        plan: _BatchPlan,
+        inputs: Union[Batch, Iterable[Any]],
+        ids: Optional[Sequence[str]],
+        args: tuple,
+        kwargs: dict,
+    ) -> Iterator[Task]:
+        """
+        Create the tasks of a `run_batch` call into `plan`, yielding each
+        task to give to the callback.
+        """
+        items = inputs.items if isinstance(inputs, Batch) else list(inputs)
+        if ids is not None and len(ids) != len(items):
+            raise ValueError(f"Got {len(ids)} ids for {len(items)} inputs")
+        if self.metrics is not None:
+            self.metrics.begin()
+
+        for index, input_data in enumerate(items):
+            task_id = ids[index] if ids is not None else None
+            try:
+                task = self._validated_task(input_data, id=task_id)
+            except (TypeError, ValueError) as e:
+                task = self._invalid_task(e, id=task_id)
+                plan.tasks.append(task)
+                yield task
+                continue
+            plan.tasks.append(task)
+            key, hit = self._lookup(task, args, kwargs)
+            if hit:
+                yield task
+                continue
+            plan.keys[index] = key
+            task.set_status_to_started()
+            yield task
+            task.set_status_to_in_progress()
+            yield task
+            plan.positions.append(index)
+
+        if self.metrics is None:
+            return
+        if plan.positions:
+            self.metrics.observe_batch(len(plan.positions))
+            self.metrics.started(len(plan.positions))
+        elif plan.tasks:
+            self.metrics.observe_stages(len(plan.tasks))
+
+    def _collate_batch(
+        self,
+        plan: _BatchPlan,
+        results: Optional[list[Task]],
+        error: Optional[Exception],
+        started: float,
+    ) -> Iterator[Task]:
+        """
+        Set the final status of the tasks given to apply_batch from its
+        `results` or the `error` it raised, yielding each task to give to
+        the callback. `started` is when the batch was prepared.
+        """
+        pending = plan.pending
+        metrics = self.metrics
+        if error is None and len(results) != len(pending):
+            error = ValueError(
+                f"apply_batch returned {len(results)} tasks for {len(pending)} inputs"
+            )
+        if error is not None:
+            for task in pending:
+                task.set_status_to_failed(error=str(error))
+                if metrics is not None:
+                    metrics.count(task.status)
+                yield task
+        else:
+            for index, result in zip(plan.positions, results):
+                plan.tasks[index] = result
+                if result.status not in _FAILED_STATUSES:
+                    self._check_completed(result)
+                elif metrics is not None:
+                    metrics.count(result.status)
+                yield result
+                self._store(plan.keys[index], result)
+
+        if metrics is not None:
+            metrics.ended(len(pending))
+            metrics.observe(time.perf_counter() - started, len(pending))
+
+    def run(self, input_data: Any, *args, **kwargs) -> Task:
+        """
+        1. Validates that self.input_data is correct type
+        2. Calls apply(...)
+        3. Validates that the returned output matches self.output
+           and stores it in self.output_data
+        """
+        if self.metrics is not None:
+            self.metrics.begin()
+        started = time.perf_counter()
+        task = self._validated_task(input_data, id=kwargs.get("id"))
+        return self._run_task(task, started, *args, **kwargs)
+
+    def _run_task(self, task: Task, started: float, *args, **kwargs) -> Task:
+        """
+        `run` of an already created task, from the cache or executed,
+        `started` being when its creation started.
+        """
+        key, hit = self._lookup(task, args, kwargs)
+        if hit:
             self.callback(task=task)
+            if self.metrics is not None:
+                self.metrics.observe_stages()
             return task
+        task = self._execute(task, started, *args, **kwargs)
+        self._store(key, task)
+        return task
 
-        task.set_status_to_completed()
+    def execute(self, task: Task, *args, **kwargs) -> Task:
+        """
+        Run an already created task, e.g. one pulled from a queue, retrying
+        it according to the retry policy.
+        """
+        if self.metrics is not None:
+            self.metrics.begin()
+        return self._execute(task, time.perf_counter(), *args, **kwargs)
+
+    def _execute(self, task: Task, started: float, *args, **kwargs) -> Task:
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.started()
+        try:
+            task.set_status_to_started()
+            self.callback(task=task)
+
+            attempt = 1
+            while True:
+                task, error = self.attempt(task, *args, **kwargs)
+                delay = self.retry_delay(attempt, error) if error else None
+                if delay is None:
+                    return self.finish(task, error)
+                task.set_status_to_retrying(error=str(error))
+                self.callback(task=task)
+                time.sleep(delay)
+                attempt += 1
+        finally:
+            if metrics is not None:
+                metrics.ended()
+                metrics.observe(time.perf_counter() - started)
+
+    def attempt(
+        self, task: Task, *args, **kwargs
+    ) -> tuple[Task, Optional[Exception]]:
+        """Call apply once, returning the task and the error raised if any."""
+        task.set_status_to_in_progress()
+        self.callback(task=task)
+        started = time.perf_counter()
+        try:
+            return self._apply(task, *args, **kwargs), None
+        except Exception as e:
+            return task, e
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe_stage("apply", time.perf_counter() - started)
+
+    def retry_delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """Seconds to wait before retrying a failed attempt, None to give up."""
+        if self.retry_policy is None:
+            return None
+        return self.retry_policy.next_delay(attempt, error)
+
+    def finish(self, task: Task, error: Optional[Exception] = None) -> Task:
+        """Set the final status of a task after its last attempt."""
+        self._set_final_status(task, error)
         self.callback(task=task)
         return task
+
+    def run_batch(
+        self,
+        inputs: Union[Batch, Iterable[Any]],
+        *args,
+        ids: Optional[Sequence[str]] = None,
+        **kwargs,
+    ) -> list[Task]:
+        """
+        Batched counterpart of `run`:
+        1. Creates and validates one task per input; an invalid input only
+           fails its own task
+        2. Calls apply_batch(...) once with every valid task not found in
+           the cache
+        3. Validates each output and returns the tasks in input order
+        """
+        started = time.perf_counter()
+        plan = _BatchPlan()
+        for task in self._prepare_batch(plan, inputs, ids, args, kwargs):
+            self.callback(task=task)
+        if not plan.positions:
+            return plan.tasks
+
+        applied = time.perf_counter()
+        try:
+            results, error = self.apply_batch(plan.pending, *args, **kwargs), None
+        except Exception as e:
+            results, error = None, e
+        if self.metrics is not None:
+            self.metrics.observe_stage("apply", time.perf_counter() - applied)
+        for task in self._collate_batch(plan, results, error, started):
+            self.callback(task=task)
+        return plan.tasks
+
+    def _run_item(self, input_data: Any, *args, **kwargs) -> Task:
+        """`run`, returning a failed task instead of raising on an invalid input."""
+        try:
+            return self.run(input_data, *args, **kwargs)
+        except (TypeError, ValueError) as e:
+            task = self._invalid_task(e, id=kwargs.get("id"))
+            self.callback(task=task)
+            return task
+
+    def run_stream(
+        self,
+        inputs: Iterable[Any],
+        *args,
+        max_in_flight: int = 16,
+        ordered: bool = True,
+        **kwargs,
+    ) -> Iterator[Task]:
+        """
+        Lazily `run` every input of `inputs`, on `max_in_flight` threads, and
+        yield the tasks as they finish: in input order when `ordered`, else
+        as soon as each one is done. At most `max_in_flight` inputs are
+        taken from `inputs` ahead of the consumer, so memory does not grow
+        with the size of `inputs`. An invalid input only fails its own task.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be greater than 0")
+        items = iter(inputs)
+        pool = ThreadPoolExecutor(max_in_flight, thread_name_prefix=self.name)
+        pending: deque[Future] = deque()
+        try:
+            while True:
+                for input_data in items:
+                    pending.append(
+                        pool.submit(self._run_item, input_data, *args, **kwargs)
+                    )
+                    if len(pending) >= max_in_flight:
+                        break
+                if not pending:
+                    return
+                if ordered:
+                    yield pending.popleft().result()
+                    continue
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield future.result()
+        finally:
+            # Stopped early: inputs not started yet are dropped
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -1,6 +1,7 @@
+import time
 from typing import Any, Optional
 from pydantic import model_validator, Field
-from .base import BaseTask
+from .base import BaseTask, TaskStatus, is_instance, new_task_id
 
 
 class Task(BaseTask):
@@ -16,12 +17,12 @@ class Task(BaseTask):
 
         # 1) check input_data
         if self.input_data is not None:
-            if self.input is not None and not isinstance(self.input_data, self.input):
+            if self.input is not None and not is_instance(self.input_data, self.input):
                 raise TypeError(f"{self.input_data!r} is not instance of {self.input}")
 
         # 2) check output_data if already set
         if self.output_data is not None:
-            if self.output is not None and not isinstance(
+            if self.output is not None and not is_instance(
                 self.output_data, self.output
             ):
                 raise TypeError(
@@ -29,3 +30,35 @@ class Task(BaseTask):
                 )
 
         return self
+
+    @classmethod
+    def trusted(cls, **values) -> "Task":
+        """
+        Build a task without any validation, for data already checked by the
+        caller. Timestamps are stamped once.
+        """
+        now = int(time.time())
+        fields = dict(
+            id=values.get("id") or new_task_id(),
+            name=None,
+            status=TaskStatus.CREATED,
+            percentage=0.0,
+            created_at=now,
+            updated_at=now,
+            input=None,
+            output=None,
+            error=None,
+            extras={},
+            input_data=None,
+            output_data=None,
+        )
+        fields.update(values)
+        if fields["name"] is None:
+            fields["name"] = fields["id"]
+        # What `model_construct` does, without looking up each field default
+        task = cls.__new__(cls)
+        object.__setattr__(task, "__dict__", fields)
+        object.__setattr__(task, "__pydantic_fields_set__", set(values))
+        object.__setattr__(task, "__pydantic_extra__", {})
+        object.__setattr__(task, "__pydantic_private__", None)
+        return task
@@ -0,0 +1,89 @@
+import asyncio
+import time
+import pytest
+from zendata.api.health import Health
+from zendata.api.probes import HealthProbes
+
+
+def test_probes_run_concurrently_with_timeouts():
+    probes = HealthProbes(name="main", timeout=0.05)
+
+    @probes.register("db")
+    async def db():
+        await asyncio.sleep(0.02)
+
+    @probes.register("cache")
+    async def cache():
+        await asyncio.sleep(0.02)
+        return False
+
+    @probes.register("slow")
+    async def slow():
+        await asyncio.sleep(1)
+
+    @probes.register("broken")
+    async def broken():
+        raise ConnectionError("refused")
+
+    probes.register(
+        "nested", lambda: asyncio.sleep(0, Health(name="nested", dependencies=[]))
+    )
+
+    start = time.perf_counter()
+    health = asyncio.run(probes.check())
+    assert time.perf_counter() - start < 0.5
+
+    by_name = {dependency.name: dependency for dependency in health.dependencies}
+    assert by_name["db"].status == "healthy"
+    assert by_name["nested"].status == "healthy"
+    assert by_name["cache"].status_code == 503
+    assert by_name["slow"].status_code == 504
+    assert by_name["broken"].error == "refused"
+    assert health.status == "unhealthy"
+    assert "service: broken - error refused" in health.error
+
+
+def test_get_is_cached_and_refreshed_in_background():
+    calls = []
+    probes = HealthProbes(name="main", ttl=60)
+
+    @probes.register("db")
+    async def db():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    async def main():
+        first, second = await asyncio.gather(probes.get(), probes.get())
+        assert first is second
+        assert await probes.get() is first
+        assert len(calls) == 1
+
+        probes.ttl = 0
+        stale = await probes.get()
+        assert stale is first
+        await probes.refresh()
+        assert len(calls) == 2
+        probes.ttl = 60
+        assert await probes.get() is not first
+
+    asyncio.run(main())
+
+
+def test_start_and_stop_background_refresh():
+    calls = []
+    probes = HealthProbes(name="main", ttl=60)
+    probes.register("db", lambda: asyncio.sleep(0, calls.append(1)))
+
+    async def main():
+        probes.start(interval=0.01)
+        await asyncio.sleep(0.1)
+        await probes.stop()
+        assert len(calls) >= 2
+        assert probes.is_fresh
+
+    asyncio.run(main())
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        HealthProbes(name="main", timeout=0)
@@ -0,0 +1,120 @@
+import pytest
+from typing import Optional
+from pydantic import BaseModel
+from zendata.core.batch import Batch
+from zendata.core.codec import decode, encode, schema_of
+from zendata.data.audio import AudioBytesData
+from zendata.data.ml.audio.transcription import PredictedTranscription, PredictWordLevel
+from zendata.data.ml.computer_vision.detection import PredictBbox
+from zendata.data.text.text import TextData
+from zendata.tasks.base import TaskStatus
+from zendata.tasks.task import Task
+
+
+def test_codec_round_trip_table():
+    transcription = PredictedTranscription(
+        type="transcription",
+        transcriptions=[
+            PredictWordLevel(start=i, end=i + 0.5, word=word, confidence=0.5)
+            for i, word in enumerate(["a", "b", "a", "c"] * 5)
+        ],
+    )
+
+    payload = encode(transcription)
+    assert schema_of(payload).endswith("PredictedTranscription")
+    assert decode(payload) == transcription
+    assert len(payload) < len(transcription.model_dump_json())
+
+
+def test_codec_writes_raw_bytes():
+    audio = AudioBytesData(
+        data=bytes(range(256)), frames=128, channels=1, sample_rate=16
+    )
+
+    payload = encode(audio)
+    assert bytes(range(256)) in payload
+    assert decode(payload) == audio
+
+
+def test_codec_round_trip_task():
+    task = Task(input=TextData, output=TextData, input_data=TextData(text="héllo"))
+    task.set_status_to_failed("error")
+    task.extras["scores"] = [1, -2, 2**70, 0.5, None, True]
+
+    loaded = decode(encode(task))
+    assert loaded == task
+    assert loaded.status == TaskStatus.FAILED
+    assert isinstance(loaded.input_data, TextData)
+
+
+def test_codec_generic_model_with_type():
+    batch = Batch[PredictBbox](
+        type="batch",
+        items=[
+            PredictBbox(x=0.1, y=0.2, width=0.3, height=0.4, label="car", confidence=1)
+        ]
+        * 3,
+    )
+
+    assert decode(encode(batch), Batch[PredictBbox]) == batch
+
+
+def test_codec_rejects_invalid_payload():
+    payload = encode(TextData(text="hello"))
+
+    with pytest.raises(ValueError):
+        decode(b"not a payload")
+    with pytest.raises(ValueError):
+        decode(payload[:-2])
+
+
+def test_codec_round_trip_nested_table_in_task():
+    transcription = PredictedTranscription(
+        type="transcription",
+        transcriptions=[
+            PredictWordLevel(start=i, end=i + 1, word=str(i), confidence=1.0)
+            for i in range(3)
+        ],
+    )
+    task = Task(
+        input=PredictedTranscription, output=TextData, input_data=transcription
+    )
+
+    loaded = decode(encode(task))
+    assert loaded == task
+    assert isinstance(loaded.input_data, PredictedTranscription)
+
+
+def test_codec_round_trip_batch_of_raw_bytes():
+    batch = Batch[AudioBytesData](
+        type="batch",
+        items=[
+            AudioBytesData(
+                data=bytes([0xFF, 0xFE, i]) * (i + 1),
+                frames=3,
+                channels=1,
+                sample_rate=8000,
+            )
+            for i in range(4)
+        ],
+    )
+
+    payload = encode(batch)
+    assert b"\xff\xfe\x03" * 4 in payload
+    loaded = decode(payload, Batch[AudioBytesData])
+    assert loaded == batch
+    assert loaded.items[2].data == b"\xff\xfe\x02" * 3
+
+
+class Chunk(BaseModel):
+    data: Optional[bytes] = None
+
+
+class Chunks(BaseModel):
+    items: list[Chunk]
+
+
+def test_codec_bytes_column_keeps_none():
+    chunks = Chunks(items=[Chunk(data=b"\x80"), Chunk(), Chunk(data=b"")])
+
+    assert decode(encode(chunks), Chunks) == chunks
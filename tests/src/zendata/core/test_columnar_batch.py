@@ -0,0 +1,67 @@
+from array import array
+import pytest
+from pydantic import ValidationError
+from zendata.core.batch import Batch
+from zendata.core.columnar import ColumnarBatch
+from zendata.data.ml.classification import PredictLabel
+from zendata.data.ml.computer_vision.detection import PredictBbox
+
+
+def make_bboxes() -> ColumnarBatch[PredictBbox]:
+    return ColumnarBatch(
+        PredictBbox,
+        {
+            "x": [0.1, 0.2, 0.3],
+            "y": [0.0, 0.0, 0.5],
+            "width": [0.1, 0.1, 0.1],
+            "height": [0.2, 0.2, 0.2],
+            "label": ["car", "person", "car"],
+            "confidence": [0.9, 0.2, 0.6],
+        },
+    )
+
+
+def test_columnar_batch_typed_columns():
+    batch = make_bboxes()
+
+    assert len(batch) == 3
+    assert isinstance(batch.column("x"), array)
+    assert batch.column("label") == ["car", "person", "car"]
+    assert batch[2] == PredictBbox(
+        x=0.3, y=0.5, width=0.1, height=0.2, label="car", confidence=0.6
+    )
+
+
+def test_columnar_batch_validates_columns():
+    with pytest.raises(ValidationError):
+        ColumnarBatch(PredictLabel, {"label": ["car"], "confidence": [2.0]})
+    with pytest.raises(ValueError):
+        ColumnarBatch(PredictLabel, {"label": ["car"], "confidence": [0.1, 0.2]})
+    with pytest.raises(ValueError):
+        ColumnarBatch(PredictLabel, {"confidence": [0.1]})
+
+
+def test_columnar_batch_fills_defaults():
+    batch = ColumnarBatch(PredictLabel, {"label": ["car", "bike"]})
+
+    assert list(batch.column("confidence")) == [0.0, 0.0]
+
+
+def test_columnar_batch_filter_take_sort():
+    batch = make_bboxes()
+
+    assert batch.where("confidence", lambda value: value > 0.5).column("x") == array(
+        "d", [0.1, 0.3]
+    )
+    assert batch.filter([False, True, False])[0].label == "person"
+    assert [row.x for row in batch.take([2, 0])] == [0.3, 0.1]
+    assert batch.sort("confidence").column("label") == ["person", "car", "car"]
+    assert batch.argsort(["label", "confidence"], reverse=True) == [1, 0, 2]
+
+
+def test_columnar_batch_round_trip_batch():
+    batch = Batch[PredictBbox](type="batch", items=list(make_bboxes()))
+
+    columnar = ColumnarBatch.from_batch(batch)
+    assert columnar.item_type is PredictBbox
+    assert columnar.to_batch().items == batch.items
@@ -0,0 +1,67 @@
+import hashlib
+import io
+import os
+import pytest
+from zendata.data.files.checksum import (
+    ChecksumCache,
+    fill_checksum,
+    fill_checksums,
+    hash_path,
+    hash_stream,
+)
+from zendata.data.files.file import File
+
+
+def make_file(path, content: bytes, size=None) -> File:
+    path.write_bytes(content)
+    return File(
+        type="binary",
+        source="test",
+        filename=path.name,
+        size=len(content) if size is None else size,
+        content_type="application/octet-stream",
+        save_path=path,
+    )
+
+
+def test_hash_stream_in_chunks():
+    content = os.urandom(10_000)
+
+    checksum, size = hash_stream(io.BytesIO(content), chunk_size=1024)
+    assert checksum == f"sha256:{hashlib.sha256(content).hexdigest()}"
+    assert size == 10_000
+
+
+def test_fill_checksum_checks_size(tmp_path):
+    file = fill_checksum(make_file(tmp_path / "a.bin", b"abc"), cache=None)
+    assert file.checksum == f"sha256:{hashlib.sha256(b'abc').hexdigest()}"
+
+    with pytest.raises(ValueError):
+        fill_checksum(make_file(tmp_path / "b.bin", b"abc", size=4), cache=None)
+
+
+def test_hash_path_cache(tmp_path):
+    cache = ChecksumCache()
+    path = tmp_path / "a.bin"
+    path.write_bytes(b"abc")
+
+    first, _ = hash_path(path, cache=cache)
+    assert len(cache) == 1
+    assert hash_path(path, cache=cache)[0] == first
+
+    path.write_bytes(b"abcd")
+    os.utime(path, ns=(0, 1))
+    second, size = hash_path(path, cache=cache)
+    assert second != first
+    assert size == 4
+    assert len(cache) == 2
+
+
+def test_fill_checksums_in_parallel(tmp_path):
+    files = [make_file(tmp_path / f"{i}.bin", os.urandom(i * 100)) for i in range(8)]
+
+    filled = fill_checksums(files, algorithm="md5", cache=None, max_workers=4)
+    assert [file.checksum for file in filled] == [
+        f"md5:{hashlib.md5(file.save_path.read_bytes()).hexdigest()}"
+        for file in files
+    ]
@@ -0,0 +1,180 @@
+import array
+import pickle
+import wave
+import pytest
+from pydantic import HttpUrl
+from zendata.data.files.audio import Audio
+from zendata.data.files.file import File
+from zendata.data.files.image import Image
+from zendata.data.files.payload import FilePayload
+from zendata.data.vectors.tensor import DType
+
+
+def make_file(path, content: bytes) -> File:
+    path.write_bytes(content)
+    return File(
+        type="binary",
+        source="test",
+        filename=path.name,
+        size=len(content),
+        content_type="application/octet-stream",
+        save_path=path,
+    )
+
+
+def test_payload_is_mapped_lazily(tmp_path):
+    file = make_file(tmp_path / "data.bin", b"0123456789")
+
+    assert not file.payload.is_open
+    with file.payload.read(2, 5) as view:
+        assert bytes(view) == b"234"
+    assert file.payload.is_open
+    assert len(file.payload) == 10
+
+    file.payload.close()
+    assert not file.payload.is_open
+
+
+def test_payload_close_with_live_views(tmp_path):
+    file = make_file(tmp_path / "data.bin", b"0123456789")
+
+    view = file.payload.read()
+    with pytest.raises(BufferError):
+        file.payload.close()
+    view.release()
+    file.payload.close()
+
+
+def test_payload_requires_local_path():
+    file = File(
+        type="binary",
+        source="web",
+        filename="data.bin",
+        size=1,
+        content_type="application/octet-stream",
+        save_path=HttpUrl("https://example.com/data.bin"),
+    )
+
+    with pytest.raises(ValueError):
+        file.payload
+
+
+def test_payload_pickles_path_only(tmp_path):
+    file = make_file(tmp_path / "data.bin", b"abc")
+    file.payload.read().release()
+
+    loaded = pickle.loads(pickle.dumps(file))
+    assert not loaded.payload.is_open
+    with loaded.payload, loaded.payload.read() as view:
+        assert bytes(view) == b"abc"
+    file.payload.close()
+
+
+def test_empty_payload(tmp_path):
+    with FilePayload(make_file(tmp_path / "empty.bin", b"").save_path) as payload:
+        assert len(payload) == 0
+        assert bytes(payload.read()) == b""
+
+
+def make_audio(path, frames: int, channels: int) -> Audio:
+    return Audio(
+        frames=frames,
+        channels=channels,
+        sample_rate=8,
+        source="test",
+        filename=path.name,
+        size=path.stat().st_size,
+        content_type="audio/wav",
+        save_path=path,
+    )
+
+
+def write_wav(path, samples: bytes, channels: int, sample_width: int):
+    with wave.open(str(path), "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(sample_width)
+        writer.setframerate(8)
+        writer.writeframes(samples)
+
+
+def test_audio_pcm_view_of_wav(tmp_path):
+    path = tmp_path / "sound.wav"
+    samples = array.array("h", range(-8, 8))
+    write_wav(path, samples.tobytes(), channels=2, sample_width=2)
+    audio = make_audio(path, frames=8, channels=2)
+
+    with audio.payload:
+        pcm = audio.pcm()
+        assert pcm.sample_format == DType.INT16
+        assert pcm.samples().tolist()[0] == [-8, -7]
+        assert pcm.channel(1).tolist() == samples.tolist()[1::2]
+        assert pcm.slice(0.5, 1.0).frames == 4
+        del pcm
+
+
+def test_audio_pcm_view_reads_wav_sample_width(tmp_path):
+    path = tmp_path / "sound.wav"
+    samples = array.array("i", range(-4, 4))
+    write_wav(path, samples.tobytes(), channels=1, sample_width=4)
+    audio = make_audio(path, frames=8, channels=1)
+
+    with audio.payload:
+        pcm = audio.pcm()
+        assert pcm.sample_format == DType.INT32
+        assert pcm.channel(0).tolist() == samples.tolist()
+        del pcm
+
+        with pytest.raises(ValueError, match="int32"):
+            audio.pcm(DType.INT16)
+
+
+def test_audio_pcm_view_of_8_bit_wav(tmp_path):
+    path = tmp_path / "sound.wav"
+    samples = bytes(range(120, 136))
+    write_wav(path, samples, channels=2, sample_width=1)
+    audio = make_audio(path, frames=8, channels=2)
+
+    with audio.payload:
+        pcm = audio.pcm()
+        assert pcm.sample_format == DType.UINT8
+        assert pcm.channel(0).tolist() == list(samples[::2])
+        del pcm
+
+
+def test_audio_pcm_view_rejects_unsupported_wav(tmp_path):
+    path = tmp_path / "sound.wav"
+    write_wav(path, bytes(3 * 8), channels=1, sample_width=3)
+
+    audio = make_audio(path, frames=8, channels=1)
+
+    with audio.payload, pytest.raises(ValueError, match="24 bits"):
+        audio.pcm()
+
+
+def test_audio_pcm_view_checks_wav_channels(tmp_path):
+    path = tmp_path / "sound.wav"
+    write_wav(path, bytes(2 * 8), channels=1, sample_width=2)
+    audio = make_audio(path, frames=4, channels=2)
+
+    with audio.payload, pytest.raises(ValueError, match="1 channels"):
+        audio.pcm()
+
+
+def test_image_tensor_view(tmp_path):
+    path = tmp_path / "pixels.raw"
+    path.write_bytes(bytes(range(2 * 3 * 3)))
+    image = Image(
+        width=3,
+        height=2,
+        source="test",
+        filename=path.name,
+        size=18,
+        content_type="application/octet-stream",
+        save_path=path,
+    )
+
+    with image.payload:
+        tensor = image.tensor()
+        assert tensor.shape == [2, 3, 3]
+        assert tensor.view()[1, 2, 0] == 15
+        del tensor
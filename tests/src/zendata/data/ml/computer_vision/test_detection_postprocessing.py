@@ -0,0 +1,130 @@
+import random
+import pytest
+from zendata.core.columnar import ColumnarBatch
+from zendata.data.ml.computer_vision import postprocessing
+from zendata.data.ml.computer_vision.detection import (
+    PredictBbox,
+    PredictedImageDetection,
+)
+from zendata.data.ml.computer_vision.postprocessing import (
+    iou_matrix,
+    nms,
+    postprocess,
+    soft_nms,
+    threshold,
+)
+
+
+@pytest.fixture(params=["numpy", "python"], autouse=True)
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(postprocessing, "np", None)
+    elif postprocessing.np is None:
+        pytest.skip("numpy is not installed")
+
+
+def bbox(x, y, confidence, label="car", size=0.2) -> PredictBbox:
+    return PredictBbox(
+        x=x, y=y, width=size, height=size, label=label, confidence=confidence
+    )
+
+
+def test_iou_matrix():
+    boxes = [bbox(0.0, 0.0, 0.9), bbox(0.1, 0.0, 0.8), bbox(0.5, 0.5, 0.7)]
+
+    ious = iou_matrix(boxes)
+    assert ious[0][0] == pytest.approx(1.0)
+    assert ious[0][1] == pytest.approx(0.02 / 0.06)
+    assert ious[0][2] == 0.0
+    assert len(iou_matrix(boxes, boxes[:1])[0]) == 1
+
+
+def test_nms_is_class_aware():
+    boxes = [
+        bbox(0.1, 0.0, 0.8),
+        bbox(0.0, 0.0, 0.9),
+        bbox(0.0, 0.0, 0.7, label="person"),
+        bbox(0.5, 0.5, 0.6),
+    ]
+
+    assert [box.confidence for box in nms(boxes, 0.3)] == [0.9, 0.7, 0.6]
+    assert [box.confidence for box in nms(boxes, 0.3, class_aware=False)] == [0.9, 0.6]
+    assert len(nms(boxes, 0.3, max_detections=1)) == 1
+
+
+def test_nms_on_columnar_batch():
+    boxes = ColumnarBatch.from_items([bbox(0.1, 0.0, 0.8), bbox(0.0, 0.0, 0.9)])
+
+    kept = nms(boxes, 0.3)
+    assert isinstance(kept, ColumnarBatch)
+    assert list(kept.column("confidence")) == [0.9]
+
+
+def test_soft_nms_decays_overlapping_boxes():
+    boxes = [bbox(0.0, 0.0, 0.9), bbox(0.1, 0.0, 0.8), bbox(0.5, 0.5, 0.7)]
+
+    kept = soft_nms(boxes, method="linear", iou_threshold=0.3)
+    assert [box.confidence for box in kept] == pytest.approx(
+        [0.9, 0.7, 0.8 * (1 - 0.02 / 0.06)]
+    )
+    assert boxes[1].confidence == 0.8
+    with pytest.raises(ValueError):
+        soft_nms(boxes, method="unknown")
+
+
+def test_soft_nms_matches_the_python_loop():
+    generator = random.Random(0)
+    boxes = [
+        bbox(
+            generator.uniform(0, 0.8),
+            generator.uniform(0, 0.8),
+            generator.random(),
+            label=generator.choice(["car", "person"]),
+            size=generator.uniform(0.05, 0.2),
+        )
+        for _ in range(200)
+    ]
+    corners = [
+        (box.x, box.y, box.x + box.width, box.y + box.height) for box in boxes
+    ]
+    keep, scores = postprocessing._soft_nms(
+        corners,
+        [box.confidence for box in boxes],
+        postprocessing._groups([box.label for box in boxes], True),
+        0.3,
+        0.5,
+        "gaussian",
+        0.01,
+    )
+
+    kept = soft_nms(ColumnarBatch.from_items(boxes), min_confidence=0.01)
+    assert list(kept.column("x")) == [boxes[index].x for index in keep]
+    assert list(kept.column("confidence")) == pytest.approx(
+        [scores[index] for index in keep]
+    )
+
+
+def test_threshold():
+    boxes = [bbox(0.0, 0.0, 0.9), bbox(0.1, 0.0, 0.2)]
+
+    assert threshold(boxes, 0.5) == boxes[:1]
+
+
+def test_postprocess_batch_keeps_images_apart():
+    detections = [
+        PredictedImageDetection(
+            type="detection",
+            bboxes=[bbox(0.0, 0.0, 0.9), bbox(0.1, 0.0, 0.8), bbox(0.5, 0.5, 0.1)],
+        ),
+        PredictedImageDetection(type="detection", bboxes=[bbox(0.0, 0.0, 0.5)]),
+    ]
+
+    results = postprocess(detections, min_confidence=0.2, iou_threshold=0.3)
+    assert [[box.confidence for box in result.bboxes] for result in results] == [
+        [0.9],
+        [0.5],
+    ]
+    assert results[0].id == detections[0].id
+
+    soft = postprocess(detections, iou_threshold=0.3, method="soft-nms")
+    assert len(soft[0].bboxes) == 3
@@ -0,0 +1,89 @@
+import array
+import pytest
+from zendata.data.audio import AudioPCMData
+from zendata.data.vectors.tensor import DType
+
+
+def test_audio_pcm_infers_frames():
+    audio = AudioPCMData(data=array.array("h", range(20)), channels=2, sample_rate=10)
+
+    assert audio.frames == 10
+    assert audio.duration == 1.0
+    assert audio.shape == [10, 2]
+    assert audio.channel(1).tolist() == list(range(1, 20, 2))
+
+
+def test_audio_pcm_infers_format_from_typed_buffers():
+    audio = AudioPCMData(data=array.array("f", range(8)), channels=2, sample_rate=4)
+
+    assert audio.sample_format == DType.FLOAT32
+    assert audio.frames == 4
+    assert audio.channel(0).tolist() == [0.0, 2.0, 4.0, 6.0]
+    raw = AudioPCMData(data=bytes(8), channels=2, sample_rate=4)
+    assert raw.sample_format == DType.INT16
+    assert raw.frames == 2
+    with pytest.raises(ValueError):
+        AudioPCMData(
+            data=array.array("f", range(8)),
+            channels=2,
+            sample_rate=4,
+            sample_format=DType.INT16,
+        )
+
+
+def test_audio_pcm_checks_buffer_size():
+    with pytest.raises(ValueError):
+        AudioPCMData(data=bytes(6), frames=2, channels=2, sample_rate=10)
+    with pytest.raises(ValueError):
+        AudioPCMData(
+            data=bytes(16),
+            frames=2,
+            channels=1,
+            sample_rate=10,
+            sample_format=DType.INT64,
+        )
+
+
+def test_audio_pcm_slice_is_zero_copy():
+    buffer = bytearray(array.array("h", range(20)).tobytes())
+    audio = AudioPCMData(data=buffer, channels=2, sample_rate=10)
+
+    part = audio.slice(0.2, 0.5)
+    assert part.frames == 3
+    assert part.extras["offset"] == 0.2
+    assert part.samples().tolist() == [[4, 5], [6, 7], [8, 9]]
+
+    buffer[8:10] = array.array("h", [-1]).tobytes()
+    assert part.samples().tolist()[0] == [-1, 5]
+
+
+def test_audio_pcm_planar_slice():
+    audio = AudioPCMData(
+        data=array.array("f", range(20)),
+        channels=2,
+        sample_rate=10,
+        sample_format=DType.FLOAT32,
+        layout="planar",
+    )
+
+    assert audio.slice(0.2, 0.5).samples().tolist() == [[2, 3, 4], [12, 13, 14]]
+    assert audio.channel(1).tolist() == list(range(10, 20))
+
+
+def test_audio_pcm_chunks_overlap():
+    audio = AudioPCMData(data=array.array("h", range(10)), channels=1, sample_rate=10)
+
+    chunks = list(audio.chunks(0.4, overlap=0.1))
+    assert [chunk.extras["offset"] for chunk in chunks] == [0.0, 0.3, 0.6]
+    assert [chunk.frames for chunk in chunks] == [4, 4, 4]
+    assert chunks[1].samples().tolist() == [[3], [4], [5], [6]]
+    with pytest.raises(ValueError):
+        next(audio.chunks(0.4, overlap=0.4))
+
+
+def test_audio_pcm_json_round_trip():
+    audio = AudioPCMData(data=array.array("h", range(8)), channels=2, sample_rate=4)
+
+    loaded = AudioPCMData.model_validate_json(audio.model_dump_json())
+    assert loaded.frames == 4
+    assert loaded.samples().tolist() == audio.samples().tolist()
@@ -0,0 +1,77 @@
+import array
+
+import pytest
+from pydantic import ValidationError
+
+from zendata.data.vectors.tensor import BufferTensorInput, DType
+
+
+def test_buffer_tensor_from_bytes_buffer():
+    data = array.array("f", range(6)).tobytes()
+
+    tensor = BufferTensorInput(data=data, dtype="float32", shape=[2, 3])
+
+    assert tensor.data is data
+    assert tensor.nbytes == 24
+    assert tensor.size == 6
+    assert tensor.tolist() == [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]]
+
+
+def test_buffer_tensor_infers_dtype_and_shape():
+    tensor = BufferTensorInput(data=array.array("h", [1, 2, 3]))
+
+    assert tensor.dtype == DType.INT16
+    assert tensor.shape == [3]
+
+
+def test_buffer_tensor_validates_size():
+    with pytest.raises(ValidationError):
+        BufferTensorInput(data=bytes(10), dtype="float32", shape=[2, 2])
+
+
+def test_buffer_tensor_exposes_buffer_protocol():
+    data = bytearray(array.array("i", [1, 2, 3, 4]).tobytes())
+    tensor = BufferTensorInput(data=data, dtype="int32", shape=[2, 2])
+
+    view = memoryview(tensor)
+    data[0] = 9
+
+    assert view.shape == (2, 2)
+    assert view[0, 0] == 9
+
+
+def test_buffer_tensor_bytes_round_trip():
+    tensor = BufferTensorInput(
+        data=array.array("d", [1.5, 2.5]), shape=[2, 1], source_id="source"
+    )
+
+    payload = tensor.to_bytes()
+    loaded = BufferTensorInput.from_bytes(payload)
+
+    assert len(payload) < 200
+    assert loaded.id == tensor.id
+    assert loaded.source_id == "source"
+    assert loaded.dtype == DType.FLOAT64
+    assert loaded.shape == [2, 1]
+    assert loaded.tolist() == [[1.5], [2.5]]
+
+
+def test_buffer_tensor_json_round_trip():
+    tensor = BufferTensorInput(data=array.array("B", [1, 2, 3]))
+
+    loaded = BufferTensorInput.model_validate_json(tensor.model_dump_json())
+
+    assert loaded.tolist() == [1, 2, 3]
+    assert isinstance(tensor.model_dump()["data"], bytes)
+
+
+def test_buffer_tensor_numpy():
+    np = pytest.importorskip("numpy")
+    array_ = np.arange(12, dtype=np.int64).reshape(3, 4)
+
+    tensor = BufferTensorInput(data=array_)
+
+    assert tensor.dtype == DType.INT64
+    assert tensor.shape == [3, 4]
+    assert np.shares_memory(tensor.numpy(), array_)
+    assert np.asarray(tensor).sum() == 66
@@ -0,0 +1,87 @@
+import pytest
+from zendata.data.ml.computer_vision.embedding import ImageEmbedding
+from zendata.data.ml.embedding import Embedding
+from zendata.data.vectors.index import EmbeddingIndex
+
+np = pytest.importorskip("numpy")
+
+
+def clustered_vectors(count=2000, dimension=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(20, dimension))
+    labels = rng.integers(0, 20, count)
+    return (centers[labels] + 0.1 * rng.normal(size=(count, dimension))).astype(
+        np.float32
+    )
+
+
+def test_index_exact_cosine_search():
+    index = EmbeddingIndex(3)
+    index.add(
+        [
+            ImageEmbedding(type="embedding", id="x", vector=[1, 0, 0]),
+            ImageEmbedding(type="embedding", id="y", vector=[0, 2, 0]),
+            Embedding(vector=[1, 1, 0]),
+        ]
+    )
+
+    assert index.ids == ["x", "y", "2"]
+    hits = index.search([[0, 5, 0], Embedding(vector=[1, 0.1, 0])], k=2)
+    assert [hit.id for hit in hits[0]] == ["y", "2"]
+    assert hits[0][0].score == pytest.approx(1.0)
+    assert [hit.id for hit in hits[1]] == ["x", "2"]
+    assert len(index.search([[1, 0, 0]], k=5)[0]) == 3
+
+
+def test_index_dot_metric_and_duplicate_ids():
+    index = EmbeddingIndex(2, metric="dot")
+    index.add([[1, 0], [3, 0]], ids=["small", "large"])
+
+    assert index.search([[1, 0]], k=1)[0][0].id == "large"
+    with pytest.raises(ValueError):
+        index.add([[0, 1]], ids=["small"])
+    with pytest.raises(ValueError):
+        index.add([[0, 1, 2]])
+
+
+def test_index_ivf_matches_exact_search():
+    vectors = clustered_vectors()
+    index = EmbeddingIndex(16)
+    index.add(vectors)
+    queries = vectors[:50] + 0.01
+    _, exact = index.search_arrays(queries, k=5)
+
+    index.train(n_lists=20)
+    _, approximate = index.search_arrays(queries, k=5, nprobe=4)
+    recall = np.mean([len(set(a) & set(b)) / 5 for a, b in zip(exact, approximate)])
+    assert recall > 0.9
+
+    index.add(vectors[:1] * 2, ids=["new"])
+    assert index.search(vectors[:1], k=2, nprobe=4)[0][1].id in {"0", "new"}
+
+
+def test_index_duplicates():
+    index = EmbeddingIndex(2)
+    index.add([[1, 0], [1, 0.01], [0, 1]], ids=["a", "b", "c"])
+
+    assert [(a, b) for a, b, _ in index.duplicates(threshold=0.99)] == [("a", "b")]
+
+
+def test_index_save_and_load_memory_mapped(tmp_path):
+    vectors = clustered_vectors(500)
+    index = EmbeddingIndex(16)
+    index.add(vectors)
+    index.train(n_lists=10)
+    index.save(tmp_path / "index.zidx")
+
+    loaded = EmbeddingIndex.load(tmp_path / "index.zidx")
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.ids == index.ids
+    np.testing.assert_array_equal(
+        loaded.search_arrays(vectors[:10], k=3, nprobe=2)[1],
+        index.search_arrays(vectors[:10], k=3, nprobe=2)[1],
+    )
+
+    loaded.add([vectors[0]], ids=["copy"])
+    assert len(loaded) == 501
+    assert not isinstance(loaded.vectors, np.memmap)
@@ -0,0 +1,168 @@
+import pickle
+import pytest
+from zendata.data.ml.audio.diarisation import (
+    GroundTruthDiarization,
+    PredicSpeakerLevel,
+    PredictedDiarization,
+    SpeakerLevel,
+)
+from zendata.data.ml.audio.transcription import (
+    GroundTruthTranscription,
+    PredictedTranscription,
+    PredictWordLevel,
+    WordLevel,
+)
+from zendata.data.ml.computer_vision.classification import (
+    GtImageClassification,
+    ImageClassification,
+)
+from zendata.data.ml.computer_vision.detection import (
+    GroundTruthBbox,
+    GtImageDetection,
+    PredictBbox,
+    PredictedImageDetection,
+)
+from zendata.evaluation.classification import ClassificationAccumulator
+from zendata.evaluation.detection import DetectionAccumulator
+from zendata.evaluation.diarization import DERAccumulator
+from zendata.evaluation.transcription import WERAccumulator, edit_operations
+
+
+def gt_box(x, label="car") -> GroundTruthBbox:
+    return GroundTruthBbox(x=x, y=0.0, width=0.2, height=0.2, label=label)
+
+
+def pred_box(x, confidence, label="car") -> PredictBbox:
+    return PredictBbox(
+        x=x, y=0.0, width=0.2, height=0.2, label=label, confidence=confidence
+    )
+
+
+def detection_pair(truths, predictions):
+    return (
+        GtImageDetection(type="detection", bboxes=truths),
+        PredictedImageDetection(type="detection", bboxes=predictions),
+    )
+
+
+def test_detection_map():
+    perfect = DetectionAccumulator().update(
+        *detection_pair([gt_box(0.0)], [pred_box(0.0, 0.9)])
+    )
+    assert perfect.result().map == pytest.approx(1.0)
+
+    accumulator = DetectionAccumulator(iou_thresholds=[0.5, 0.9])
+    accumulator.update(
+        *detection_pair(
+            [gt_box(0.0), gt_box(0.5)],
+            [pred_box(0.0, 0.9), pred_box(0.6, 0.8), pred_box(0.48, 0.7)],
+        )
+    )
+    result = accumulator.result()
+    # 0.5: hit at rank 1, miss at rank 2, hit at rank 3 -> AP = 0.5 + 0.5 * 2/3
+    assert result.ap_by_threshold[0.5] == pytest.approx(0.5 + 0.5 * 2 / 3)
+    assert result.ap_by_threshold[0.9] == pytest.approx(0.5)
+    assert result.ap["car"] == pytest.approx(result.map)
+
+
+def test_detection_merge_matches_single_pass():
+    pairs = [
+        detection_pair([gt_box(0.0)], [pred_box(0.0, 0.9), pred_box(0.5, 0.6)]),
+        detection_pair([gt_box(0.3, "bike")], [pred_box(0.3, 0.4, "bike")]),
+        detection_pair([gt_box(0.1)], []),
+    ]
+
+    single = DetectionAccumulator().update_many(pairs)
+    left = DetectionAccumulator().update_many(pairs[:1])
+    right = pickle.loads(pickle.dumps(DetectionAccumulator().update_many(pairs[1:])))
+    assert left.merge(right).result() == single.result()
+    with pytest.raises(ValueError):
+        left.merge(DetectionAccumulator(bins=10))
+
+
+def transcription_pair(reference: str, hypothesis: str):
+    return (
+        GroundTruthTranscription(
+            type="transcription",
+            transcriptions=[
+                WordLevel(start=i, end=i + 1, word=word)
+                for i, word in enumerate(reference.split())
+            ],
+        ),
+        PredictedTranscription(
+            type="transcription",
+            transcriptions=[
+                PredictWordLevel(start=i, end=i + 1, word=word, confidence=1.0)
+                for i, word in enumerate(hypothesis.split())
+            ][::-1],
+        ),
+    )
+
+
+def test_edit_operations():
+    assert edit_operations("a b c d".split(), "a x c d e".split()) == (1, 0, 1)
+    assert edit_operations("a b c".split(), "a c".split()) == (0, 1, 0)
+    assert edit_operations([], ["a"]) == (0, 0, 1)
+
+
+def test_wer_accumulator_merge():
+    left = WERAccumulator().update(*transcription_pair("the cat sat", "The cat sat"))
+    right = WERAccumulator().update(*transcription_pair("hello world", "hello"))
+
+    result = left.merge(right).result()
+    assert result.wer == pytest.approx(1 / 5)
+    assert result.deletions == 1
+    assert result.reference_words == 5
+
+
+def speakers(model, segments, **extras):
+    return [
+        model(start=start, end=end, speaker_id=speaker, **extras)
+        for start, end, speaker in segments
+    ]
+
+
+def test_der_accumulator():
+    ground_truth = GroundTruthDiarization(
+        type="diarization",
+        diarizations=speakers(SpeakerLevel, [(0, 10, "alice"), (10, 20, "bob")]),
+    )
+    prediction = PredictedDiarization(
+        type="diarization",
+        diarizations=speakers(
+            PredicSpeakerLevel,
+            [(0, 8, "s1"), (8, 12, "s2"), (12, 20, "s2"), (20, 22, "s1")],
+            confidence=1.0,
+        ),
+    )
+
+    result = DERAccumulator().update(ground_truth, prediction).result()
+    assert result.total == 20
+    assert result.confusion == pytest.approx(2)
+    assert result.false_alarm == pytest.approx(2)
+    assert result.missed == 0
+    assert result.der == pytest.approx(4 / 20)
+
+
+def test_classification_accumulator():
+    pairs = [
+        (
+            GtImageClassification(type="classification", label=truth),
+            ImageClassification(type="classification", label=predicted),
+        )
+        for truth, predicted in [
+            ("cat", "cat"),
+            ("cat", "dog"),
+            ("dog", "dog"),
+            ("dog", "dog"),
+        ]
+    ]
+
+    left = ClassificationAccumulator().update_many(pairs[:2])
+    right = ClassificationAccumulator().update_many(pairs[2:])
+    result = left.merge(right).result()
+    assert result.accuracy == 0.75
+    assert result.classes["cat"].precision == 1.0
+    assert result.classes["cat"].recall == 0.5
+    assert result.classes["dog"].f1 == pytest.approx(0.8)
+    assert result.confusion == {"cat": {"cat": 1, "dog": 1}, "dog": {"dog": 2}}
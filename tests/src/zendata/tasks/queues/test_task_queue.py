@@ -0,0 +1,222 @@
+import threading
+import time
+from typing import Type
+from unittest.mock import Mock
+
+import pytest
+
+from zendata.data.text.text import TextData
+from zendata.tasks.async_service import AsyncService
+from zendata.tasks.base import BaseTask, TaskStatus
+from zendata.tasks.policy import RetryPolicy
+from zendata.tasks.queues.backend import InMemoryQueueBackend, LeaseExpiredError
+from zendata.tasks.queues.queue import TaskQueue
+from zendata.tasks.queues.sqlite import SQLiteQueueBackend
+from zendata.tasks.queues.worker import WorkerPool
+from zendata.tasks.service import Service
+from zendata.tasks.task import Task
+
+
+class UpperTask(BaseTask):
+    input: Type[TextData] = TextData
+    output: Type[TextData] = TextData
+
+
+class UpperService(Service):
+    def apply(self, task: Task, *args, **kwargs) -> Task:
+        if task.input_data.text == "boom":
+            raise RuntimeError("boom")
+        task.output_data = TextData(text=task.input_data.text.upper())
+        return task
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        backend = InMemoryQueueBackend(lease=0.2)
+    else:
+        backend = SQLiteQueueBackend(tmp_path / "queue.db", lease=0.2)
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def queue(backend):
+    queue = TaskQueue(backend=backend)
+    queue.register(UpperService(task_definition=UpperTask(), name="upper", callback=Mock()))
+    return queue
+
+
+def test_submit_and_process(queue):
+    submitted = queue.submit("upper", TextData(text="hello"), id="task-1")
+
+    assert submitted.status == TaskStatus.QUEUED.value
+    assert queue.get("task-1").status == TaskStatus.QUEUED.value
+
+    processed = queue.process_next()
+
+    assert processed.id == "task-1"
+    stored = queue.get("task-1")
+    assert stored.status == TaskStatus.COMPLETED.value
+    assert stored.output_data.text == "HELLO"
+    assert queue.process_next() is None
+
+
+def test_submit_validates_input(queue):
+    with pytest.raises(TypeError):
+        queue.submit("upper", "not-text-data")
+    with pytest.raises(KeyError):
+        queue.submit("unknown", TextData(text="hello"))
+
+
+def test_failed_task_is_retried(backend):
+    queue = TaskQueue(backend=backend)
+    queue.register(
+        UpperService(
+            task_definition=UpperTask(),
+            name="upper",
+            callback=Mock(),
+            retry_policy=RetryPolicy(max_attempts=2, initial_delay=0),
+        )
+    )
+    task = queue.submit("upper", TextData(text="boom"))
+
+    assert queue.process_next().status == TaskStatus.RETRYING.value
+    assert queue.process_next().status == TaskStatus.FAILED.value
+    assert queue.process_next() is None
+    stored = queue.get(task.id)
+    assert stored.extras["attempts"] == 2
+    assert "boom" in stored.error
+
+
+def test_retry_waits_for_backoff_delay(queue):
+    queue.services["upper"].retry_policy = RetryPolicy(
+        max_attempts=2, initial_delay=60, jitter=0
+    )
+    task = queue.submit("upper", TextData(text="boom"))
+
+    assert queue.process_next().status == TaskStatus.RETRYING.value
+    assert queue.process_next() is None
+    assert queue.get(task.id).status == TaskStatus.RETRYING.value
+
+
+def test_sqlite_backend_persists(tmp_path):
+    path = tmp_path / "queue.db"
+    first = TaskQueue(backend=SQLiteQueueBackend(path))
+    first.register(UpperService(task_definition=UpperTask(), name="upper", callback=Mock()))
+    task = first.submit("upper", TextData(text="persisted"))
+    first.backend.close()
+
+    second = TaskQueue(backend=SQLiteQueueBackend(path))
+    second.register(UpperService(task_definition=UpperTask(), name="upper", callback=Mock()))
+    try:
+        assert second.process_next().id == task.id
+        assert second.get(task.id).output_data.text == "PERSISTED"
+    finally:
+        second.backend.close()
+
+
+def test_worker_pool_processes_queue(queue):
+    tasks = [queue.submit("upper", TextData(text=f"item {i}")) for i in range(20)]
+
+    with WorkerPool(queue, workers=4, poll_interval=0.01):
+        results = [queue.wait(task.id, timeout=10) for task in tasks]
+
+    assert all(result.status == TaskStatus.COMPLETED.value for result in results)
+    assert results[3].output_data.text == "ITEM 3"
+
+
+def test_expired_claims_are_claimed_again(queue):
+    task = queue.submit("upper", TextData(text="hello"))
+
+    claimed = queue.backend.claim()
+    assert claimed.id == task.id
+    assert "claimed_at" in claimed.extras
+    assert queue.backend.claim() is None
+
+    # The worker died: the task is processed once its lease expires
+    time.sleep(0.25)
+    assert queue.process_next().id == task.id
+    assert queue.get(task.id).status == TaskStatus.COMPLETED.value
+    assert queue.process_next() is None
+
+
+def test_long_tasks_keep_their_lease(backend):
+    calls = []
+    lock = threading.Lock()
+
+    class SlowService(UpperService):
+        def apply(self, task: Task, *args, **kwargs) -> Task:
+            with lock:
+                calls.append(task.id)
+            time.sleep(0.6)
+            return super().apply(task)
+
+    queue = TaskQueue(backend=backend)
+    queue.register(SlowService(task_definition=UpperTask(), name="upper", callback=Mock()))
+    task = queue.submit("upper", TextData(text="slow"))
+
+    with WorkerPool(queue, workers=3, poll_interval=0.01):
+        assert queue.wait(task.id, timeout=10).status == TaskStatus.COMPLETED.value
+
+    assert calls == [task.id]
+
+
+def test_updates_of_expired_claims_are_rejected(queue):
+    queue.submit("upper", TextData(text="hello"), id="task-1")
+    stale = queue.backend.claim()
+    time.sleep(0.25)
+    current = queue.backend.claim()
+
+    assert current.extras["claimed_at"] != stale.extras["claimed_at"]
+    assert not queue.backend.renew(stale)
+    stale.set_status_to_completed()
+    with pytest.raises(LeaseExpiredError):
+        queue.backend.update(stale)
+
+    assert queue.backend.renew(current)
+    current.set_status_to_completed()
+    queue.backend.update(current)
+    with pytest.raises(LeaseExpiredError):
+        queue.backend.update(stale)
+    assert not queue.backend.renew(current)
+    assert queue.get("task-1").extras["claimed_at"] == current.extras["claimed_at"]
+
+
+def test_lease_covers_the_service_timeout(queue):
+    service = queue.services["upper"]
+    assert queue.lease(service) == 0.2
+
+    service.timeout = 5.0
+    assert queue.lease(service) == 5.0
+
+
+def test_submit_rejects_existing_ids(queue):
+    queue.submit("upper", TextData(text="first"), id="task-1")
+
+    with pytest.raises(ValueError, match="already exists"):
+        queue.submit("upper", TextData(text="second"), id="task-1")
+    assert queue.get("task-1").input_data.text == "first"
+
+
+def test_register_rejects_async_services(queue):
+    class AsyncUpperService(AsyncService):
+        async def apply(self, task: Task, *args, **kwargs) -> Task:
+            return task
+
+    with pytest.raises(TypeError, match="AsyncService"):
+        queue.register(AsyncUpperService(task_definition=UpperTask(), name="async"))
+
+
+def test_memory_backend_evicts_oldest_finished_tasks():
+    queue = TaskQueue(backend=InMemoryQueueBackend(max_finished=2))
+    queue.register(UpperService(task_definition=UpperTask(), name="upper", callback=Mock()))
+    tasks = [queue.submit("upper", TextData(text=str(i))) for i in range(3)]
+    waiting = queue.submit("upper", TextData(text="waiting"))
+
+    for _ in tasks:
+        queue.process_next()
+
+    assert queue.get(tasks[0].id) is None
+    assert queue.get(tasks[2].id).status == TaskStatus.COMPLETED.value
+    assert queue.get(waiting.id).status == TaskStatus.QUEUED.value
@@ -0,0 +1,221 @@
+import asyncio
+from typing import Type
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from zendata.tasks.async_service import AsyncService
+from zendata.tasks.base import BaseTask, TaskStatus
+from zendata.tasks.policy import RetryPolicy
+from zendata.tasks.task import Task
+
+
+class DummyTask(BaseTask):
+    input: Type[int] = int
+    output: Type[str] = str
+
+
+class DummyAsyncService(AsyncService):
+    async def apply(self, task: Task, *args, **kwargs) -> Task:
+        await asyncio.sleep(0)
+        task.output_data = str(task.input_data * 2)
+        return task
+
+
+def test_async_run_successful_task():
+    callback = AsyncMock()
+    service = DummyAsyncService(
+        task_definition=DummyTask(), name="dummy", callback=callback
+    )
+
+    result_task = asyncio.run(service.run(3, id="123"))
+
+    assert result_task.status == TaskStatus.COMPLETED.value
+    assert result_task.output_data == "6"
+    assert result_task.id == "123"
+    assert callback.await_count == 3
+
+
+def test_async_run_sync_callback():
+    callback = Mock()
+    service = DummyAsyncService(
+        task_definition=DummyTask(), name="dummy", callback=callback
+    )
+
+    asyncio.run(service.run(3))
+
+    assert callback.call_count == 3
+
+
+def test_async_run_invalid_input_type():
+    service = DummyAsyncService(task_definition=DummyTask(), name="dummy")
+
+    with pytest.raises(TypeError):
+        asyncio.run(service.run("not-an-int"))
+
+
+def test_async_run_apply_raises_exception():
+    class ExplodingService(AsyncService):
+        async def apply(self, task: Task, *args, **kwargs):
+            raise RuntimeError("boom")
+
+    service = ExplodingService(
+        task_definition=DummyTask(), name="explode", callback=Mock()
+    )
+
+    result_task = asyncio.run(service.run(4))
+
+    assert result_task.status == TaskStatus.FAILED.value
+    assert "boom" in result_task.error
+
+
+def test_async_run_respects_max_concurrency():
+    class TrackingService(AsyncService):
+        running = 0
+        peak = 0
+
+        async def apply(self, task: Task, *args, **kwargs):
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            await asyncio.sleep(0.01)
+            self.running -= 1
+            task.output_data = str(task.input_data)
+            return task
+
+    service = TrackingService(
+        task_definition=DummyTask(), name="tracking", callback=Mock(), max_concurrency=3
+    )
+
+    async def main():
+        return await asyncio.gather(*(service.run(i) for i in range(10)))
+
+    result_tasks = asyncio.run(main())
+
+    assert service.peak == 3
+    assert all(task.status == TaskStatus.COMPLETED.value for task in result_tasks)
+    # a fresh event loop gets its own limit
+    asyncio.run(main())
+
+
+def test_async_run_batch_isolates_failures():
+    service = DummyAsyncService(task_definition=DummyTask(), name="dummy", callback=Mock())
+
+    result_tasks = asyncio.run(service.run_batch([1, "bad", 3]))
+
+    assert [task.status for task in result_tasks] == [
+        TaskStatus.COMPLETED.value,
+        TaskStatus.FAILED.value,
+        TaskStatus.COMPLETED.value,
+    ]
+    assert [result_tasks[0].output_data, result_tasks[2].output_data] == ["2", "6"]
+
+
+def test_async_run_times_out_and_retries():
+    class SlowOnceService(AsyncService):
+        calls = 0
+
+        async def apply(self, task: Task, *args, **kwargs):
+            self.calls += 1
+            if self.calls == 1:
+                await asyncio.sleep(10)
+            task.output_data = str(task.input_data)
+            return task
+
+    service = SlowOnceService(
+        task_definition=DummyTask(),
+        name="slow",
+        callback=Mock(),
+        timeout=0.05,
+        retry_policy=RetryPolicy(max_attempts=2, initial_delay=0.001),
+    )
+
+    result_task = asyncio.run(service.run(7))
+
+    assert result_task.status == TaskStatus.COMPLETED.value
+    assert service.calls == 2
+
+
+def test_async_run_batch_times_out_and_retries():
+    class SlowOnceService(AsyncService):
+        calls = 0
+
+        async def apply(self, task: Task, *args, **kwargs):
+            self.calls += 1
+            if task.input_data < 0 or self.calls == 1:
+                await asyncio.sleep(10)
+            task.output_data = str(task.input_data)
+            return task
+
+    service = SlowOnceService(
+        task_definition=DummyTask(),
+        name="slow",
+        callback=Mock(),
+        timeout=0.05,
+        retry_policy=RetryPolicy(max_attempts=2, initial_delay=0.001),
+    )
+
+    retried, hung = asyncio.run(service.run_batch([7, -1]))
+
+    assert retried.status == TaskStatus.COMPLETED.value
+    assert retried.output_data == "7"
+    assert hung.status == TaskStatus.TIMEOUT.value
+    assert service.calls == 4
+
+
+def test_async_run_timeout_status():
+    class HungService(AsyncService):
+        async def apply(self, task: Task, *args, **kwargs):
+            await asyncio.sleep(10)
+            return task
+
+    service = HungService(
+        task_definition=DummyTask(), name="hung", callback=Mock(), timeout=0.01
+    )
+
+    result_task = asyncio.run(service.run(7))
+
+    assert result_task.status == TaskStatus.TIMEOUT.value
+
+
+def test_async_run_stream_accepts_async_iterables():
+    service = DummyAsyncService(
+        task_definition=DummyTask(), name="dummy", callback=Mock()
+    )
+    pulled = []
+
+    async def inputs():
+        for value in range(10):
+            pulled.append(value)
+            yield value
+
+    async def main():
+        outputs = []
+        async for task in service.run_stream(inputs(), max_in_flight=3):
+            outputs.append(task.output_data)
+            assert len(pulled) <= len(outputs) + 3
+        return outputs
+
+    assert asyncio.run(main()) == [str(value * 2) for value in range(10)]
+
+
+def test_async_run_stream_unordered():
+    class SleepyAsyncService(AsyncService):
+        async def apply(self, task: Task, *args, **kwargs) -> Task:
+            await asyncio.sleep(task.input_data / 1000)
+            task.output_data = str(task.input_data)
+            return task
+
+    service = SleepyAsyncService(
+        task_definition=DummyTask(), name="sleepy", callback=Mock()
+    )
+
+    async def main():
+        return [
+            task.output_data
+            async for task in service.run_stream([50, 1, 2], ordered=False)
+        ]
+
+    outputs = asyncio.run(main())
+    # The fast items may finish in any order, the slow one comes last
+    assert sorted(outputs[:2]) == ["1", "2"]
+    assert outputs[2] == "50"
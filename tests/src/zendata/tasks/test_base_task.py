@@ -243,3 +243,16 @@ def test_set_status_to_timeout():
     assert actual_updated_at <= task.updated_at
     assert task.status == TaskStatus.TIMEOUT.value
     assert task.error == "test"
+
+
+def test_set_status_to_queued():
+    task = BaseTask(
+        name="Test Task",
+        status=TaskStatus.CREATED,
+        input=str,
+        output=dict,
+    )
+    actual_updated_at = task.updated_at
+    task.set_status_to_queued()
+    assert actual_updated_at <= task.updated_at
+    assert task.status == TaskStatus.QUEUED.value
@@ -0,0 +1,99 @@
+import threading
+from typing import Type
+
+import pytest
+
+from zendata.tasks.base import BaseTask, TaskStatus
+from zendata.tasks.events import EventDispatcher
+from zendata.tasks.service import Service
+from zendata.tasks.task import Task
+
+
+class DummyTask(BaseTask):
+    input: Type[int] = int
+    output: Type[str] = str
+
+
+class DummyService(Service):
+    def apply(self, task: Task, *args, **kwargs) -> Task:
+        task.output_data = str(task.input_data)
+        return task
+
+
+def test_dispatcher_delivers_service_events():
+    received = []
+    with EventDispatcher(sinks=[received.extend]) as dispatcher:
+        service = DummyService(
+            task_definition=DummyTask(), name="dummy", callback=dispatcher
+        )
+        task = service.run(1)
+        assert dispatcher.flush(timeout=5)
+
+    assert received[-1].id == task.id
+    assert received[-1].status == TaskStatus.COMPLETED.value
+    stats = dispatcher.stats()
+    assert stats.published == 3
+    assert stats.delivered + stats.coalesced == 3
+
+
+def test_dispatcher_coalesces_pending_events():
+    gate = threading.Event()
+    received = []
+
+    def slow_sink(batch):
+        gate.wait()
+        received.extend(batch)
+
+    dispatcher = EventDispatcher(sinks=[slow_sink], batch_size=1, flush_interval=0)
+    first = Task(name="first")
+    dispatcher.publish(first)
+    dispatcher.flush(timeout=0.05)  # the sink now holds the first event
+    task = Task(name="coalesced")
+    for status in (TaskStatus.STARTED, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED):
+        task.set_status(status)
+        dispatcher.publish(task)
+    gate.set()
+    dispatcher.close()
+
+    assert [event.status for event in received if event.id == task.id] == [
+        TaskStatus.COMPLETED
+    ]
+    assert dispatcher.stats().coalesced == 2
+
+
+def test_dispatcher_drops_oldest_when_full():
+    gate = threading.Event()
+    received = []
+
+    def slow_sink(batch):
+        gate.wait()
+        received.extend(batch)
+
+    dispatcher = EventDispatcher(
+        sinks=[slow_sink], maxsize=2, batch_size=1, flush_interval=0
+    )
+    dispatcher.publish(Task(name="held"))
+    dispatcher.flush(timeout=0.05)
+    tasks = [Task(name=str(i)) for i in range(4)]
+    for task in tasks:
+        dispatcher.publish(task)
+    gate.set()
+    dispatcher.close()
+
+    assert [event.name for event in received[1:]] == ["2", "3"]
+    assert dispatcher.stats().dropped == 2
+
+
+def test_dispatcher_counts_sink_failures():
+    def failing_sink(batch):
+        raise RuntimeError("down")
+
+    received = []
+    dispatcher = EventDispatcher(sinks=[failing_sink, received.extend])
+    dispatcher.publish(Task(name="task"))
+    dispatcher.close()
+
+    assert dispatcher.stats().failed == 1
+    assert len(received) == 1
+    with pytest.raises(RuntimeError):
+        dispatcher.publish(Task(name="late"))
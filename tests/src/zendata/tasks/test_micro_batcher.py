@@ -0,0 +1,121 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Type
+from unittest.mock import Mock
+
+import pytest
+
+from zendata.tasks.async_service import AsyncService
+from zendata.tasks.base import BaseTask, TaskStatus
+from zendata.tasks.batching import MicroBatcher
+from zendata.tasks.service import Service
+from zendata.tasks.task import Task
+
+
+class DummyTask(BaseTask):
+    input: Type[int] = int
+    output: Type[str] = str
+
+
+class RecordingService(Service):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_sizes = []
+
+    def apply(self, task: Task, *args, **kwargs) -> Task:
+        task.output_data = str(task.input_data * 2)
+        return task
+
+    def apply_batch(self, tasks, *args, **kwargs):
+        self.batch_sizes.append(len(tasks))
+        time.sleep(0.01)
+        return super().apply_batch(tasks, *args, **kwargs)
+
+
+def test_micro_batcher_groups_concurrent_calls():
+    service = RecordingService(
+        task_definition=DummyTask(), name="recording", callback=Mock()
+    )
+
+    with MicroBatcher(service, max_batch_size=8, max_wait_ms=50) as batcher:
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            result_tasks = list(pool.map(batcher.run, range(32)))
+
+    assert [task.output_data for task in result_tasks] == [
+        str(i * 2) for i in range(32)
+    ]
+    assert sum(service.batch_sizes) == 32
+    assert max(service.batch_sizes) <= 8
+    assert len(service.batch_sizes) < 32
+
+
+def test_micro_batcher_flushes_after_max_wait():
+    service = RecordingService(
+        task_definition=DummyTask(), name="recording", callback=Mock()
+    )
+
+    with MicroBatcher(service, max_batch_size=100, max_wait_ms=10) as batcher:
+        start = time.monotonic()
+        result_task = batcher.run(21, id="abc")
+        elapsed = time.monotonic() - start
+
+    assert result_task.id == "abc"
+    assert result_task.output_data == "42"
+    assert service.batch_sizes == [1]
+    assert elapsed < 1
+
+
+def test_micro_batcher_isolates_failures():
+    service = RecordingService(
+        task_definition=DummyTask(), name="recording", callback=Mock()
+    )
+
+    async def main(batcher):
+        return await asyncio.gather(batcher.arun(1), batcher.arun("bad"))
+
+    with MicroBatcher(service, max_batch_size=2, max_wait_ms=1000) as batcher:
+        good, bad = asyncio.run(main(batcher))
+
+    assert good.status == TaskStatus.COMPLETED.value
+    assert bad.status == TaskStatus.FAILED.value
+    assert service.batch_sizes == [1]
+
+
+def test_micro_batcher_rejects_after_close():
+    service = RecordingService(
+        task_definition=DummyTask(), name="recording", callback=Mock()
+    )
+    batcher = MicroBatcher(service)
+    batcher.close()
+
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
+
+
+def test_micro_batcher_rejects_async_services():
+    class AsyncDummyService(AsyncService):
+        async def apply(self, task: Task, *args, **kwargs) -> Task:
+            return task
+
+    service = AsyncDummyService(task_definition=DummyTask(), name="async")
+
+    with pytest.raises(TypeError, match="AsyncService"):
+        MicroBatcher(service)
+
+
+def test_micro_batcher_survives_a_broken_batch():
+    class ShortService(RecordingService):
+        def run_batch(self, inputs, *args, **kwargs):
+            tasks = super().run_batch(inputs, *args, **kwargs)
+            return tasks[:1] if len(tasks) > 1 else tasks
+
+    service = ShortService(task_definition=DummyTask(), name="short", callback=Mock())
+
+    with MicroBatcher(service, max_batch_size=2, max_wait_ms=1000) as batcher:
+        first, second = batcher.submit(1), batcher.submit(2)
+        with pytest.raises(ValueError, match="returned 1 tasks for 2 inputs"):
+            first.result(timeout=5)
+        with pytest.raises(ValueError):
+            second.result(timeout=5)
+        assert batcher.run(3).output_data == "6"
@@ -0,0 +1,107 @@
+import os
+import time
+
+import pytest
+
+from zendata.data.files.image import Image
+from zendata.data.text.text import TextData
+from zendata.tasks.cache import MISSING, ResultCache, input_key
+
+
+def test_input_key_ignores_volatile_fields():
+    assert input_key(TextData(text="hello")) == input_key(TextData(text="hello"))
+    assert input_key(TextData(text="hello")) != input_key(TextData(text="world"))
+    assert input_key(3) == input_key(3)
+    assert input_key(3) != input_key("3")
+
+
+def test_input_key_uses_file_checksum():
+    image = Image(
+        source="test",
+        filename="a.png",
+        size=3,
+        content_type="image/png",
+        width=1,
+        height=1,
+        checksum="abc",
+    )
+
+    assert input_key(image) == "checksum:abc"
+
+
+def test_input_key_of_unhashable_input_is_none():
+    assert input_key(lambda: None) is None
+
+
+def test_cache_hit_miss_and_isolation():
+    cache = ResultCache()
+    value = {"a": [1, 2]}
+    cache.set("key", value)
+    value["a"].append(3)
+
+    assert cache.get("key") == {"a": [1, 2]}
+    assert cache.get("other") is MISSING
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.items) == (1, 1, 1)
+    assert stats.hit_rate == 0.5
+
+
+def test_cache_lru_eviction():
+    cache = ResultCache(max_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.stats().evictions == 1
+
+
+def test_cache_byte_bound():
+    cache = ResultCache(max_items=None, max_bytes=200)
+    for i in range(10):
+        cache.set(str(i), "x" * 50)
+
+    assert cache.stats().bytes <= 200
+    assert cache.get("9") == "x" * 50
+    assert cache.get("0") is MISSING
+
+
+def test_cache_ttl():
+    cache = ResultCache(ttl=0.05)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is MISSING
+
+
+def test_cache_disk_tier(tmp_path):
+    ResultCache(directory=tmp_path).set("a", TextData(text="stored"))
+
+    cache = ResultCache(directory=tmp_path)
+
+    assert cache.get("a").text == "stored"
+    assert cache.stats().disk_hits == 1
+    cache.clear()
+    assert cache.get("a") is MISSING
+
+
+def test_cache_disk_tier_is_bounded(tmp_path):
+    cache = ResultCache(directory=tmp_path, max_disk_bytes=1000)
+    for i in range(10):
+        cache.set(str(i), "x" * 200)
+
+    assert sum(path.stat().st_size for path in tmp_path.glob("*.cache")) <= 1000
+    assert ResultCache(directory=tmp_path).get("9") == "x" * 200
+    assert ResultCache(directory=tmp_path).get("0") is MISSING
+
+
+def test_cache_rejects_shared_directory(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    os.chmod(shared, 0o777)
+
+    with pytest.raises(PermissionError):
+        ResultCache(directory=shared)
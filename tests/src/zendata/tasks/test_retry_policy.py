@@ -0,0 +1,37 @@
+import pickle
+from zendata.tasks.policy import RetryPolicy, TaskTimeoutError
+
+
+def test_delay_grows_exponentially_up_to_max_delay():
+    policy = RetryPolicy(initial_delay=1, multiplier=2, max_delay=5, jitter=0)
+
+    assert [policy.delay(attempt) for attempt in range(1, 5)] == [1, 2, 4, 5]
+
+
+def test_delay_jitter_stays_in_bounds():
+    policy = RetryPolicy(initial_delay=1, jitter=0.5)
+
+    delays = [policy.delay(1) for _ in range(100)]
+
+    assert all(0.5 <= delay <= 1 for delay in delays)
+
+
+def test_next_delay_respects_attempts_and_predicates():
+    policy = RetryPolicy(
+        max_attempts=2,
+        jitter=0,
+        retry_on=lambda error: isinstance(error, ConnectionError),
+        retry_on_timeout=False,
+    )
+
+    assert policy.next_delay(1, ConnectionError()) == policy.initial_delay
+    assert policy.next_delay(2, ConnectionError()) is None
+    assert policy.next_delay(1, ValueError()) is None
+    assert policy.next_delay(1, TaskTimeoutError()) is None
+
+
+def test_default_policy_pickles():
+    policy = pickle.loads(pickle.dumps(RetryPolicy(max_attempts=5)))
+
+    assert policy.max_attempts == 5
+    assert policy.next_delay(1, RuntimeError()) is not None
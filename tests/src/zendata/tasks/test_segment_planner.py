@@ -0,0 +1,137 @@
+import threading
+from typing import Type
+import pytest
+from zendata.data.files.audio import Audio
+from zendata.data.ml.audio.diarisation import PredicSpeakerLevel, PredictedDiarization
+from zendata.data.ml.audio.transcription import PredictedTranscription, PredictWordLevel
+from zendata.tasks.base import BaseTask
+from zendata.tasks.segments import MediaWindow, SegmentPlanner
+from zendata.tasks.service import Service, Task
+
+SPEAKERS = [(0.0, 12.0, "alice"), (12.0, 25.0, "bob")]
+
+
+def make_audio() -> Audio:
+    return Audio(
+        frames=250,
+        channels=1,
+        sample_rate=10,
+        source="test",
+        filename="long.wav",
+        size=500,
+        content_type="audio/wav",
+    )
+
+
+class TranscriptionTask(BaseTask):
+    input: Type[MediaWindow] = MediaWindow
+    output: Type[PredictedTranscription] = PredictedTranscription
+
+
+class TranscriptionService(Service):
+    """One word per second, with times relative to the window."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+
+    def apply(self, task: Task, *args, **kwargs) -> Task:
+        self.threads.add(threading.get_ident())
+        window = task.input_data
+        task.output_data = PredictedTranscription(
+            type="transcription",
+            transcriptions=[
+                PredictWordLevel(
+                    start=second - window.start,
+                    end=second + 0.5 - window.start,
+                    word=f"w{second}",
+                    confidence=1.0,
+                )
+                for second in range(25)
+                if window.start <= second and second + 0.5 <= window.end
+            ],
+        )
+        return task
+
+
+class DiarizationTask(BaseTask):
+    input: Type[MediaWindow] = MediaWindow
+    output: Type[PredictedDiarization] = PredictedDiarization
+
+
+class DiarizationService(Service):
+    """Speakers named S0, S1... in order of appearance in each window."""
+
+    def apply(self, task: Task, *args, **kwargs) -> Task:
+        window = task.input_data
+        names: dict[str, str] = {}
+        segments = []
+        for start, end, speaker in SPEAKERS:
+            start, end = max(start, window.start), min(end, window.end)
+            if start < end:
+                local = names.setdefault(speaker, f"S{len(names)}")
+                segments.append(
+                    PredicSpeakerLevel(
+                        start=start - window.start,
+                        end=end - window.start,
+                        speaker_id=local,
+                        confidence=0.9,
+                    )
+                )
+        task.output_data = PredictedDiarization(
+            type="diarization", diarizations=segments
+        )
+        return task
+
+
+def test_plan_overlapping_windows():
+    windows = SegmentPlanner(window=10, overlap=2).plan(make_audio()).items
+
+    assert [(window.start, window.end) for window in windows] == [
+        (0.0, 10.0),
+        (8.0, 18.0),
+        (16.0, 25.0),
+    ]
+    assert windows[1].start_frame == 80
+    assert windows[2].end_frame == 250
+    with pytest.raises(ValueError):
+        SegmentPlanner(window=10, overlap=10)
+
+
+def test_run_and_stitch_transcription():
+    service = TranscriptionService(
+        task_definition=TranscriptionTask(), name="asr", callback=lambda task: None
+    )
+
+    result = SegmentPlanner(window=10, overlap=2).run(service, make_audio(), 3)
+    assert [word.word for word in result.transcriptions] == [
+        f"w{second}" for second in range(25)
+    ]
+    assert [word.start for word in result.transcriptions] == list(range(25))
+    assert len(service.threads) >= 1
+
+
+def test_run_and_stitch_diarization():
+    service = DiarizationService(
+        task_definition=DiarizationTask(), name="diarization", callback=lambda t: None
+    )
+
+    result = SegmentPlanner(window=10, overlap=2).run(service, make_audio())
+    assert [
+        (segment.start, segment.end, segment.speaker_id)
+        for segment in result.diarizations
+    ] == [(0.0, 12.0, "S0"), (12.0, 25.0, "S1")]
+
+
+def test_run_raises_on_failed_window():
+    class FailingService(TranscriptionService):
+        def apply(self, task: Task, *args, **kwargs) -> Task:
+            if task.input_data.index == 1:
+                raise RuntimeError("boom")
+            return super().apply(task, *args, **kwargs)
+
+    service = FailingService(
+        task_definition=TranscriptionTask(), name="asr", callback=lambda task: None
+    )
+    with pytest.raises(RuntimeError, match="1 windows failed"):
+        SegmentPlanner(window=10, overlap=2).run(service, make_audio())
@@ -0,0 +1,225 @@
+import asyncio
+import threading
+import time
+import pytest
+from typing import Type
+from unittest.mock import Mock
+from zendata.tasks.async_service import AsyncService
+from zendata.tasks.base import BaseTask, TaskStatus
+from zendata.tasks.metrics import (
+    LATENCY_BUCKETS,
+    HistogramSnapshot,
+    MetricsRegistry,
+    ServiceMetrics,
+    default_metrics,
+    prometheus_text,
+)
+from zendata.tasks.service import Service
+from zendata.tasks.task import Task
+
+
+class DummyTask(BaseTask):
+    input: Type[int] = int
+    output: Type[str] = str
+
+
+class DummyService(Service):
+    def apply(self, task: Task, *args, **kwargs) -> Task:
+        if task.input_data < 0:
+            raise ValueError("negative")
+        task.output_data = str(task.input_data)
+        return task
+
+
+def test_service_records_metrics():
+    service = DummyService(
+        task_definition=DummyTask(),
+        name="dummy",
+        callback=Mock(),
+        metrics=ServiceMetrics("dummy"),
+    )
+
+    service.run(1)
+    service.run(-1)
+    service.run_batch([1, 2, -3, "bad"])
+    snapshot = service.metrics.snapshot()
+
+    assert snapshot.service == "dummy"
+    assert snapshot.statuses == {"completed": 3, "failed": 3}
+    assert snapshot.in_flight == 0
+    assert snapshot.latency.count == 5
+    assert {stage: histogram.count for stage, histogram in snapshot.stages.items()} == {
+        "validation": 5,
+        "apply": 5,
+        "output_check": 4,
+        "callback": 5,
+    }
+    assert snapshot.batch_sizes.count == 1
+    assert snapshot.batch_sizes.sum == 3
+    assert "dummy" in [metrics.service for metrics in default_metrics.snapshot()]
+
+
+def test_in_flight_gauge():
+    entered, release = threading.Event(), threading.Event()
+
+    class BlockingService(DummyService):
+        def apply(self, task: Task, *args, **kwargs) -> Task:
+            entered.set()
+            release.wait(5)
+            return super().apply(task)
+
+    service = BlockingService(
+        task_definition=DummyTask(),
+        name="blocking",
+        callback=Mock(),
+        metrics=ServiceMetrics("blocking", register=False),
+    )
+    thread = threading.Thread(target=service.run, args=(1,))
+    thread.start()
+    entered.wait(5)
+    assert service.metrics.snapshot().in_flight == 1
+    release.set()
+    thread.join()
+    assert service.metrics.snapshot().in_flight == 0
+
+
+def test_metrics_are_sharded_per_thread():
+    metrics = ServiceMetrics("sharded", register=False)
+
+    def record():
+        for _ in range(1000):
+            metrics.observe(0.002)
+            metrics.count(TaskStatus.COMPLETED)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Shards of finished threads are folded when a new thread records
+    record()
+
+    snapshot = metrics.snapshot()
+    assert snapshot.statuses == {"completed": 9000}
+    latency = snapshot.latency
+    assert latency.count == 9000
+    assert latency.mean == pytest.approx(0.002)
+    assert latency.quantile(0.99) == 0.005
+    assert len(metrics._shards._shards) == 1
+
+    metrics.reset()
+    assert metrics.snapshot().latency.count == 0
+
+
+def test_histogram_quantiles():
+    histogram = HistogramSnapshot(
+        buckets=[1, 2, 4], counts=[5, 3, 1, 1], count=10, sum=20
+    )
+    assert histogram.quantile(0.5) == 1
+    assert histogram.quantile(0.8) == 2
+    assert histogram.quantile(1.0) == float("inf")
+
+
+def test_prometheus_text():
+    metrics = ServiceMetrics('my "service"', register=False)
+    metrics.count(TaskStatus.FAILED)
+    metrics.observe(0.003, tasks=2)
+    metrics.observe_stage("apply", 0.002)
+    metrics.observe_batch(3)
+
+    text = prometheus_text([metrics.snapshot()])
+    lines = text.splitlines()
+    service = 'service="my \\"service\\""'
+    assert "# TYPE zendata_tasks_total counter" in lines
+    assert f'zendata_tasks_total{{{service},status="failed"}} 1' in lines
+    assert f"zendata_tasks_in_flight{{{service}}} 0" in lines
+    assert f'zendata_task_seconds_bucket{{{service},le="0.005"}} 2' in lines
+    assert f'zendata_task_seconds_bucket{{{service},le="0.001"}} 0' in lines
+    assert f"zendata_task_seconds_sum{{{service}}} 0.006" in lines
+    assert f'zendata_batch_size_bucket{{{service},le="+Inf"}} 1' in lines
+    assert f"zendata_batch_size_sum{{{service}}} 3.0" in lines
+    stage = f'{service},stage="apply",le="+Inf"'
+    assert f"zendata_stage_seconds_bucket{{{stage}}} 1" in lines
+    buckets = [line for line in lines if line.startswith("zendata_task_seconds_b")]
+    assert len(buckets) == len(LATENCY_BUCKETS) + 1
+
+
+def test_metrics_are_on_by_default():
+    service = DummyService(task_definition=DummyTask(), name="default", callback=Mock())
+    service.run(1)
+    assert service.metrics.snapshot().statuses == {"completed": 1}
+    assert "default" in [metrics.service for metrics in default_metrics.snapshot()]
+
+    quiet = DummyService(
+        task_definition=DummyTask(), name="quiet", callback=Mock(), metrics=False
+    )
+    assert quiet.run(1).status == TaskStatus.COMPLETED
+    assert quiet.metrics is None
+
+
+def test_stage_timings():
+    def slow_callback(task: Task):
+        time.sleep(0.002)
+
+    class SlowService(DummyService):
+        def apply(self, task: Task, *args, **kwargs) -> Task:
+            time.sleep(0.02)
+            return super().apply(task)
+
+    service = SlowService(
+        task_definition=DummyTask(),
+        name="slow",
+        callback=slow_callback,
+        metrics=ServiceMetrics("slow", register=False),
+    )
+    service.run(1)
+    stages = service.metrics.snapshot().stages
+
+    assert stages["apply"].count == 1
+    assert 0.02 <= stages["apply"].sum < 0.1
+    # started, in progress and completed callbacks of the task
+    assert stages["callback"].count == 1
+    assert stages["callback"].sum >= 0.006
+    assert stages["validation"].sum < stages["apply"].sum
+    assert stages["output_check"].count == 1
+
+
+def test_registry_merges_services_with_the_same_name():
+    registry = MetricsRegistry()
+    first = ServiceMetrics("same", register=False)
+    second = ServiceMetrics("same", register=False)
+    registry.add(first)
+    registry.add(second)
+    first.count(TaskStatus.COMPLETED)
+    second.count(TaskStatus.COMPLETED)
+    second.started()
+
+    (snapshot,) = registry.snapshot()
+    assert snapshot.statuses == {"completed": 2}
+    assert snapshot.in_flight == 1
+    assert registry.prometheus().count('zendata_tasks_in_flight{service="same"}') == 1
+
+
+def test_async_stage_timings_are_kept_per_task():
+    class SleepyService(AsyncService):
+        async def apply(self, task: Task, *args, **kwargs) -> Task:
+            await asyncio.sleep(0.01 * task.input_data)
+            task.output_data = str(task.input_data)
+            return task
+
+    service = SleepyService(
+        task_definition=DummyTask(),
+        name="sleepy",
+        callback=Mock(),
+        metrics=ServiceMetrics("sleepy", register=False),
+    )
+
+    async def main():
+        return await asyncio.gather(service.run(1), service.run(3))
+
+    asyncio.run(main())
+    apply = service.metrics.snapshot().stages["apply"]
+    assert apply.count == 2
+    # Each task only records its own apply time
+    assert 0.04 <= apply.sum < 0.08
+    assert apply.quantile(0.5) <= 0.025
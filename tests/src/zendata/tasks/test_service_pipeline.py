@@ -0,0 +1,141 @@
+import threading
+import time
+from typing import Type
+from unittest.mock import Mock
+import pytest
+from zendata.tasks.async_service import AsyncService
+from zendata.tasks.base import BaseTask, TaskStatus
+from zendata.tasks.cache import ResultCache
+from zendata.tasks.pipeline import Pipeline, is_compatible
+from zendata.tasks.service import Service
+from zendata.tasks.task import Task
+
+
+class IntToStr(BaseTask):
+    input: Type[int] = int
+    output: Type[str] = str
+
+
+class StrToInt(BaseTask):
+    input: Type[str] = str
+    output: Type[int] = int
+
+
+class Stage(Service):
+    def __init__(self, function, delay=0.0, **kwargs):
+        super().__init__(callback=Mock(), **kwargs)
+        self.function = function
+        self.delay = delay
+        self.threads = set()
+
+    def apply(self, task: Task, *args, **kwargs) -> Task:
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        task.output_data = self.function(task.input_data)
+        return task
+
+
+def make_pipeline(delay=0.0, **kwargs):
+    return Pipeline(
+        [
+            Stage(str, delay, task_definition=IntToStr(), name="to-str"),
+            Stage(len, delay, task_definition=StrToInt(), name="length"),
+            Stage(lambda n: "x" * n, delay, task_definition=IntToStr(), name="x"),
+        ],
+        **kwargs,
+    )
+
+
+def test_pipeline_runs_stages_in_order():
+    pipeline = make_pipeline(queue_size=2)
+
+    tasks = pipeline.run([1, 22, 333], ids=["a", "b", "c"])
+    assert [task.output_data for task in tasks] == ["x", "xx", "xxx"]
+    assert [task.id for task in tasks] == ["a", "b", "c"]
+    assert all(task.status == TaskStatus.COMPLETED for task in tasks)
+    assert [timing.items for timing in pipeline.timings] == [3, 3, 3]
+
+
+def test_pipeline_stages_run_concurrently():
+    delay = 0.03
+    pipeline = make_pipeline(delay=delay)
+    items = list(range(10))
+
+    start = time.perf_counter()
+    tasks = pipeline.run(items)
+    elapsed = time.perf_counter() - start
+
+    assert len(tasks) == len(items)
+    # Serially this takes 30 * delay, pipelined about (10 + 2) * delay
+    assert elapsed < 0.8 * len(items) * len(pipeline.stages) * delay
+    threads = set().union(*(stage.threads for stage in pipeline.stages))
+    assert len(threads) == len(pipeline.stages)
+    assert all(timing.busy_seconds >= 10 * delay for timing in pipeline.timings)
+
+
+def test_pipeline_forwards_failed_tasks():
+    def fail_on_two(text):
+        if text == "2":
+            raise ValueError("no two")
+        return len(text)
+
+    pipeline = Pipeline(
+        [
+            Stage(str, task_definition=IntToStr(), name="to-str"),
+            Stage(fail_on_two, task_definition=StrToInt(), name="length"),
+            Stage(str, task_definition=IntToStr(), name="back"),
+        ]
+    )
+
+    tasks = pipeline.run([1, 2, "bad", 3])
+    assert [task.status for task in tasks] == [
+        TaskStatus.COMPLETED,
+        TaskStatus.FAILED,
+        TaskStatus.FAILED,
+        TaskStatus.COMPLETED,
+    ]
+    assert tasks[1].name == "length" and tasks[1].error == "no two"
+    assert tasks[2].name == "to-str"
+    assert [timing.failed for timing in pipeline.timings] == [0, 1, 0]
+
+
+def test_pipeline_stream_can_stop_early():
+    pipeline = make_pipeline(queue_size=1)
+
+    stream = pipeline.stream(iter(range(1000)))
+    assert next(stream).output_data == "x"
+    stream.close()
+
+
+def test_pipeline_checks_types_when_built():
+    with pytest.raises(TypeError, match="expects"):
+        Pipeline(
+            [
+                Stage(str, task_definition=IntToStr(), name="a"),
+                Stage(str, task_definition=IntToStr(), name="b"),
+            ]
+        )
+    assert is_compatible(bool, int)
+    assert not is_compatible(None, int)
+    assert is_compatible(str, None)
+
+
+def test_pipeline_rejects_async_stages():
+    class AsyncStage(AsyncService):
+        async def apply(self, task: Task, *args, **kwargs) -> Task:
+            task.output_data = str(task.input_data)
+            return task
+
+    with pytest.raises(TypeError, match="AsyncService"):
+        Pipeline([AsyncStage(task_definition=IntToStr(), name="async")])
+
+
+def test_pipeline_stages_use_their_cache():
+    pipeline = make_pipeline()
+    for stage in pipeline.stages:
+        stage.cache = ResultCache()
+
+    pipeline.run([1, 22])
+    tasks = pipeline.run([1, 22])
+    assert [task.output_data for task in tasks] == ["x", "xx"]
+    assert all(task.extras.get("cached") for task in tasks)
@@ -1,7 +1,15 @@
+import threading
+import time
 import pytest
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 from unittest.mock import Mock
 from typing import Any, Type
 
+from zendata.data.text.text import TextData
+from zendata.tasks.cache import ResultCache
+from zendata.tasks.policy import RetryPolicy, TaskTimeoutError
+from zendata.tasks.base import ValidationLevel
 from zendata.tasks.service import Service, Task, TaskStatus, BaseTask
 
 
@@ -75,3 +83,405 @@ def test_run_apply_raises_exception():
     assert result_task.status == TaskStatus.FAILED.value
     assert "boom" in result_task.error
     assert result_task.output_data is None
+
+
+def test_run_batch_successful_tasks():
+    callback = Mock()
+    service = DummyService(task_definition=DummyTask(), name="dummy", callback=callback)
+
+    result_tasks = service.run_batch([1, 2, 3], ids=["a", "b", "c"])
+
+    assert [task.status for task in result_tasks] == [TaskStatus.COMPLETED.value] * 3
+    assert [task.output_data for task in result_tasks] == ["2", "4", "6"]
+    assert [task.id for task in result_tasks] == ["a", "b", "c"]
+
+
+def test_run_batch_accepts_batch():
+    from zendata.core.batch import Batch
+
+    service = DummyService(task_definition=DummyTask(), name="dummy", callback=Mock())
+
+    result_tasks = service.run_batch(Batch[int](type="batch", items=[4, 5]))
+
+    assert [task.output_data for task in result_tasks] == ["8", "10"]
+
+
+def test_run_batch_isolates_failures():
+    class PickyService(Service):
+        def apply(self, task: Task, *args, **kwargs):
+            if task.input_data == 2:
+                raise RuntimeError("boom")
+            task.output_data = str(task.input_data)
+            return task
+
+    service = PickyService(task_definition=DummyTask(), name="picky", callback=Mock())
+
+    result_tasks = service.run_batch([1, 2, "not-an-int", 4])
+
+    assert [task.status for task in result_tasks] == [
+        TaskStatus.COMPLETED.value,
+        TaskStatus.FAILED.value,
+        TaskStatus.FAILED.value,
+        TaskStatus.COMPLETED.value,
+    ]
+    assert "boom" in result_tasks[1].error
+    assert "is not instance of" in result_tasks[2].error
+    assert result_tasks[3].output_data == "4"
+
+
+def test_run_batch_calls_apply_batch_once():
+    class VectorizedService(Service):
+        calls = 0
+
+        def apply(self, task: Task, *args, **kwargs):
+            raise NotImplementedError
+
+        def apply_batch(self, tasks, *args, **kwargs):
+            self.calls += 1
+            for task in tasks:
+                task.output_data = str(task.input_data)
+            tasks[0].output_data = 0  # wrong output type only fails this item
+            return tasks
+
+    service = VectorizedService(
+        task_definition=DummyTask(), name="vectorized", callback=Mock()
+    )
+
+    result_tasks = service.run_batch(range(3))
+
+    assert service.calls == 1
+    assert result_tasks[0].status == TaskStatus.FAILED.value
+    assert "does not match expected output type" in result_tasks[0].error
+    assert [task.output_data for task in result_tasks[1:]] == ["1", "2"]
+
+
+class TextLengthTask(BaseTask):
+    input: Type[TextData] = TextData
+    output: Type[int] = int
+
+
+class TextLengthService(Service):
+    def apply(self, task: Task, *args, **kwargs) -> Task:
+        if not task.input_data.text:
+            raise ValueError("empty text")
+        task.output_data = len(task.input_data.text)
+        return task
+
+
+def test_run_in_process_pool():
+    callback = Mock()
+    with ProcessPoolExecutor(max_workers=2, mp_context=get_context("spawn")) as pool:
+        service = TextLengthService(
+            task_definition=TextLengthTask(),
+            name="length",
+            callback=callback,
+            executor=pool,
+        )
+        result_task = service.run(TextData(text="hello"))
+        assert callback.call_count == 3
+        result_tasks = service.run_batch(
+            [TextData(text="a"), TextData(text=""), TextData(text="abc")]
+        )
+
+    assert result_task.status == TaskStatus.COMPLETED.value
+    assert result_task.output_data == 5
+    assert [task.status for task in result_tasks] == [
+        TaskStatus.COMPLETED.value,
+        TaskStatus.FAILED.value,
+        TaskStatus.COMPLETED.value,
+    ]
+    assert "empty text" in result_tasks[1].error
+    assert result_tasks[2].output_data == 3
+
+
+class CountedTextLengthService(TextLengthService):
+    pickled = 0
+
+    def __getstate__(self) -> dict:
+        CountedTextLengthService.pickled += 1
+        return super().__getstate__()
+
+
+def test_process_pool_receives_the_service_once_per_worker():
+    with ProcessPoolExecutor(max_workers=2, mp_context=get_context("spawn")) as pool:
+        service = CountedTextLengthService(
+            task_definition=TextLengthTask(),
+            name="length",
+            callback=Mock(),
+            executor=pool,
+        )
+        result_tasks = [service.run(TextData(text="a" * size)) for size in range(1, 9)]
+
+    assert [task.output_data for task in result_tasks] == list(range(1, 9))
+    assert 1 <= CountedTextLengthService.pickled <= 2
+
+
+def test_run_in_process_pool_with_retry_policy():
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        service = TextLengthService(
+            task_definition=TextLengthTask(),
+            name="length",
+            callback=Mock(),
+            executor=pool,
+            retry_policy=RetryPolicy(
+                max_attempts=2,
+                initial_delay=0,
+                retry_on=lambda error: isinstance(error, ConnectionError),
+            ),
+        )
+        result_task = service.run(TextData(text="hello"))
+
+    assert result_task.status == TaskStatus.COMPLETED.value
+    assert result_task.output_data == 5
+
+
+class FlakyService(Service):
+    def __init__(self, *args, failures: int = 1, error=RuntimeError, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def apply(self, task: Task, *args, **kwargs) -> Task:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("transient")
+        task.output_data = str(task.input_data)
+        return task
+
+
+def test_run_retries_transient_failures():
+    callback = Mock()
+    service = FlakyService(
+        task_definition=DummyTask(),
+        name="flaky",
+        callback=callback,
+        failures=2,
+        retry_policy=RetryPolicy(max_attempts=3, initial_delay=0.001),
+    )
+
+    result_task = service.run(5)
+
+    assert result_task.status == TaskStatus.COMPLETED.value
+    assert service.calls == 3
+    # STARTED, then IN_PROGRESS and RETRYING twice, then IN_PROGRESS, COMPLETED
+    assert callback.call_count == 7
+
+
+def test_run_stops_retrying_when_predicate_refuses():
+    service = FlakyService(
+        task_definition=DummyTask(),
+        name="flaky",
+        callback=Mock(),
+        failures=2,
+        error=ValueError,
+        retry_policy=RetryPolicy(
+            max_attempts=3,
+            initial_delay=0.001,
+            retry_on=lambda error: not isinstance(error, ValueError),
+        ),
+    )
+
+    result_task = service.run(5)
+
+    assert result_task.status == TaskStatus.FAILED.value
+    assert service.calls == 1
+
+
+def test_run_times_out_hung_apply():
+    class HungService(Service):
+        def apply(self, task: Task, *args, **kwargs) -> Task:
+            time.sleep(0.5)
+            task.output_data = "late"
+            return task
+
+    service = HungService(
+        task_definition=DummyTask(), name="hung", callback=Mock(), timeout=0.05
+    )
+
+    start = time.monotonic()
+    result_task = service.run(1)
+
+    assert time.monotonic() - start < 0.4
+    assert result_task.status == TaskStatus.TIMEOUT.value
+    assert "did not complete within" in result_task.error
+    time.sleep(0.6)
+    assert result_task.output_data is None
+
+
+def test_timeouts_reuse_a_bounded_pool_of_threads():
+    release = threading.Event()
+
+    class HungService(Service):
+        timeout_workers = 2
+
+        def apply(self, task: Task, *args, **kwargs) -> Task:
+            if task.input_data < 0:
+                release.wait(5)
+            task.output_data = str(task.input_data)
+            return task
+
+    service = HungService(
+        task_definition=DummyTask(), name="hung", callback=Mock(), timeout=0.05
+    )
+
+    assert [service.run(i).status for i in range(5)] == ["completed"] * 5
+    assert len(service._timeout_pool._threads) == 1
+    assert [service.run(-1).status for _ in range(4)] == ["timeout"] * 4
+    assert len(service._timeout_pool._threads) == 2
+    release.set()
+
+
+def test_run_batch_applies_timeout_and_retry_policy():
+    class FlakyHungService(FlakyService):
+        def apply(self, task: Task, *args, **kwargs) -> Task:
+            if task.input_data < 0:
+                time.sleep(0.5)
+            return super().apply(task)
+
+    service = FlakyHungService(
+        task_definition=DummyTask(),
+        name="flaky",
+        callback=Mock(),
+        failures=1,
+        timeout=0.1,
+        retry_policy=RetryPolicy(
+            max_attempts=3,
+            initial_delay=0.001,
+            retry_on=lambda error: not isinstance(error, TaskTimeoutError),
+        ),
+    )
+
+    start = time.monotonic()
+    flaky, hung = service.run_batch([1, -1])
+
+    assert time.monotonic() - start < 0.4
+    assert flaky.status == TaskStatus.COMPLETED.value
+    assert flaky.output_data == "1"
+    assert hung.status == TaskStatus.TIMEOUT.value
+    assert "did not complete within" in hung.error
+    # One failed attempt then the retry of the first item, the hung call
+    # is still sleeping
+    assert service.calls == 2
+
+
+def test_run_boundary_validation_checks_types():
+    service = DummyService(
+        task_definition=DummyTask(),
+        name="dummy",
+        callback=Mock(),
+        validation=ValidationLevel.BOUNDARY,
+    )
+
+    result_task = service.run(3, id="123")
+
+    assert result_task.status == TaskStatus.COMPLETED.value
+    assert result_task.output_data == "6"
+    assert result_task.id == "123"
+    with pytest.raises(TypeError):
+        service.run("not-an-int")
+
+
+def test_run_without_validation_trusts_data():
+    class UncheckedService(Service):
+        def apply(self, task: Task, *args, **kwargs):
+            task.output_data = task.input_data
+            return task
+
+    service = UncheckedService(
+        task_definition=DummyTask(),
+        name="unchecked",
+        callback=Mock(),
+        validation=ValidationLevel.OFF,
+    )
+
+    result_task = service.run(3)
+
+    assert result_task.status == TaskStatus.COMPLETED.value
+    assert result_task.output_data == 3
+
+
+def test_run_returns_cached_output():
+    service = FlakyService(
+        task_definition=DummyTask(),
+        name="cached",
+        callback=Mock(),
+        failures=0,
+        cache=ResultCache(),
+    )
+
+    first = service.run(5)
+    second = service.run(5)
+    batch = service.run_batch([5, 6])
+
+    assert service.calls == 2
+    assert second.status == TaskStatus.COMPLETED.value
+    assert second.output_data == first.output_data == "5"
+    assert second.extras["cached"] is True
+    assert [task.output_data for task in batch] == ["5", "6"]
+    assert service.cache.stats().hits == 2
+
+
+def test_cache_keys_include_apply_arguments():
+    class SuffixService(Service):
+        def apply(self, task: Task, suffix: str = "", **kwargs) -> Task:
+            task.output_data = f"{task.input_data}{suffix}"
+            return task
+
+    service = SuffixService(
+        task_definition=DummyTask(), name="suffix", callback=Mock(), cache=ResultCache()
+    )
+
+    assert service.run(1, suffix="a").output_data == "1a"
+    assert service.run(1, suffix="b").output_data == "1b"
+    assert service.run(1, "c").output_data == "1c"
+    cached = service.run(1, suffix="a", id="other")
+    assert cached.output_data == "1a"
+    assert cached.extras["cached"] is True
+    assert service.run_batch([1], suffix="b")[0].extras["cached"] is True
+
+
+class SleepyService(Service):
+    """Sleeps `input_data` milliseconds."""
+
+    def apply(self, task: Task, *args, **kwargs) -> Task:
+        time.sleep(task.input_data / 1000)
+        task.output_data = str(task.input_data)
+        return task
+
+
+def test_run_stream_keeps_order_and_bounds_in_flight():
+    service = SleepyService(task_definition=DummyTask(), name="sleepy", callback=Mock())
+    pulled = []
+
+    def inputs():
+        for value in [30, 1, 20, 1, 10, 1]:
+            pulled.append(value)
+            yield value
+
+    stream = service.run_stream(inputs(), max_in_flight=2)
+    first = next(stream)
+    assert first.output_data == "30"
+    assert len(pulled) <= 3
+    assert [task.output_data for task in stream] == ["1", "20", "1", "10", "1"]
+    assert len(pulled) == 6
+
+
+def test_run_stream_unordered_yields_fastest_first():
+    service = SleepyService(task_definition=DummyTask(), name="sleepy", callback=Mock())
+
+    tasks = list(service.run_stream([200, 1, 2], max_in_flight=3, ordered=False))
+    assert tasks[-1].output_data == "200"
+    assert sorted(task.output_data for task in tasks) == ["1", "2", "200"]
+    assert all(task.status == TaskStatus.COMPLETED.value for task in tasks)
+
+
+def test_run_stream_isolates_failures():
+    service = DummyService(task_definition=DummyTask(), name="dummy", callback=Mock())
+
+    tasks = list(service.run_stream([1, "bad", 2], max_in_flight=2))
+    assert [task.status for task in tasks] == [
+        TaskStatus.COMPLETED.value,
+        TaskStatus.FAILED.value,
+        TaskStatus.COMPLETED.value,
+    ]
@@ -0,0 +1,120 @@
+import asyncio
+from typing import Type
+from unittest.mock import Mock
+import pytest
+from zendata.tasks.async_service import AsyncService
+from zendata.tasks.base import BaseTask, TaskStatus
+from zendata.tasks.progress import Progress
+from zendata.tasks.service import Service
+from zendata.tasks.task import Task
+
+
+class CountTask(BaseTask):
+    input: Type[int] = int
+    output: Type[int] = int
+
+
+def make_task() -> Task:
+    return Task(input=int, output=int, input_data=3)
+
+
+def test_progress_is_throttled_by_delta():
+    emitted = []
+    task = make_task()
+    progress = Progress(
+        task,
+        lambda task: emitted.append(task.percentage),
+        total=1000,
+        min_interval=0,
+        min_delta=0.1,
+    )
+
+    for _ in range(1000):
+        progress.advance()
+    assert task.percentage == 1.0
+    assert task.status == TaskStatus.IN_PROGRESS
+    assert len(emitted) == 10
+    assert emitted == sorted(emitted)
+
+
+def test_progress_is_throttled_by_time():
+    emit = Mock()
+    progress = Progress(make_task(), emit, total=100, min_interval=60, min_delta=0)
+
+    for _ in range(99):
+        progress.advance()
+    assert emit.call_count == 1
+    progress.flush()
+    assert emit.call_count == 2
+    progress.finish()
+    assert emit.call_count == 3
+
+
+def test_nested_progress():
+    task = make_task()
+    progress = Progress(task, Mock(), total=4, min_interval=0, min_delta=0)
+
+    progress.advance()
+    assert task.percentage == 0.25
+    with progress.child(steps=2, total=10) as windows:
+        windows.update(5)
+        assert task.percentage == 0.5
+        items = windows.child(steps=5, total=2)
+        items.advance()
+        assert task.percentage == pytest.approx(0.625)
+    assert task.percentage == 0.75
+    assert progress.done == 3
+    progress.update(1)
+    assert task.percentage == 0.75
+    with pytest.raises(ValueError):
+        progress.child(total=0)
+
+
+class SteppingService(Service):
+    def apply(self, task: Task, *args, **kwargs) -> Task:
+        progress = self.progress(task, total=task.input_data, min_interval=0)
+        for _ in range(task.input_data):
+            progress.advance()
+        task.output_data = task.input_data
+        return task
+
+
+def test_service_reports_progress_to_callback():
+    events = []
+    service = SteppingService(
+        task_definition=CountTask(),
+        name="stepping",
+        callback=lambda task: events.append((task.status, task.percentage)),
+    )
+
+    service.run(4)
+    in_progress = [
+        percentage
+        for status, percentage in events
+        if status == TaskStatus.IN_PROGRESS
+    ]
+    assert in_progress == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert events[-1] == (TaskStatus.COMPLETED, 1)
+
+
+def test_async_service_reports_progress_from_threads():
+    events = []
+
+    class ThreadedService(AsyncService):
+        async def apply(self, task: Task, *args, **kwargs) -> Task:
+            progress = self.progress(task, total=2, min_interval=0)
+            await asyncio.to_thread(progress.advance)
+            await asyncio.to_thread(progress.advance)
+            await asyncio.sleep(0)
+            task.output_data = 2
+            return task
+
+    service = ThreadedService(
+        task_definition=CountTask(),
+        name="threaded",
+        callback=lambda task: events.append((task.status, task.percentage)),
+    )
+
+    asyncio.run(service.run(2))
+    assert (TaskStatus.IN_PROGRESS, 0.5) in events
+    assert (TaskStatus.IN_PROGRESS, 1.0) in events
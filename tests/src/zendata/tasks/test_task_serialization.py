@@ -0,0 +1,29 @@
+from zendata.data.text.text import TextData
+from zendata.tasks.serialization import dump_task, load_task
+from zendata.tasks.task import Task
+
+
+def test_dump_task_uses_type_paths():
+    task = Task(input=TextData, output=str, input_data=TextData(text="hello"))
+
+    payload = dump_task(task)
+
+    assert payload["input"] == "zendata.data.text.text.TextData"
+    assert payload["output"] == "builtins.str"
+    assert payload["input_data"]["text"] == "hello"
+
+
+def test_load_task_round_trip():
+    task = Task(
+        input=TextData,
+        output=TextData,
+        input_data=TextData(text="hello"),
+        output_data=TextData(text="world"),
+    )
+
+    loaded = load_task(dump_task(task))
+
+    assert loaded.id == task.id
+    assert loaded.input is TextData
+    assert loaded.input_data == task.input_data
+    assert loaded.output_data == task.output_data
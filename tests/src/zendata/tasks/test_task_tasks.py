@@ -1,6 +1,6 @@
 import pytest
 from zendata.tasks.task import Task
-from zendata.tasks.base import BaseTask
+from zendata.tasks.base import BaseTask, TaskStatus
 
 
 def test_task_valid_input_output():
@@ -37,3 +37,14 @@ def test_task_with_none_data():
     )
     assert task.input_data is None
     assert task.output_data is None
+
+
+def test_trusted_task_skips_validation():
+    task = Task.trusted(name="trusted", input=int, output=str, input_data="not-an-int")
+
+    assert task.input_data == "not-an-int"
+    assert task.status == TaskStatus.CREATED.value
+    assert task.created_at == task.updated_at
+    assert len(task.id) == 32
+    assert task.extras == {}
+    assert task.model_dump()["input"] == "builtins.int"
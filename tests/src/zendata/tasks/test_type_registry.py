@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+import pytest
+
+from zendata.data.ml.generation.text import Message
+from zendata.tasks.base import BaseTask
+from zendata.tasks.registry import TypeRegistry, register_type
+from zendata.tasks.task import Task
+
+
+def test_resolve_is_memoized():
+    registry = TypeRegistry()
+
+    with patch("importlib.import_module", wraps=__import__("importlib").import_module) as mock:
+        first = registry.resolve("zendata.data.ml.generation.text.Message")
+        second = registry.resolve("zendata.data.ml.generation.text.Message")
+
+    assert first is second is Message
+    assert mock.call_count == 1
+
+
+def test_register_custom_path():
+    registry = TypeRegistry()
+    registry.register(Message, "message")
+
+    assert registry.resolve("message") is Message
+    assert registry.path_of(Message) == "message"
+
+
+def test_allow_list_refuses_arbitrary_imports():
+    registry = TypeRegistry(allow_imports=False)
+    registry.register(Message)
+
+    assert registry.resolve("zendata.data.ml.generation.text.Message") is Message
+    with pytest.raises(ImportError):
+        registry.resolve("os.PathLike")
+
+
+def test_allowed_modules_restricts_imports():
+    registry = TypeRegistry(allowed_modules=["zendata", "builtins"])
+
+    assert registry.resolve("builtins.int") is int
+    assert registry.resolve("zendata.data.ml.generation.text.Message") is Message
+    with pytest.raises(ImportError):
+        registry.resolve("subprocess.Popen")
+    with pytest.raises(ImportError):
+        registry.resolve("zendatax.module.Type")
+
+
+def test_generic_alias_round_trip():
+    path = register_type(list[Message], "zendata.messages")
+    task = BaseTask(input=list[Message], output=str)
+
+    dumped = task.model_dump()
+    restored = BaseTask.model_validate(dumped)
+
+    assert path == "zendata.messages"
+    assert dumped["input"] == "zendata.messages"
+    assert restored.input == list[Message]
+
+
+def test_task_checks_generic_alias_origin():
+    message = Message(user_id="user", message="hello")
+
+    task = Task(input=list[Message], output=str, input_data=[message])
+
+    assert task.input_data == [message]
+    with pytest.raises(TypeError):
+        Task(input=list[Message], output=str, input_data=message)
+
+
+def test_unregistered_generic_alias_cannot_be_resolved():
+    registry = TypeRegistry()
+
+    with pytest.raises(ImportError):
+        registry.resolve(registry.path_of(dict[str, Message]))